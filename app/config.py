@@ -8,6 +8,74 @@ class Settings(BaseSettings):
     THE_ODDS_API_KEY: str = os.getenv("THE_ODDS_API_KEY", "")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
 
+    # ---- HTTP CLIENT (shared by all scrapers) ----
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 15.0
+    HTTP_POOL_CONNECTIONS: int = 10   # number of per-host pools kept alive
+    HTTP_POOL_MAXSIZE: int = 20       # connections kept per host
+    HTTP_MAX_RETRIES: int = 2
+
+    # ---- FIGHTER INGESTION ----
+    INGEST_MAX_WORKERS: int = 12      # max concurrent (fighter, source) scrapes
+    IDENTITY_BATCH_SIZE: int = 20     # fighters per batched GPT identity request
+
+    # ---- FIGHTER REFRESH POLICY (hours) ----
+    UFCSTATS_TTL_HOURS: float = 24 * 7
+    SHERDOG_TTL_HOURS: float = 24 * 30
+    TAPOLOGY_TTL_HOURS: float = 24 * 30
+    ON_CARD_TTL_HOURS: float = 12     # cap for fighters on an upcoming card
+    COMPLETED_EVENT_PROBE_MINUTES: float = 60
+
+    # ---- UFCSTATS FIGHTER DIRECTORY ----
+    UFCSTATS_DIRECTORY_PATH: str = "data/ufcstats_directory.json"
+    UFCSTATS_DIRECTORY_TTL_HOURS: float = 24 * 7
+    UFCSTATS_DIRECTORY_MISS_REFRESH_HOURS: float = 24
+
+    # ---- NEXT EVENT CACHE (stale-while-revalidate) ----
+    NEXT_EVENT_TTL_SECONDS: int = 1800
+    NEXT_EVENT_RETRY_SECONDS: int = 120   # min gap between failed upstream refreshes
+
+    # ---- PER-FIGHT ANALYSIS ----
+    ANALYSIS_MAX_CONCURRENCY: int = 6
+    ANALYSIS_TIMEOUT_SECONDS: float = 60.0
+    STREAM_DISCONNECT_POLL_SECONDS: float = 0.5  # /analysis/stream checks for a gone client this often
+    ANALYSIS_MODE: str = "map_reduce"     # or "single" (whole card in one prompt)
+    ANALYSIS_FIGHT_RETRIES: int = 2       # sequential retries per failed fight
+    PREDICTION_SOURCE: str = "model"      # "model" (local engine, LLM writes narrative) or "llm"
+
+    # ---- PROMPT SIZE ----
+    PROMPT_RECENT_FIGHTS: int = 5          # fight-history rows kept per fighter
+    FIGHT_PROMPT_TOKEN_BUDGET: int = 1500  # per-fight prompt (context only)
+    CARD_PROMPT_TOKEN_BUDGET: int = 12000  # whole-card prompt
+
+    # ---- FIGHTER RATINGS (Elo) ----
+    RATING_BASE: float = 1500.0           # debut rating
+    RATING_K: float = 32.0
+    RATING_PROVISIONAL_FIGHTS: int = 5    # first fights move the rating faster...
+    RATING_PROVISIONAL_K: float = 48.0    # ...with this K
+    RATING_FINISH_MULTIPLIER: float = 1.15  # KO/TKO and submission wins count a bit more
+    RATING_REPLAY_SECONDS: float = 300    # how often back-catalogue bouts are replayed in date order
+
+    # ---- PARLAYS ----
+    PARLAY_MAX_LEGS: int = 3    # combinations of 2..N legs are scored
+    PARLAY_TOP_N: int = 3       # parlays kept per risk profile
+
+    # ---- CARD SIMULATOR (Monte Carlo) ----
+    SIM_DRAWS: int = 1_000_000         # full-card outcomes per request (default)
+    SIM_MAX_DRAWS: int = 10_000_000
+    SIM_CHUNK_SIZE: int = 250_000      # draws sampled per vectorized pass (bounds memory)
+    SIM_MARKET_WEIGHT: float = 0.5     # blend: weight on no-vig odds vs. the model
+    SIM_MAX_PARLAYS: int = 12          # 2^N joint hit patterns are tallied
+    SIM_BANKROLL: float = 100.0
+
+    # ---- BACKGROUND JOBS ----
+    JOB_WORKERS: int = 2
+    JOB_LEASE_SECONDS: int = 120   # claim renewed every third of this while running
+
+    # ---- LLM RESPONSE CACHE ----
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MEMORY_SIZE: int = 2048  # entries kept in the in-process LRU
+
     class Config:
         extra = "allow"  # allow extra vars (Railway adds many)
 
@@ -1,5 +1,8 @@
+import logging
 import os
-from sqlalchemy import create_engine
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Clean up DATABASE_URL – remove whitespace + newlines
@@ -16,6 +19,8 @@ engine = create_engine(
     pool_pre_ping=True
 )
 
+logger = logging.getLogger(__name__)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -27,9 +32,90 @@ def get_db():
     finally:
         db.close()
 
+
+# ----------------------------------------------------------
+# Async engine (asyncpg) for async routes — created on first use
+# ----------------------------------------------------------
+_ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def async_database_url(url: str) -> str:
+    """Same database, async driver (asyncpg takes ssl=, not sslmode=)."""
+    parts = urlsplit(url)
+    scheme = _ASYNC_DRIVERS.get(parts.scheme, parts.scheme)
+    query = [("ssl" if k == "sslmode" else k, v) for k, v in parse_qsl(parts.query)]
+    return urlunsplit((scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
+def get_async_sessionmaker():
+    global _async_engine, _AsyncSessionLocal
+
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        _async_engine = create_async_engine(async_database_url(DATABASE_URL), pool_pre_ping=True)
+        # no expire on commit: attribute access after commit must not lazy-load
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, expire_on_commit=False)
+
+    return _AsyncSessionLocal
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+# ----------------------------------------------------------
+# Schema upkeep: create_all never alters an existing table, so
+# columns added to a model later are added here (idempotent)
+# ----------------------------------------------------------
+def add_missing_columns(bind=engine) -> list:
+    """
+    ALTER TABLE ... ADD COLUMN for every model column the live table lacks,
+    then create that column's indexes. Added columns are nullable (existing
+    rows have no value); the backfills at startup fill them in.
+    """
+    existing_tables = set(inspect(bind).get_table_names())
+    added = []
+
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue  # create_all made it with every column
+
+            present = {c["name"] for c in inspect(conn).get_columns(table.name)}
+            missing = [c for c in table.columns if c.name not in present]
+            for column in missing:
+                ddl_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl_type}'))
+                added.append(f"{table.name}.{column.name}")
+
+            missing_names = {c.name for c in missing}
+            for index in table.indexes:
+                if missing_names & {c.name for c in index.columns}:
+                    index.create(bind=conn, checkfirst=True)
+
+    if added:
+        logger.info(f"Added columns to existing tables: {', '.join(added)}")
+    return added
+
+
 from app import models
 Base.metadata.create_all(bind=engine)
 
 
 # Create tables automatically on startup
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
@@ -1,23 +1,49 @@
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Optional
+
 import uvicorn
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from sqlalchemy.orm import Session
-from datetime import datetime
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, dispose_async_engine
 
 # ROUTERS
 from app.routes.event_routes import router as event_router
 from app.routes.analysis_routes import router as analysis_router
+from app.routes.job_routes import router as job_router
+from app.routes.fighter_routes import router as fighter_router
+from app.routes.prediction_routes import router as prediction_router
+from app.routes.simulation_routes import router as simulation_router
 
 # SERVICES
-from app.services.fighter_service import load_fighter_data
-from app.services.analysis_service import compute_stats_features, build_analysis_prompt
+from app.services.event_service import get_next_event_cached_async
+from app.services.ingestion_service import ingest_fighters
+from app.services.analysis_service import build_fight_prompt
+from app.services.pipeline_service import run_event_pipeline
+from app.services.job_service import start_job_workers
+from app.services.stats_service import backfill_fighter_stats
+from app.services.alias_service import backfill_normalized_names, enforce_unique_normalized_names
+from app.services.rating_service import load_or_build_ratings, start_rating_replay
 
 
 # UTILS
-from app.utils.tapology_batch import get_tapology_batch
-from app.utils.openai_client import run, run_stream
+from app.utils.odds_lookup import get_odds_for_matchups
+from app.utils.openai_client import run_stream
+from app.utils.http_client import close_session
+from app.utils.llm_cache import llm_cache
+from app.utils.ufcstats_directory import ufcstats_directory
+from app.utils.stream_metrics import stream_metrics
+from app.utils.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
 
 # ----------------------------------------------------------
 # APP (must be created before include_router)
@@ -35,6 +61,11 @@ app.add_middleware(
 
 # Routers
 app.include_router(event_router)
+app.include_router(analysis_router)
+app.include_router(job_router)
+app.include_router(fighter_router)
+app.include_router(prediction_router)
+app.include_router(simulation_router)
 
 
 
@@ -50,6 +81,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --------------------------------------------------------------
+# STARTUP (UFCStats directory refresh, column backfills + ratings, job workers,
+#          back-catalogue rating replay)
+# --------------------------------------------------------------
+
+@app.on_event("startup")
+def migrate_fighter_names():
+    # Before the workers start: bulk upserts conflict on this unique key
+    enforce_unique_normalized_names()
+
+
+@app.on_event("startup")
+def warm_ufcstats_directory():
+    threading.Thread(target=ufcstats_directory.refresh_stale, daemon=True).start()
+
+
+@app.on_event("startup")
+def backfill_derived_columns():
+    def _backfill():
+        backfill_normalized_names()
+        backfill_fighter_stats()
+        load_or_build_ratings()
+
+    threading.Thread(target=_backfill, daemon=True).start()
+
+
+@app.on_event("startup")
+def start_background_jobs():
+    start_job_workers()
+    start_rating_replay()
+
+
+# --------------------------------------------------------------
+# SHUTDOWN (release pooled scraper + async DB connections)
+# --------------------------------------------------------------
+
+@app.on_event("shutdown")
+def shutdown_http_pool():
+    close_session()
+
+
+@app.on_event("shutdown")
+async def shutdown_async_db():
+    await dispose_async_engine()
+
+
 # --------------------------------------------------------------
 # ROOT
 # --------------------------------------------------------------
@@ -59,16 +136,25 @@ def root():
     return {"status": "ok", "message": "UFC Analyzer Backend Running"}
 
 
+# --------------------------------------------------------------
+# LLM CACHE STATS
+# --------------------------------------------------------------
+
+@app.get("/llm_cache/stats")
+def llm_cache_stats():
+    return llm_cache.stats()
+
+
 # --------------------------------------------------------------
 # 1. NEXT EVENT
 # --------------------------------------------------------------
 
 @app.get("/next_event")
-def next_event(db: Session = Depends(get_db)):
+async def next_event():
     """
-    Scrape + cache the next UFC event.
+    Next UFC event, served from cache (refreshed in background when stale).
     """
-    event_json = load_next_event(db)
+    event_json = await get_next_event_cached_async()
     return event_json
 
 
@@ -82,17 +168,15 @@ def load_fighters(payload: dict, db: Session = Depends(get_db)):
     Input:
     {
         "fighters": ["A", "B", "C"],
-        "tapology": { "A": {...}, "B": {...} }   # optional
+        "tapology": { "A": {...}, "B": {...} },  # optional
+        "force": false                            # optional, ignore refresh TTLs
     }
     """
     fighters = payload.get("fighters", [])
     tapology_map = payload.get("tapology", {})
+    force = bool(payload.get("force", False))
 
-    merged_profiles = {}
-
-    for name in fighters:
-        merged = load_fighter_data(db, name, tapology_map=tapology_map)
-        merged_profiles[name] = merged
+    merged_profiles = ingest_fighters(db, fighters, tapology_map=tapology_map, force=force)
 
     return {"fighters": merged_profiles}
 
@@ -125,187 +209,115 @@ def odds_lookup(payload: dict):
 # 4. STREAMING SINGLE-FIGHT ANALYSIS
 # --------------------------------------------------------------
 
+def _sse(data: str, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event (multi-line data split per spec)."""
+    lines = [f"event: {event}"] if event else []
+    lines += [f"data: {line}" for line in data.split("\n")]
+    return "\n".join(lines) + "\n\n"
+
+
 @app.post("/analysis/stream")
-def streaming_analysis(payload: dict):
+async def streaming_analysis(payload: dict, request: Request):
     """
     Input:
     {
         "matchup_bundle": { ... }
     }
-    """
-    bundle = payload["matchup_bundle"]
-    stream = run_stream(build_analysis_prompt(bundle))
-
-    # FastAPI streaming response via generator
-    def token_stream():
-        for token in stream:
-            yield token
-
-    return token_stream()
-
-
-# --------------------------------------------------------------
-# INTERNAL: NON-STREAMING ANALYSIS (USED BY FULL EVENT)
-# --------------------------------------------------------------
-
-def run_full_analysis_nonstream(bundle: dict) -> dict:
-    """
-    Runs the analysis prompt (non-streaming) to get JSON prediction.
-    """
-    messages = build_analysis_prompt(bundle)
-    raw = run(messages, model="gpt-4o-mini", temperature=0.2)
-
-    # Parse JSON from GPT response
-    try:
-        parsed = eval(raw)
-    except Exception:
-        parsed = {
-            "analysis": raw,
-            "prediction": {
-                "winner": None,
-                "method": None,
-                "confidence": 0.0
-            },
-            "value_notes": ""
-        }
-
-    return parsed
 
+    Output: text/event-stream
+      data: <token>            (one event per model delta)
+      event: metrics           ({"ttft_ms", "total_ms"})
+      event: done
 
-# --------------------------------------------------------------
-# 5. HYBRID PARLAY BUILDER
-# --------------------------------------------------------------
-
-def build_parlays(predictions: list) -> list:
-    """
-    Hybrid parlay logic:
-    1. Select strong favorites (confidence > 0.65)
-    2. Select one underdog with value (confidence > 0.45 AND positive odds)
-    3. GPT formats the final parlays
+    Tokens are pulled from OpenAI one at a time as the client consumes
+    them (backpressure). A disconnect is noticed within
+    STREAM_DISCONNECT_POLL_SECONDS, even between tokens, and closes the
+    upstream stream.
     """
-    strong = [p for p in predictions if p["prediction"]["confidence"] >= 0.65]
-    value = [p for p in predictions if p["prediction"]["confidence"] >= 0.45 and p["odds"]["odds_b"].startswith("+")]
-
-    legs = [x["prediction"]["winner"] for x in strong][:2]  # top 2 confident legs
-    val_leg = value[0]["prediction"]["winner"] if value else None
-
-    parlay_data = {
-        "strong_legs": legs,
-        "value_leg": val_leg
-    }
-
-    # Format with GPT
-    messages = [
-        {"role": "system", "content": "You generate parlay explanations for MMA events."},
-        {"role": "user", "content": f"Formulate parlays based on this: {parlay_data}. Return JSON with keys 'parlays'."}
-    ]
-
-    raw = run(messages, model="gpt-4o-mini", temperature=0.2)
-
-    try:
-        parsed = eval(raw)
-        return parsed.get("parlays", [])
-    except Exception:
-        return []
+    bundle = payload["matchup_bundle"]
+    tokens = run_stream(
+        build_fight_prompt(bundle),
+        temperature=0.2,
+        timeout=settings.ANALYSIS_TIMEOUT_SECONDS,
+    )
+
+    async def watch_disconnect():
+        while not await request.is_disconnected():
+            await asyncio.sleep(settings.STREAM_DISCONNECT_POLL_SECONDS)
+        tokens.cancel()  # unblocks a worker thread waiting on the next chunk
+
+    async def event_stream():
+        started = time.perf_counter()
+        ttft_ms = None
+        disconnected = False
+        watcher = asyncio.create_task(watch_disconnect())
+
+        try:
+            async for token in iterate_in_threadpool(tokens):
+                if watcher.done():
+                    disconnected = True
+                    break
+
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                    logger.info(f"analysis stream TTFT: {ttft_ms:.0f} ms")
+
+                yield _sse(token)
+
+            disconnected = disconnected or watcher.done()
+            if not disconnected:
+                total_ms = (time.perf_counter() - started) * 1000
+                metrics = {
+                    "ttft_ms": round(ttft_ms, 1) if ttft_ms is not None else None,
+                    "total_ms": round(total_ms, 1),
+                }
+                yield _sse(json.dumps(metrics), event="metrics")
+                yield _sse("[DONE]", event="done")
+
+        except asyncio.CancelledError:  # server cancelled the response on disconnect
+            disconnected = True
+            raise
+
+        except Exception as e:
+            logger.error(f"analysis stream failed: {e}")
+            yield _sse(str(e), event="error")
+
+        finally:
+            # Also runs when the task is cancelled mid-next(): cancel() only
+            # sets a flag and closes the response, so it's safe while the
+            # worker thread is still inside the iterator.
+            watcher.cancel()
+            tokens.cancel()
+            stream_metrics.record(
+                ttft_ms, (time.perf_counter() - started) * 1000, disconnected
+            )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/analysis/stream/metrics")
+def streaming_metrics():
+    return stream_metrics.snapshot()
 
 
 # --------------------------------------------------------------
-# 6. FULL EVENT ANALYSIS
+# 5. FULL EVENT ANALYSIS
 # --------------------------------------------------------------
 
 @app.get("/full_event_analysis")
 def full_event_analysis(db: Session = Depends(get_db)):
     """
-    Runs the entire pipeline as ONE endpoint:
-    - Load event
-    - Tapology batch
-    - Fighter merge + load
-    - Odds
-    - Full per-fight analysis (non-streaming)
-    - Hybrid parlay builder
+    Runs the entire pipeline as ONE request (see pipeline_service).
+    For long cards prefer POST /jobs/full_event_analysis.
+    Concurrent requests share a single in-flight pipeline run.
     """
-
-    # STEP 1: Load event
-    event = load_next_event(db)
-    event_name = event["event_name"]
-
-    # STEP 2: collect fighter names from card
-    names = []
-    for f in event["fight_card"]:
-        names.append(f["fighter_a"])
-        names.append(f["fighter_b"])
-
-    names = list(set(names))
-
-    # STEP 3: Tapology batch
-    tapo = get_tapology_batch(names)
-
-    # STEP 4: Load fighters
-    fighters = {}
-    for n in names:
-        fighters[n] = load_fighter_data(db, n, tapology_map=tapo)
-
-    # STEP 5: Odds
-    card_matchups = [{"fighter_a": f["fighter_a"], "fighter_b": f["fighter_b"]} for f in event["fight_card"]]
-    odds_objects = get_odds_for_matchups(event_name, card_matchups)
-
-    # Build lookup
-    odds_map = {}
-    for o in odds_objects:
-        key1 = (o.fighter_a, o.fighter_b)
-        key2 = (o.fighter_b, o.fighter_a)
-        odds_map[key1] = o.dict()
-        odds_map[key2] = o.dict()
-
-    # STEP 6: Full fight analysis
-    results = []
-
-    for fight in event["fight_card"]:
-        a = fight["fighter_a"]
-        b = fight["fighter_b"]
-
-        a_prof = fighters[a]
-        b_prof = fighters[b]
-
-        # Compute features
-        a_feat = compute_stats_features(a_prof)
-        b_feat = compute_stats_features(b_prof)
-
-        odds = odds_map.get((a, b), {"odds_a": None, "odds_b": None})
-
-        # Build bundle for analysis
-        bundle = {
-            "event_name": event_name,
-            "fighter_a": a_prof,
-            "fighter_b": b_prof,
-            "a_features": a_feat,
-            "b_features": b_feat,
-            "odds": odds
-        }
-
-        analysis_out = run_full_analysis_nonstream(bundle)
-
-        results.append({
-            "fighter_a": a_prof,
-            "fighter_b": b_prof,
-            "odds": odds,
-            "analysis": analysis_out.get("analysis"),
-            "prediction": analysis_out.get("prediction"),
-            "value_notes": analysis_out.get("value_notes")
-        })
-
-    # STEP 7: Parlays
-    parlays = build_parlays(results)
-
-    # STEP 8: Full payload
-    output = {
-        "event_name": event["event_name"],
-        "event_date": event["event_date"],
-        "location": event["location"],
-        "generated_at": datetime.utcnow().isoformat(),
-        "fights": results,
-        "parlays": parlays
-    }
+    output = single_flight.do(("full_event_analysis",), lambda: run_event_pipeline(db))
+    if output is None:
+        raise HTTPException(404, "No upcoming event found.")
 
     return output
 
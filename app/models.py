@@ -1,10 +1,11 @@
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, Dict, Any
 
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, DateTime, JSON, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy import String, Integer, Float, Date, DateTime, JSON, ForeignKey, Text
 
 from app.database import Base
+from app.utils.names import normalize_name
 
 
 # ---------------------------------------------------------
@@ -16,6 +17,8 @@ class Fighter(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, index=True, unique=True)
+    # Accent/case-folded name (normalize_name) — the lookup key, one row per key
+    name_normalized: Mapped[Optional[str]] = mapped_column(String, index=True, unique=True, nullable=True)
 
     # External identifiers
     ufcstats_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -28,6 +31,9 @@ class Fighter(Base):
     ufcstats_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
     tapology_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
 
+    # Per-source last successful refresh: {"ufcstats": iso, "sherdog": iso, ...}
+    refreshed_at_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
@@ -36,6 +42,136 @@ class Fighter(Base):
         onupdate=datetime.utcnow
     )
 
+    # Typed UFCStats numbers (parsed from ufcstats_json on ingest)
+    stats = relationship(
+        "FighterStats",
+        uselist=False,
+        back_populates="fighter",
+        cascade="all, delete-orphan",
+    )
+
+    # Alternate spellings (nicknames, transliterations, source names)
+    aliases = relationship("FighterAlias", back_populates="fighter", cascade="all, delete-orphan")
+
+    @validates("name")
+    def _set_name_normalized(self, key, value):
+        self.name_normalized = normalize_name(value)
+        return value
+
+
+# ---------------------------------------------------------
+# Fighter Alias Model
+# ---------------------------------------------------------
+
+class FighterAlias(Base):
+    __tablename__ = "fighter_aliases"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    fighter_id: Mapped[int] = mapped_column(ForeignKey("fighters.id", ondelete="CASCADE"), index=True)
+    fighter = relationship("Fighter", back_populates="aliases")
+
+    alias: Mapped[str] = mapped_column(String)
+    # One fighter per spelling
+    alias_normalized: Mapped[str] = mapped_column(String, index=True, unique=True)
+    # "ufcstats" | "nickname" | "manual" ...
+    source: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    @validates("alias")
+    def _set_alias_normalized(self, key, value):
+        self.alias_normalized = normalize_name(value)
+        return value
+
+
+# ---------------------------------------------------------
+# Fighter Stats Model (typed, indexed copy of UFCStats strings)
+# ---------------------------------------------------------
+
+class FighterStats(Base):
+    __tablename__ = "fighter_stats"
+
+    fighter_id: Mapped[int] = mapped_column(ForeignKey("fighters.id", ondelete="CASCADE"), primary_key=True)
+    fighter = relationship("Fighter", back_populates="stats")
+
+    # Physical attributes
+    height_in: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    weight_lbs: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    reach_in: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    stance: Mapped[Optional[str]] = mapped_column(String, index=True, nullable=True)
+    dob: Mapped[Optional[date]] = mapped_column(Date, index=True, nullable=True)
+
+    # Career stats (percentages stored as 0-1 fractions)
+    slpm: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    str_acc: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    sapm: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    str_def: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    td_avg: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    td_acc: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    td_def: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+    sub_avg: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
+
+    # UFC record from fight history
+    wins: Mapped[int] = mapped_column(Integer, index=True, default=0)
+    losses: Mapped[int] = mapped_column(Integer, default=0)
+    draws: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Finishes (NULL while the stored history predates method parsing)
+    wins_ko: Mapped[Optional[int]] = mapped_column(Integer, index=True, nullable=True)
+    wins_sub: Mapped[Optional[int]] = mapped_column(Integer, index=True, nullable=True)
+    wins_dec: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    losses_ko: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    losses_sub: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    finish_rate: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)  # (KO + Sub) / wins
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+
+# ---------------------------------------------------------
+# Fighter Ratings (Elo over every stored fight history)
+# ---------------------------------------------------------
+
+class FighterRating(Base):
+    __tablename__ = "fighter_ratings"
+
+    # Keyed by normalized name: opponents in a history need not be stored fighters
+    name_normalized: Mapped[str] = mapped_column(String, primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+
+    rating: Mapped[float] = mapped_column(Float, index=True)
+    fights: Mapped[int] = mapped_column(Integer, default=0)
+    last_fight_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+
+class RatedFight(Base):
+    __tablename__ = "rated_fights"
+
+    # "<date>|<name a>|<name b>" (normalized names, sorted) — each bout counted once
+    fight_key: Mapped[str] = mapped_column(String, primary_key=True)
+
+    fighter_a: Mapped[str] = mapped_column(String, index=True)
+    fighter_b: Mapped[str] = mapped_column(String, index=True)
+    # "a" | "b" | "draw"
+    outcome: Mapped[str] = mapped_column(String)
+    method: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    fight_date: Mapped[date] = mapped_column(Date, index=True)
+
+    # Ratings going into the bout (the rating change is reproducible from these)
+    rating_a: Mapped[float] = mapped_column(Float)
+    rating_b: Mapped[float] = mapped_column(Float)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
 
 # ---------------------------------------------------------
 # Event Model
@@ -46,6 +182,7 @@ class Event(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     event_name: Mapped[str] = mapped_column(String, index=True)
+    event_name_normalized: Mapped[Optional[str]] = mapped_column(String, index=True, nullable=True)
     event_date: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     location: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
@@ -53,6 +190,17 @@ class Event(Base):
     fight_card_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Last successful scrape of this event (even if nothing changed)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+    @validates("event_name")
+    def _set_event_name_normalized(self, key, value):
+        self.event_name_normalized = normalize_name(value)
+        return value
 
 
 # ---------------------------------------------------------
@@ -70,4 +218,61 @@ class Prediction(Base):
     # GPT output stored raw
     analysis_json: Mapped[Dict[str, Any]] = mapped_column(JSON)
 
+    # Memoization: sha256 of the prompt inputs that produced analysis_json
+    # scope = "event" (whole-card prompt), "fight" (one bout), "pipeline" (full_event_analysis output)
+    input_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True, nullable=True)
+    scope: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+# ---------------------------------------------------------
+# Analysis Job Model (background full-event analysis)
+# ---------------------------------------------------------
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    kind: Mapped[str] = mapped_column(String, default="full_event_analysis")
+
+    # queued | running | succeeded | failed
+    status: Mapped[str] = mapped_column(String, index=True, default="queued")
+    stage: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Claim: the worker process running the job holds it until lease_until
+    # (renewed while running); an expired lease lets any process resume it
+    owner: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    lease_until: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True, nullable=True)
+
+    # {"stages": {name: status}, "fights": [{fighter_a, fighter_b, status}]}
+    progress_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    # Resume state: {"event": {...}, "analyses": {index: analysis}}
+    state_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    result_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
+    prediction_id: Mapped[Optional[int]] = mapped_column(ForeignKey("predictions.id"), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+
+# ---------------------------------------------------------
+# LLM Response Cache (durable tier for gpt_safe_call)
+# ---------------------------------------------------------
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String)
+    response: Mapped[str] = mapped_column(Text)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
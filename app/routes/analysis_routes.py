@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
 from app.models import Event
-from app.services.analysis_service import analyze_event
+from app.services.analysis_service import analyze_event_async
 
 router = APIRouter(prefix="/analysis", tags=["Analysis"])
 
 @router.get("/{event_id}")
-def run_analysis(event_id: int, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.id == event_id).first()
+async def run_analysis(
+    event_id: int,
+    mode: Optional[str] = Query(None, pattern="^(map_reduce|single)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    event = await db.get(Event, event_id)
 
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    result = analyze_event(db, event)
+    result = await analyze_event_async(db, event, mode=mode)
 
     if not result:
         raise HTTPException(status_code=500, detail="Failed to generate analysis")
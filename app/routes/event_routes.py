@@ -1,17 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_async_db, get_async_sessionmaker
+from app.models import Event
 from app.services.event_service import (
-    load_next_event,
+    get_next_event_cached_async,
+    get_event_by_name_async,
+    load_all_upcoming_events,
 )
-from app.services.analysis_service import analyze_event
+from app.services.analysis_service import analyze_event_async
+from app.utils.single_flight import async_single_flight
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
 @router.get("/next")
-def api_next_event(db: Session = Depends(get_db)):
-    evt = load_next_event(db)
+async def api_next_event():
+    evt = await get_next_event_cached_async()
     if not evt:
         raise HTTPException(404, "No upcoming event found.")
     return evt
@@ -20,16 +27,38 @@ def api_next_event(db: Session = Depends(get_db)):
 def api_upcoming(db: Session = Depends(get_db)):
     return load_all_upcoming_events(db)
 
+async def _analyze_event_by_id(event_id: int, mode: Optional[str]):
+    # Own session: the shared run may outlive the request that started it
+    async with get_async_sessionmaker()() as db:
+        event = await db.get(Event, event_id)
+        return await analyze_event_async(db, event, mode=mode) if event else None
+
+
 @router.get("/analyze-next")
-def api_analyze_next_event(db: Session = Depends(get_db)):
-    evt = load_next_event(db)
+async def api_analyze_next_event(
+    mode: Optional[str] = Query(None, pattern="^(map_reduce|single)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    evt = await get_next_event_cached_async()
     if not evt:
         raise HTTPException(404, "No upcoming event.")
-    return analyze_event(evt)
+
+    event = await get_event_by_name_async(db, evt["event_name"])
+    if not event:
+        raise HTTPException(404, "No upcoming event.")
+
+    # Concurrent requests for the same event share one analysis run
+    result = await async_single_flight.do(
+        ("analyze_event", event.id, mode),
+        lambda: _analyze_event_by_id(event.id, mode),
+    )
+    if not result:
+        raise HTTPException(500, "Failed to generate analysis")
+    return result
 
 @router.get("/{event_name}")
-def api_event_by_name(event_name: str, db: Session = Depends(get_db)):
-    evt = get_event_by_name(db, event_name)
+async def api_event_by_name(event_name: str, db: AsyncSession = Depends(get_async_db)):
+    evt = await get_event_by_name_async(db, event_name)
     if not evt:
         raise HTTPException(404, f"Event '{event_name}' not found.")
     return {
@@ -0,0 +1,76 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.rating_service import top_ratings
+from app.services.stats_service import NUMERIC_FIELDS, SORT_FIELDS, search_fighters, stats_to_dict
+
+router = APIRouter(prefix="/fighters", tags=["Fighters"])
+
+
+def _ranges(request: Request) -> dict:
+    """min_<column> / max_<column> query params for any NUMERIC_FIELDS column."""
+    ranges = {}
+    for column in NUMERIC_FIELDS:
+        bounds = []
+        for prefix in ("min_", "max_"):
+            raw = request.query_params.get(prefix + column)
+            try:
+                bounds.append(float(raw) if raw not in (None, "") else None)
+            except ValueError:
+                raise HTTPException(422, f"{prefix}{column} must be a number.")
+        if bounds != [None, None]:
+            ranges[column] = tuple(bounds)
+    return ranges
+
+
+@router.get("/search")
+def api_search_fighters(
+    request: Request,
+    name: Optional[str] = None,
+    stance: Optional[str] = None,
+    min_age: Optional[float] = None,
+    max_age: Optional[float] = None,
+    sort_by: str = Query("wins", description=f"One of: {', '.join(SORT_FIELDS)}"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Filter the roster on typed UFCStats columns, e.g.
+    /fighters/search?min_slpm=5&min_td_def=0.7&max_age=32&sort_by=slpm
+    (percentages are 0-1 fractions).
+    """
+    if sort_by not in SORT_FIELDS:
+        raise HTTPException(422, f"sort_by must be one of: {', '.join(SORT_FIELDS)}")
+
+    rows = search_fighters(
+        db,
+        name=name,
+        stance=stance,
+        ranges=_ranges(request),
+        min_age=min_age,
+        max_age=max_age,
+        sort_by=sort_by,
+        descending=order == "desc",
+        limit=limit,
+        offset=offset,
+    )
+
+    return {
+        "count": len(rows),
+        "fighters": [stats_to_dict(fighter, stats) for fighter, stats in rows],
+    }
+
+
+@router.get("/ratings")
+def api_fighter_ratings(
+    limit: int = Query(50, ge=1, le=500),
+    min_fights: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Elo leaderboard over every stored fight history (opponents included)."""
+    return {"ratings": top_ratings(db, limit=limit, min_fights=min_fights)}
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import AnalysisJob
+from app.services.job_service import submit_full_event_job, retry_job, job_status
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def _get_job(db: Session, job_id: str) -> AnalysisJob:
+    job = db.get(AnalysisJob, job_id)
+    if not job:
+        raise HTTPException(404, f"Job '{job_id}' not found.")
+    return job
+
+
+@router.post("/full_event_analysis", status_code=202)
+def api_submit_full_event_analysis(db: Session = Depends(get_db)):
+    job = submit_full_event_job(db)
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/{job_id}")
+def api_job_status(job_id: str, db: Session = Depends(get_db)):
+    return job_status(_get_job(db, job_id))
+
+
+@router.get("/{job_id}/result")
+def api_job_result(job_id: str, db: Session = Depends(get_db)):
+    job = _get_job(db, job_id)
+    if job.status != "succeeded":
+        raise HTTPException(409, f"Job is {job.status}; no result yet.")
+    return job.result_json
+
+
+@router.post("/{job_id}/retry", status_code=202)
+def api_retry_job(job_id: str, db: Session = Depends(get_db)):
+    job = _get_job(db, job_id)
+    if job.status != "failed":
+        raise HTTPException(409, f"Only failed jobs can be retried (job is {job.status}).")
+    job = retry_job(db, job)
+    return {"job_id": job.id, "status": job.status}
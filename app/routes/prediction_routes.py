@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.alias_service import find_fighters
+from app.services.prediction_engine import predict_matchups
+
+router = APIRouter(prefix="/predict", tags=["Predictions"])
+
+
+@router.post("/matchups")
+def api_predict_matchups(payload: dict, db: Session = Depends(get_db)):
+    """
+    Local statistical model, no LLM call. Input:
+    {"matchups": [{"fighter_a": "...", "fighter_b": "..."}, ...]}
+    Any pairing of stored fighters works (hypotheticals included); the
+    whole list is scored in one batched call.
+    """
+    matchups = payload.get("matchups") or []
+    if not matchups:
+        raise HTTPException(422, "matchups must be a non-empty list.")
+
+    try:
+        names = [(m["fighter_a"], m["fighter_b"]) for m in matchups]
+    except (KeyError, TypeError):
+        raise HTTPException(422, "Each matchup needs fighter_a and fighter_b.")
+
+    fighters, missing = find_fighters(db, [n for pair in names for n in pair])
+    pairs = [(fighters.get(a), fighters.get(b)) for a, b in names]
+
+    return {
+        "predictions": predict_matchups(pairs, names),
+        "missing_fighters": missing,
+    }
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import Prediction
+from app.services.card_simulator import simulate_card
+
+router = APIRouter(prefix="/simulate", tags=["Simulation"])
+
+
+@router.post("")
+def api_simulate_card(payload: dict, db: Session = Depends(get_db)):
+    """
+    Monte Carlo over a full card. Input:
+    {"fights": [{"fighter_a", "fighter_b", "odds_a", "odds_b",
+                 "win_probability", "method_distribution"}, ...]
+       or "prediction_id": a stored /full_event_analysis result,
+     "parlays": [{"legs": [{"fighter", "method"?}], "stake"?, "american_odds"?}]
+                (default: the optimizer's picks),
+     "draws"?, "seed"?, "market_weight"? (0-1), "bankroll"?}
+    """
+    market_weight = payload.get("market_weight")
+    if market_weight is not None and (
+        isinstance(market_weight, bool)
+        or not isinstance(market_weight, (int, float))
+        or not 0.0 <= market_weight <= 1.0
+    ):
+        raise HTTPException(422, "market_weight must be a number between 0 and 1.")
+
+    fights = payload.get("fights")
+    if fights is None and payload.get("prediction_id") is not None:
+        prediction = db.get(Prediction, payload["prediction_id"])
+        if prediction is None:
+            raise HTTPException(404, "Prediction not found.")
+        fights = (prediction.analysis_json or {}).get("fights")
+
+    if not fights:
+        raise HTTPException(422, "Provide fights or a prediction_id with fights.")
+
+    try:
+        return simulate_card(
+            fights,
+            parlays=payload.get("parlays"),
+            draws=payload.get("draws"),
+            seed=payload.get("seed"),
+            market_weight=market_weight,
+            bankroll=payload.get("bankroll"),
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(422, str(e))
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel
 
 # -------------------------
@@ -20,6 +20,33 @@ class EventRead(BaseModel):
     location: Optional[str] = None
     fight_card: List[FightPair]
 
+# -------------------------
+# Matchup Odds Schema
+# -------------------------
+
+class BookLine(BaseModel):
+    odds_a: Optional[float] = None
+    odds_b: Optional[float] = None
+
+
+class MatchupOdds(BaseModel):
+    fighter_a: str
+    fighter_b: str
+    # Best available line per side (American odds) and the book offering it
+    odds_a: Optional[str] = None
+    odds_b: Optional[str] = None
+    book: Optional[str] = None
+    book_b: Optional[str] = None
+
+    # Every book on the row, numeric
+    books: Dict[str, BookLine] = {}
+    # Consensus no-vig line: mean fair probability across books
+    consensus_a: Optional[str] = None
+    consensus_b: Optional[str] = None
+    fair_probability_a: Optional[float] = None
+    fair_probability_b: Optional[float] = None
+    overround: Optional[float] = None  # mean bookmaker margin, e.g. 0.045
+
 # -------------------------
 # Prediction Schema
 # -------------------------
@@ -0,0 +1,254 @@
+import logging
+from typing import Optional, Dict, List, Tuple
+
+from sqlalchemy import select, func, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.models import Fighter, FighterAlias, Event
+from app.utils.names import normalize_name
+from app.utils.ufcstats_directory import ufcstats_directory
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------
+# Lookup (indexed equality on the normalized key)
+# -------------------------------------------------------
+def find_fighter(db: Session, name: str) -> Optional[Fighter]:
+    """Canonical name first, then the alias table; both are index lookups."""
+    key = normalize_name(name)
+    if not key:
+        return None
+
+    fighter = db.query(Fighter).filter(Fighter.name_normalized == key).first()
+    if fighter is not None:
+        return fighter
+
+    return (
+        db.query(Fighter)
+        .join(FighterAlias, FighterAlias.fighter_id == Fighter.id)
+        .filter(FighterAlias.alias_normalized == key)
+        .first()
+    )
+
+
+def _group_keys(names: List[str]) -> Dict[str, List[str]]:
+    keys: Dict[str, List[str]] = {}
+    for name in dict.fromkeys(n for n in names if n):
+        keys.setdefault(normalize_name(name), []).append(name)
+    keys.pop("", None)
+    return keys
+
+
+def _split_found(keys: Dict[str, List[str]], by_key: Dict[str, Fighter]) -> Tuple[Dict[str, Fighter], List[str]]:
+    found: Dict[str, Fighter] = {}
+    missing: List[str] = []
+    for key, originals in keys.items():
+        for name in originals:
+            if key in by_key:
+                found[name] = by_key[key]
+            else:
+                missing.append(name)
+    return found, missing
+
+
+def _by_name_stmt(keys: List[str]):
+    return select(Fighter).where(Fighter.name_normalized.in_(keys))
+
+
+def _by_alias_stmt(keys: List[str]):
+    return (
+        select(FighterAlias.alias_normalized, Fighter)
+        .join(Fighter, FighterAlias.fighter_id == Fighter.id)
+        .where(FighterAlias.alias_normalized.in_(keys))
+    )
+
+
+def find_fighters(db: Session, names: List[str]) -> Tuple[Dict[str, Fighter], List[str]]:
+    """
+    Bulk find_fighter: one IN query on the canonical key, plus one on the
+    alias table only for names that missed. Returns ({name: Fighter}, missing)
+    keyed by the names as given.
+    """
+    keys = _group_keys(names)
+
+    by_key: Dict[str, Fighter] = {}
+    if keys:
+        for fighter in db.execute(_by_name_stmt(list(keys))).scalars():
+            by_key[fighter.name_normalized] = fighter
+
+    unresolved = [k for k in keys if k not in by_key]
+    if unresolved:
+        for key, fighter in db.execute(_by_alias_stmt(unresolved)).all():
+            by_key[key] = fighter
+
+    return _split_found(keys, by_key)
+
+
+async def find_fighters_async(db: AsyncSession, names: List[str]) -> Tuple[Dict[str, Fighter], List[str]]:
+    """find_fighters on an AsyncSession."""
+    keys = _group_keys(names)
+
+    by_key: Dict[str, Fighter] = {}
+    if keys:
+        for fighter in (await db.execute(_by_name_stmt(list(keys)))).scalars():
+            by_key[fighter.name_normalized] = fighter
+
+    unresolved = [k for k in keys if k not in by_key]
+    if unresolved:
+        for key, fighter in (await db.execute(_by_alias_stmt(unresolved))).all():
+            by_key[key] = fighter
+
+    return _split_found(keys, by_key)
+
+
+def _event_stmt(key: str):
+    return (
+        select(Event)
+        .where(Event.event_name_normalized == key)
+        .order_by(Event.updated_at.desc())
+        .limit(1)
+    )
+
+
+def find_event(db: Session, name: str) -> Optional[Event]:
+    key = normalize_name(name)
+    if not key:
+        return None
+    return db.execute(_event_stmt(key)).scalars().first()
+
+
+async def find_event_async(db: AsyncSession, name: str) -> Optional[Event]:
+    key = normalize_name(name)
+    if not key:
+        return None
+    return (await db.execute(_event_stmt(key))).scalars().first()
+
+
+# -------------------------------------------------------
+# Aliases
+# -------------------------------------------------------
+def add_fighter_alias(
+    db: Session,
+    fighter: Fighter,
+    alias: str,
+    source: Optional[str] = None,
+) -> Optional[FighterAlias]:
+    """
+    Record an alternate spelling for fighter (no commit). Spellings equal
+    to the canonical name, or already claimed by any fighter, are skipped.
+    Fighters with a UFCStats URL also get the spelling in the directory,
+    so it resolves without a search.
+    """
+    key = normalize_name(alias)
+    if not key or key == fighter.name_normalized:
+        return None
+
+    if fighter.ufcstats_id:
+        ufcstats_directory.add_alias(alias, fighter.ufcstats_id)
+
+    pending = [a for a in fighter.aliases if a.alias_normalized == key]
+    if pending:
+        return pending[0]
+
+    with db.no_autoflush:
+        claimed = db.query(FighterAlias).filter(FighterAlias.alias_normalized == key).first()
+    if claimed is not None:
+        if claimed.fighter_id != fighter.id:
+            logger.warning(f"Alias '{alias}' already belongs to fighter {claimed.fighter_id}; not reassigning")
+        return claimed if claimed.fighter_id == fighter.id else None
+
+    entry = FighterAlias(alias=alias.strip(), source=source)
+    fighter.aliases.append(entry)
+    return entry
+
+
+# -------------------------------------------------------
+# Backfill for rows stored before the normalized columns
+# -------------------------------------------------------
+def backfill_normalized_names(batch_size: int = 500) -> int:
+    count = 0
+
+    try:
+        with SessionLocal() as db:
+            for model, source, target in (
+                (Fighter, "name", "name_normalized"),
+                (Event, "event_name", "event_name_normalized"),
+            ):
+                while True:
+                    rows = (
+                        db.query(model)
+                        .filter(getattr(model, target).is_(None))
+                        .limit(batch_size)
+                        .all()
+                    )
+                    if not rows:
+                        break
+                    for row in rows:
+                        # normalize "" too so the loop always makes progress
+                        setattr(row, target, normalize_name(getattr(row, source)))
+                    db.commit()
+                    count += len(rows)
+    except Exception as e:
+        logger.error(f"Normalized-name backfill failed: {e}")
+
+    if count:
+        logger.info(f"Backfilled normalized names for {count} rows")
+    return count
+
+
+# -------------------------------------------------------
+# Unique normalized names (tables created before the constraint)
+# -------------------------------------------------------
+def _merge_duplicate_fighters(db: Session) -> int:
+    """
+    Fighters sharing a normalized name (concurrent ingests of two
+    spellings) collapse into the oldest row; the others' aliases move to
+    it and their stats are rebuilt on its next ingest.
+    """
+    duplicated = (
+        db.query(Fighter.name_normalized)
+        .filter(Fighter.name_normalized.isnot(None))
+        .group_by(Fighter.name_normalized)
+        .having(func.count(Fighter.id) > 1)
+        .all()
+    )
+
+    merged = 0
+    for (key,) in duplicated:
+        keep, *extra = db.query(Fighter).filter(Fighter.name_normalized == key).order_by(Fighter.id.asc()).all()
+        for fighter in extra:
+            for alias in list(fighter.aliases):
+                alias.fighter = keep
+            logger.warning(f"Merging duplicate fighter {fighter.id} ({fighter.name}) into {keep.id} ({keep.name})")
+            db.delete(fighter)
+            merged += 1
+
+    db.commit()
+    return merged
+
+
+def enforce_unique_normalized_names() -> None:
+    """
+    Make fighters.name_normalized unique on databases created before it
+    was (create_all leaves the old non-unique index alone): backfill the
+    keys, merge duplicates, then rebuild the index as unique. Runs before
+    any ingest, since bulk upserts use it as their ON CONFLICT target.
+    """
+    index = next(i for i in Fighter.__table__.indexes if i.name == "ix_fighters_name_normalized")
+    live = {i["name"]: i for i in inspect(engine).get_indexes(Fighter.__tablename__)}
+    if live.get(index.name, {}).get("unique"):
+        return
+
+    backfill_normalized_names()
+    with SessionLocal() as db:
+        merged = _merge_duplicate_fighters(db)
+
+    with engine.begin() as conn:
+        if index.name in live:
+            index.drop(bind=conn)
+        index.create(bind=conn)
+
+    logger.info(f"fighters.name_normalized is now unique ({merged} duplicate fighters merged)")
@@ -0,0 +1,45 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# -------------------------------------------------------
+# Bounded, order-preserving executor for LLM calls
+# -------------------------------------------------------
+def run_in_order(
+    fn: Callable[[T], R],
+    items: List[T],
+    max_concurrency: Optional[int] = None,
+    on_error: Optional[Callable[[T, Exception], R]] = None,
+) -> List[R]:
+    """
+    Run fn(item) for every item on at most max_concurrency threads and
+    return the results in the same order as items.
+
+    Per-call timeouts belong inside fn (e.g. run(..., timeout=...)).
+    A failing item yields on_error(item, exc) instead of aborting the batch;
+    without on_error the exception propagates.
+    """
+    if not items:
+        return []
+
+    workers = max(1, min(len(items), max_concurrency or settings.ANALYSIS_MAX_CONCURRENCY))
+
+    def _call(item: T) -> Any:
+        try:
+            return fn(item)
+        except Exception as e:
+            if on_error is None:
+                raise
+            logger.error(f"Analysis task failed: {e}")
+            return on_error(item, e)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_call, items))
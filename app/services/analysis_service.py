@@ -1,17 +1,35 @@
 import re
 import json
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models import Fighter, Event, Prediction
 from app.utils.gpt_safe import gpt_safe_call
+from app.utils.openai_client import run, run_async
 from app.services.odds_service import generate_synthetic_odds
+from app.services.prediction_cache import (
+    fingerprint,
+    find_memoized,
+    find_memoized_async,
+    find_memoized_many,
+    find_memoized_many_async,
+)
+from app.services.alias_service import find_fighters, find_fighters_async
+from app.services.analysis_executor import run_in_order
+from app.services.prediction_engine import attach_model_predictions
+from app.services.feature_encoder import encode_fighter, compact_json, copy_features, fit_to_budget
 
 
 logger = logging.getLogger(__name__)
 
+ANALYSIS_MODEL = "gpt-4o-mini"
+ANALYSIS_MODES = ("map_reduce", "single")
+
 # ---------------------------------------------------------
 # JSON Extractor
 # ---------------------------------------------------------
@@ -31,37 +49,24 @@ def extract_json(text: str) -> str:
 # ---------------------------------------------------------
 # DB Helpers
 # ---------------------------------------------------------
-def _get_fighter(db: Session, name: str) -> Optional[Fighter]:
-    if not name:
-        return None
-    return (
-        db.query(Fighter)
-        .filter(Fighter.name.ilike(name.strip()))
-        .first()
-    )
-
-
 def compute_stats_features(fighter: Optional[Fighter]) -> Dict[str, Any]:
-    """Package stored fighter data for GPT."""
-    if not fighter:
-        return {
-            "ufcstats": {},
-            "sherdog": {},
-            "tapology": {},
-            "metadata": {}
-        }
-
-    return {
-        "ufcstats": fighter.ufcstats_json or {},
-        "sherdog": fighter.sherdog_json or {},
-        "tapology": fighter.tapology_json or {},
-        "metadata": fighter.metadata_json or {},
-    }
+    """Package stored fighter data for GPT (compact numeric encoding)."""
+    return encode_fighter(fighter)
 
 
 # ---------------------------------------------------------
 # Build GPT Prompt — stats only
 # ---------------------------------------------------------
+FEATURE_LEGEND = """
+Feature keys: rating = Elo over all stored UFC fights (1500 = debut);
+stats = UFCStats career numbers (slpm/sapm per minute;
+str_acc/str_def/td_acc/td_def as 0-1 fractions; td_avg/sub_avg per 15 min);
+physical = height_in/reach_in/weight_lbs/age; record = UFC W/L/D with
+finish counts; recent = most recent fights first as
+[W|L|D|NC, opponent, method, round] (method and round omitted when unknown).
+"""
+
+
 def build_analysis_prompt(event: Event, enriched_fights: List[Dict[str, Any]]) -> str:
     prompt = f"""
 You are a world-class MMA analyst.
@@ -103,26 +108,116 @@ OUTPUT FORMAT (JSON ONLY):
 Rules:
 - confidence = float between 0 and 1
 - method = "Decision", "KO/TKO", or "Submission"
-"""
+""" + FEATURE_LEGEND
+
+    fights = [
+        {
+            **f,
+            "fighter_a_features": copy_features(f.get("fighter_a_features")),
+            "fighter_b_features": copy_features(f.get("fighter_b_features")),
+        }
+        for f in enriched_fights
+    ]
 
     context = {
         "event_name": event.event_name,
         "event_date": event.event_date,
         "location": event.location,
-        "fights": enriched_fights,
+        "fights": fights,
+    }
+
+    features = [f[k] for f in fights for k in ("fighter_a_features", "fighter_b_features")]
+
+    return fit_to_budget(
+        lambda: prompt + "\n\nCONTEXT:\n" + compact_json(context),
+        features,
+        settings.CARD_PROMPT_TOKEN_BUDGET,
+    )
+
+
+# ---------------------------------------------------------
+# Build GPT Prompt — single fight (used per fight by /full_event_analysis)
+# ---------------------------------------------------------
+FIGHT_SYSTEM_PROMPT = """
+You are a world-class MMA analyst.
+
+Use ONLY the structured fighter statistics provided (UFCStats, Sherdog, Tapology).
+Do NOT invent records or stats. If data is missing, acknowledge uncertainty.
+
+OUTPUT FORMAT (JSON ONLY):
+
+{
+  "analysis": "",
+  "prediction": {"winner": "", "method": "", "confidence": 0.0},
+  "value_notes": ""
+}
+
+Rules:
+- confidence = float between 0 and 1
+- method = "Decision", "KO/TKO", or "Submission"
+""" + FEATURE_LEGEND
+
+
+NARRATIVE_SYSTEM_PROMPT = """
+You are a world-class MMA analyst.
+
+The prediction for this fight was already computed by our statistical
+model (model_prediction: win probabilities, method distribution).
+Explain it using ONLY the structured fighter statistics provided; do NOT
+change the pick or invent records or stats. Point out where the data is
+thin and where the odds disagree with the model.
+
+OUTPUT FORMAT (JSON ONLY):
+
+{
+  "analysis": "",
+  "value_notes": ""
+}
+""" + FEATURE_LEGEND
+
+
+def _fighter_name(fighter: Any) -> Optional[str]:
+    return getattr(fighter, "name", fighter)
+
+
+def build_fight_prompt(bundle: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    bundle = {event_name, fighter_a, fighter_b, a_features, b_features, odds}
+    fighter_a / fighter_b may be Fighter rows or plain names.
+    """
+    context = {
+        "event_name": bundle.get("event_name"),
+        "fighter_a": _fighter_name(bundle.get("fighter_a")),
+        "fighter_b": _fighter_name(bundle.get("fighter_b")),
+        "fighter_a_features": copy_features(bundle.get("a_features")),
+        "fighter_b_features": copy_features(bundle.get("b_features")),
+        # Best/consensus lines only; the per-book matrix would crowd the budget
+        "odds": {k: v for k, v in (bundle.get("odds") or {}).items() if k != "books" and v is not None},
     }
 
-    prompt += "\n\nCONTEXT:\n"
-    prompt += json.dumps(context, indent=2)
+    model = bundle.get("model_prediction")
+    if model:
+        context["model_prediction"] = {
+            k: model[k] for k in ("win_probability", "method_distribution", "winner", "method")
+        }
+
+    content = fit_to_budget(
+        lambda: "CONTEXT:\n" + compact_json(context),
+        [context["fighter_a_features"], context["fighter_b_features"]],
+        settings.FIGHT_PROMPT_TOKEN_BUDGET,
+    )
 
-    return prompt
+    return [
+        {"role": "system", "content": NARRATIVE_SYSTEM_PROMPT if model else FIGHT_SYSTEM_PROMPT},
+        {"role": "user", "content": content},
+    ]
 
 
 # ---------------------------------------------------------
 # GPT Execution
 # ---------------------------------------------------------
 def _run_gpt_analysis(prompt: str) -> Optional[Dict[str, Any]]:
-    raw = gpt_safe_call([prompt])
+    raw = gpt_safe_call([prompt], model=ANALYSIS_MODEL)
     clean = extract_json(raw)
 
     logger.info("======= CLEAN ANALYSIS JSON =======")
@@ -139,51 +234,533 @@ def _run_gpt_analysis(prompt: str) -> Optional[Dict[str, Any]]:
 # ---------------------------------------------------------
 # Save prediction to DB
 # ---------------------------------------------------------
-def save_prediction(db: Session, event: Event, data: Dict[str, Any]) -> Prediction:
-    prediction = Prediction(event_id=event.id, analysis_json=data)
+def _new_prediction(
+    event: Event,
+    data: Dict[str, Any],
+    input_hash: Optional[str] = None,
+    scope: Optional[str] = None,
+) -> Prediction:
+    return Prediction(
+        event_id=event.id,
+        analysis_json=data,
+        input_hash=input_hash,
+        scope=scope,
+    )
+
+
+def save_prediction(
+    db: Session,
+    event: Event,
+    data: Dict[str, Any],
+    input_hash: Optional[str] = None,
+    scope: Optional[str] = None,
+) -> Prediction:
+    prediction = _new_prediction(event, data, input_hash, scope)
     db.add(prediction)
     db.commit()
     db.refresh(prediction)
     return prediction
 
 
+def save_predictions(db: Session, predictions: List[Prediction]) -> None:
+    """Several predictions in one commit."""
+    if predictions:
+        db.add_all(predictions)
+        db.commit()
+
+
 # ---------------------------------------------------------
-# MAIN — Analyze Event Using Stats Only
+# Per-fight analysis (map step)
 # ---------------------------------------------------------
-def analyze_event(db: Session, event: Event) -> Optional[Dict[str, Any]]:
+def empty_analysis(text: str = "") -> dict:
+    return {
+        "analysis": text,
+        "prediction": {
+            "winner": None,
+            "method": None,
+            "confidence": 0.0
+        },
+        "value_notes": ""
+    }
+
+
+def analyze_fight(bundle: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Pipeline:
-    1. Load fight card
-    2. Load fighter stats from DB
-    3. Build enriched_fights structure
-    4. Feed stats → GPT for analysis + parlay suggestions
-    5. Save to predictions table
+    One small non-streaming call for a single fight. Raises on a
+    malformed reply or one without a winner so callers can retry.
+    """
+    raw = run(
+        build_fight_prompt(bundle),
+        model=ANALYSIS_MODEL,
+        temperature=0.2,
+        timeout=settings.ANALYSIS_TIMEOUT_SECONDS,
+    )
+    return _parse_fight_reply(raw, bundle)
+
+
+def apply_model_prediction(bundle: Dict[str, Any], parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """The local model's numbers replace whatever pick the LLM reply holds."""
+    model = bundle.get("model_prediction")
+    if not model:
+        return parsed
+
+    return {
+        **parsed,
+        "prediction": {
+            "winner": model["winner"],
+            "method": model["method"],
+            "confidence": model["confidence"],
+            "win_probability": model["win_probability"],
+            "method_distribution": model["method_distribution"],
+            "source": "model",
+        },
+    }
+
+
+def _parse_fight_reply(raw: str, bundle: Dict[str, Any]) -> Dict[str, Any]:
+    parsed = apply_model_prediction(bundle, json.loads(extract_json(raw)))
+    if not (parsed.get("prediction") or {}).get("winner"):
+        raise ValueError("analysis reply has no predicted winner")
+    return parsed
+
+
+def _log_retry_failure(bundle: Dict[str, Any], attempt: int, exc: Exception) -> None:
+    logger.error(
+        f"Retry {attempt} failed for {_fighter_name(bundle.get('fighter_a'))} vs "
+        f"{_fighter_name(bundle.get('fighter_b'))}: {exc}"
+    )
+
+
+def _retries(bundles: List[Dict[str, Any]], results: List[Optional[Dict[str, Any]]]):
+    """
+    (index, bundle, attempt) for every sequential retry still needed.
+    results is re-checked between attempts, so a success stops the retries.
+    """
+    for i, bundle in enumerate(bundles):
+        for attempt in range(1, settings.ANALYSIS_FIGHT_RETRIES + 1):
+            if results[i] is not None:
+                break
+            yield i, bundle, attempt
+
+
+def analyze_fights(bundles: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
     """
+    Analyze all bundles concurrently, then retry the failures one at a
+    time (up to ANALYSIS_FIGHT_RETRIES each). Fights that still fail
+    come back as None; the others are unaffected.
+    """
+    results = run_in_order(analyze_fight, bundles, on_error=lambda bundle, exc: None)
+
+    for i, bundle, attempt in _retries(bundles, results):
+        try:
+            results[i] = analyze_fight(bundle)
+        except Exception as e:
+            _log_retry_failure(bundle, attempt, e)
+
+    return results
+
+
+# ---------------------------------------------------------
+# Parlays from per-fight predictions (reduce step)
+# ---------------------------------------------------------
+PARLAY_SYSTEM_PROMPT = """
+You build MMA parlays from finished fight predictions.
+Use ONLY the predictions given. Return JSON ONLY:
+
+{"parlays": [{"legs": [], "description": "", "risk_profile": ""}]}
+
+Rules:
+- 1–3 parlays, each leg is a predicted winner
+- risk_profile = "safe", "balanced", or "risky"
+"""
 
-    fight_card = event.fight_card_json or []
+
+def reduce_parlays(fights: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Cheap reduce call: sees only winners/methods/confidences, no stats."""
+    picks = [
+        [f["winner"], f.get("method"), f.get("confidence")]
+        for f in fights
+        if f.get("winner")
+    ]
+    if not picks:
+        return []
+
+    raw = gpt_safe_call(
+        [
+            {"role": "system", "content": PARLAY_SYSTEM_PROMPT},
+            {"role": "user", "content": "PICKS [winner, method, confidence]:\n" + compact_json(picks)},
+        ],
+        model=ANALYSIS_MODEL,
+        temperature=0.2,
+    )
+
+    try:
+        return json.loads(extract_json(raw)).get("parlays", [])
+    except Exception as e:
+        logger.error(f"Failed to parse parlay reply: {e}")
+        return []
+
+
+# ---------------------------------------------------------
+# MAIN — Analyze Event Using Stats Only
+# ---------------------------------------------------------
+def _enriched_fights(event: Event, fighters: Dict[str, Optional[Fighter]]) -> List[Dict[str, Any]]:
     enriched_fights = []
 
-    for fight in fight_card:
+    for fight in event.fight_card_json or []:
         name_a = fight.get("fighter_a")
         name_b = fight.get("fighter_b")
 
-        fighter_a = _get_fighter(db, name_a)
-        fighter_b = _get_fighter(db, name_b)
-
         enriched_fights.append(
             {
                 "fighter_a_name": name_a,
                 "fighter_b_name": name_b,
-                "fighter_a_features": compute_stats_features(fighter_a),
-                "fighter_b_features": compute_stats_features(fighter_b),
+                "fighter_a_features": compute_stats_features(fighters.get(name_a)),
+                "fighter_b_features": compute_stats_features(fighters.get(name_b)),
             }
         )
 
-    prompt = build_analysis_prompt(event, enriched_fights)
+    return enriched_fights
+
+
+def _fight_bundles(event: Event, fighters: Dict[str, Optional[Fighter]]) -> List[Dict[str, Any]]:
+    bundles = []
+
+    for fight in event.fight_card_json or []:
+        name_a = fight.get("fighter_a")
+        name_b = fight.get("fighter_b")
+
+        bundles.append({
+            "event_name": event.event_name,
+            "fighter_a": fighters.get(name_a) or name_a,
+            "fighter_b": fighters.get(name_b) or name_b,
+            "a_features": compute_stats_features(fighters.get(name_a)),
+            "b_features": compute_stats_features(fighters.get(name_b)),
+            "odds": {},
+        })
+
+    if settings.PREDICTION_SOURCE == "model":
+        attach_model_predictions(bundles)
+
+    return bundles
+
+
+def _fight_hashes(bundles: List[Dict[str, Any]]) -> List[str]:
+    return [
+        fingerprint({"model": ANALYSIS_MODEL, "messages": build_fight_prompt(b)})
+        for b in bundles
+    ]
+
+
+def _card_analysis(event: Event, analyses: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-fight analyses → the whole-card output shape (parlays added by the caller)."""
+    fights = []
+    for i, fight in enumerate(event.fight_card_json or []):
+        out = analyses.get(i) or empty_analysis("Analysis failed.")
+        prediction = out.get("prediction") or {}
+        fights.append({
+            "fighter_a": fight.get("fighter_a"),
+            "fighter_b": fight.get("fighter_b"),
+            "analysis": out.get("analysis"),
+            "winner": prediction.get("winner"),
+            "method": prediction.get("method"),
+            "confidence": prediction.get("confidence"),
+        })
+
+    return {
+        "event_name": event.event_name,
+        "event_date": event.event_date,
+        "location": event.location,
+        "fights": fights,
+    }
+
+
+def _card_names(event: Event) -> List[str]:
+    return [
+        name
+        for fight in event.fight_card_json or []
+        for name in (fight.get("fighter_a"), fight.get("fighter_b"))
+    ]
+
+
+# ---------------------------------------------------------
+# Shared steps (pure: no DB or LLM I/O — the sync and async
+# entry points below only add the I/O between them)
+# ---------------------------------------------------------
+def _resolve_mode(mode: Optional[str]) -> str:
+    mode = mode or settings.ANALYSIS_MODE
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode: {mode}")
+    return mode
+
+
+def _warn_missing(event: Event, missing: List[str]) -> None:
+    if missing:
+        logger.warning(f"{len(missing)} fighters on {event.event_name} not stored: {', '.join(missing)}")
+
+
+def _with_missing(analysis: Optional[Dict[str, Any]], missing: List[str]) -> Optional[Dict[str, Any]]:
+    if analysis is not None and missing:
+        return {**analysis, "missing_fighters": missing}
+    return analysis
+
+
+def _reuse(event: Event, memo: Prediction) -> Dict[str, Any]:
+    logger.info(f"Analysis inputs unchanged for {event.event_name}; reusing prediction {memo.id}")
+    return memo.analysis_json
+
+
+def _single_inputs(event: Event, fighters: Dict[str, Optional[Fighter]]):
+    """Whole-card prompt and its fingerprint."""
+    prompt = build_analysis_prompt(event, _enriched_fights(event, fighters))
+    return prompt, fingerprint({"model": ANALYSIS_MODEL, "prompt": prompt})
+
+
+def _map_reduce_inputs(event: Event, fighters: Dict[str, Optional[Fighter]]):
+    """Per-fight bundles, their fingerprints, and the card fingerprint over them."""
+    bundles = _fight_bundles(event, fighters)
+    fight_hashes = _fight_hashes(bundles)
+    return bundles, fight_hashes, fingerprint({"mode": "map_reduce", "fights": fight_hashes})
+
+
+def _split_memoized(fight_hashes: List[str], memos: Dict[str, Prediction]):
+    """(analyses reused from unchanged fights, indices still to analyze)."""
+    analyses = {i: memos[h].analysis_json for i, h in enumerate(fight_hashes) if h in memos}
+    pending = [i for i in range(len(fight_hashes)) if i not in analyses]
+    logger.info(f"{len(analyses)}/{len(fight_hashes)} fights unchanged; analyzing {len(pending)}")
+    return analyses, pending
+
+
+def _collect_fresh(
+    event: Event,
+    fight_hashes: List[str],
+    pending: List[int],
+    fresh: List[Optional[Dict[str, Any]]],
+    analyses: Dict[int, Dict[str, Any]],
+):
+    """Merge fresh results into analyses → (fight predictions to save, failed indices)."""
+    to_save, failed = [], []
+    for i, out in zip(pending, fresh):
+        if out is None:
+            failed.append(i)
+            continue
+        analyses[i] = out
+        to_save.append(_new_prediction(event, out, input_hash=fight_hashes[i], scope="fight"))
+    return to_save, failed
+
+
+def _card_result(
+    event: Event,
+    analysis: Dict[str, Any],
+    failed: List[int],
+    input_hash: str,
+) -> List[Prediction]:
+    """
+    Mark failed fights on the card analysis; the card is memoized (the
+    returned prediction) only when every fight succeeded.
+    """
+    if failed:
+        analysis["failed_fights"] = failed
+        return []
+    return [_new_prediction(event, analysis, input_hash=input_hash, scope="event")]
+
+
+# ---------------------------------------------------------
+# Sync entry points
+# ---------------------------------------------------------
+def _analyze_event_single(
+    db: Session,
+    event: Event,
+    fighters: Dict[str, Optional[Fighter]],
+) -> Optional[Dict[str, Any]]:
+    """Whole card in one prompt; one malformed reply loses the event."""
+    prompt, input_hash = _single_inputs(event, fighters)
+
+    memo = find_memoized(db, input_hash, scope="event")
+    if memo is not None:
+        return _reuse(event, memo)
+
     analysis = _run_gpt_analysis(prompt)
+    if analysis:
+        save_prediction(db, event, analysis, input_hash=input_hash, scope="event")
+    return analysis or None
+
+
+def _analyze_event_map_reduce(
+    db: Session,
+    event: Event,
+    fighters: Dict[str, Optional[Fighter]],
+) -> Optional[Dict[str, Any]]:
+    """
+    Map: one small call per fight, in parallel (fights whose prompt is
+    unchanged reuse their stored "fight" prediction). Reduce: parlays
+    from the predictions alone.
+    """
+    bundles, fight_hashes, input_hash = _map_reduce_inputs(event, fighters)
+
+    memo = find_memoized(db, input_hash, scope="event")
+    if memo is not None:
+        return _reuse(event, memo)
+
+    analyses, pending = _split_memoized(fight_hashes, find_memoized_many(db, fight_hashes, scope="fight"))
+    fresh = analyze_fights([bundles[i] for i in pending])
+
+    to_save, failed = _collect_fresh(event, fight_hashes, pending, fresh, analyses)
+    save_predictions(db, to_save)
+    if bundles and len(failed) == len(bundles):
+        return None
+
+    analysis = _card_analysis(event, analyses)
+    analysis["parlays"] = reduce_parlays(analysis["fights"])
+    save_predictions(db, _card_result(event, analysis, failed, input_hash))
+    return analysis
+
+
+def analyze_event(db: Session, event: Event, mode: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Pipeline:
+    1. Load fight card
+    2. Load fighter stats from DB (one bulk query for the whole card)
+    3. Feed stats → GPT for analysis + parlay suggestions
+       - "map_reduce": one call per fight in parallel, failed fights
+         retried individually, then a small parlay call
+       - "single": the whole card in one prompt
+       (skipped when a prediction with the same input fingerprint exists)
+    4. Save to predictions table
+
+    Fighters not stored yet are listed under "missing_fighters" so the
+    caller can ingest them (POST /load_fighters) and re-run.
+    """
+    mode = _resolve_mode(mode)
+
+    fighters, missing = find_fighters(db, _card_names(event))
+    _warn_missing(event, missing)
+
+    if mode == "single":
+        analysis = _analyze_event_single(db, event, fighters)
+    else:
+        analysis = _analyze_event_map_reduce(db, event, fighters)
+
+    return _with_missing(analysis, missing)
+
+
+# ---------------------------------------------------------
+# Async variants (AsyncSession + AsyncOpenAI)
+# ---------------------------------------------------------
+# In-flight LLM calls are awaited on the event loop instead of holding
+# a threadpool worker each; only the small cached calls (gpt_safe_call)
+# still go through a thread.
+
+async def save_prediction_async(
+    db: AsyncSession,
+    event: Event,
+    data: Dict[str, Any],
+    input_hash: Optional[str] = None,
+    scope: Optional[str] = None,
+) -> Prediction:
+    prediction = _new_prediction(event, data, input_hash, scope)
+    db.add(prediction)
+    await db.commit()
+    await db.refresh(prediction)
+    return prediction
+
 
-    if not analysis:
+async def save_predictions_async(db: AsyncSession, predictions: List[Prediction]) -> None:
+    if predictions:
+        db.add_all(predictions)
+        await db.commit()
+
+
+async def analyze_fight_async(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    raw = await run_async(
+        build_fight_prompt(bundle),
+        model=ANALYSIS_MODEL,
+        temperature=0.2,
+        timeout=settings.ANALYSIS_TIMEOUT_SECONDS,
+    )
+    return _parse_fight_reply(raw, bundle)
+
+
+async def analyze_fights_async(bundles: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """analyze_fights with ANALYSIS_MAX_CONCURRENCY calls in flight on the loop."""
+    limit = asyncio.Semaphore(max(1, settings.ANALYSIS_MAX_CONCURRENCY))
+
+    async def _one(bundle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with limit:
+            try:
+                return await analyze_fight_async(bundle)
+            except Exception as e:
+                logger.error(f"Analysis task failed: {e}")
+                return None
+
+    results = list(await asyncio.gather(*(_one(b) for b in bundles)))
+
+    for i, bundle, attempt in _retries(bundles, results):
+        try:
+            results[i] = await analyze_fight_async(bundle)
+        except Exception as e:
+            _log_retry_failure(bundle, attempt, e)
+
+    return results
+
+
+async def _analyze_event_single_async(
+    db: AsyncSession,
+    event: Event,
+    fighters: Dict[str, Optional[Fighter]],
+) -> Optional[Dict[str, Any]]:
+    prompt, input_hash = _single_inputs(event, fighters)
+
+    memo = await find_memoized_async(db, input_hash, scope="event")
+    if memo is not None:
+        return _reuse(event, memo)
+
+    analysis = await asyncio.to_thread(_run_gpt_analysis, prompt)
+    if analysis:
+        await save_prediction_async(db, event, analysis, input_hash=input_hash, scope="event")
+    return analysis or None
+
+
+async def _analyze_event_map_reduce_async(
+    db: AsyncSession,
+    event: Event,
+    fighters: Dict[str, Optional[Fighter]],
+) -> Optional[Dict[str, Any]]:
+    bundles, fight_hashes, input_hash = _map_reduce_inputs(event, fighters)
+
+    memo = await find_memoized_async(db, input_hash, scope="event")
+    if memo is not None:
+        return _reuse(event, memo)
+
+    memos = await find_memoized_many_async(db, fight_hashes, scope="fight")
+    analyses, pending = _split_memoized(fight_hashes, memos)
+    fresh = await analyze_fights_async([bundles[i] for i in pending])
+
+    to_save, failed = _collect_fresh(event, fight_hashes, pending, fresh, analyses)
+    await save_predictions_async(db, to_save)
+    if bundles and len(failed) == len(bundles):
         return None
 
-    save_prediction(db, event, analysis)
+    analysis = _card_analysis(event, analyses)
+    analysis["parlays"] = await asyncio.to_thread(reduce_parlays, analysis["fights"])
+    await save_predictions_async(db, _card_result(event, analysis, failed, input_hash))
     return analysis
+
+
+async def analyze_event_async(
+    db: AsyncSession,
+    event: Event,
+    mode: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """analyze_event on an AsyncSession; same modes, memoization and output."""
+    mode = _resolve_mode(mode)
+
+    fighters, missing = await find_fighters_async(db, _card_names(event))
+    _warn_missing(event, missing)
+
+    if mode == "single":
+        analysis = await _analyze_event_single_async(db, event, fighters)
+    else:
+        analysis = await _analyze_event_map_reduce_async(db, event, fighters)
+
+    return _with_missing(analysis, missing)
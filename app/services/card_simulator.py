@@ -0,0 +1,317 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.parlay_optimizer import fighter_name, side_probabilities, optimize_parlays
+from app.services.prediction_engine import METHODS, METHOD_PRIOR
+from app.utils.names import normalize_name
+from app.utils.odds_math import (
+    parse_american,
+    american_to_decimal,
+    no_vig_probabilities,
+)
+
+logger = logging.getLogger(__name__)
+
+_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+# ---------------------------------------------------------
+# Inputs: per-fight probabilities (model blended with the market)
+# ---------------------------------------------------------
+def _method_mix(prediction: Dict[str, Any]) -> np.ndarray:
+    dist = prediction.get("method_distribution") or {}
+    mix = np.array([float(dist.get(m) or 0.0) for m in METHODS])
+    if mix.sum() <= 0:
+        return METHOD_PRIOR.copy()
+    return mix / mix.sum()
+
+
+def fight_inputs(fights: List[Dict[str, Any]], market_weight: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Pipeline results ({fighter_a, fighter_b, odds, prediction}) or flat
+    {fighter_a, fighter_b, odds_a, odds_b, win_probability, method_distribution}
+    → P(A wins) = market_weight × no-vig odds + (1 − market_weight) × model.
+    The market side is the consensus fair probability when the odds carry one.
+    Whichever side is missing, the other is used alone; neither → 0.5.
+    """
+    w = settings.SIM_MARKET_WEIGHT if market_weight is None else market_weight
+    inputs = []
+
+    for fight in fights:
+        name_a, name_b = fighter_name(fight.get("fighter_a")), fighter_name(fight.get("fighter_b"))
+        if not name_a or not name_b:
+            raise ValueError("Every fight needs fighter_a and fighter_b.")
+
+        prediction = fight.get("prediction") or fight
+        if isinstance(prediction.get("win_probability"), (int, float)):
+            prediction = {**prediction, "win_probability": {"fighter_a": prediction["win_probability"]}}
+        sides = side_probabilities(prediction, name_a, name_b)
+        model = sides[0] if sides else None
+
+        odds = fight.get("odds") or fight
+        odds_a, odds_b = parse_american(odds.get("odds_a")), parse_american(odds.get("odds_b"))
+        # Scraped odds carry the all-book consensus; else de-vig the one line
+        market = odds.get("fair_probability_a")
+        if market is None and not (np.isnan(odds_a) or np.isnan(odds_b)):
+            market = float(no_vig_probabilities(odds_a, odds_b)[0])
+
+        if model is not None and market is not None:
+            p_a = w * market + (1.0 - w) * model
+        else:
+            p_a = next((p for p in (model, market) if p is not None), 0.5)
+
+        inputs.append({
+            "fighter_a": name_a,
+            "fighter_b": name_b,
+            "p_a": p_a,
+            "model": model,
+            "market": market,
+            "decimal_a": float(american_to_decimal(odds_a)),
+            "decimal_b": float(american_to_decimal(odds_b)),
+            "methods": _method_mix(prediction),
+        })
+
+    return inputs
+
+
+# ---------------------------------------------------------
+# Parlays → leg arrays
+# ---------------------------------------------------------
+def _parlay_specs(parlays: List[Dict[str, Any]], inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Resolve each leg ({"fighter", optional "method"}) to (fight, side,
+    method index). Payout: the parlay's own decimal_odds/american_odds,
+    else the product of the legs' moneylines.
+    """
+    sides: Dict[str, Tuple[int, int]] = {}
+    for i, f in enumerate(inputs):
+        sides[normalize_name(f["fighter_a"])] = (i, 0)
+        sides[normalize_name(f["fighter_b"])] = (i, 1)
+
+    specs = []
+    for parlay in parlays:
+        legs = parlay.get("legs") or []
+        if not legs:
+            raise ValueError("Every parlay needs at least one leg.")
+
+        resolved = []
+        for leg in legs:
+            name = leg.get("fighter") if isinstance(leg, dict) else leg
+            if normalize_name(name) not in sides:
+                raise ValueError(f"Parlay leg '{name}' is not on this card.")
+            fight, side = sides[normalize_name(name)]
+            method = leg.get("method") if isinstance(leg, dict) else None
+            if method is not None and method not in METHODS:
+                raise ValueError(f"Leg method must be one of: {', '.join(METHODS)}")
+            resolved.append((fight, side, METHODS.index(method) if method else -1))
+
+        if len({fight for fight, _, _ in resolved}) != len(resolved):
+            raise ValueError("A parlay can hold only one leg per fight.")
+
+        decimal = parlay.get("decimal_odds")
+        if decimal is None and parlay.get("american_odds") is not None:
+            decimal = float(american_to_decimal(parse_american(parlay["american_odds"])))
+        if decimal is None:
+            if any(m >= 0 for _, _, m in resolved):
+                raise ValueError("Method legs need the parlay's decimal_odds or american_odds.")
+            decimal = float(np.prod([inputs[f][("decimal_a", "decimal_b")[s]] for f, s, _ in resolved]))
+        if not decimal or np.isnan(decimal):
+            raise ValueError("Parlay has no price: a leg is missing its line.")
+
+        specs.append({
+            "legs": resolved,
+            "names": [inputs[f][("fighter_a", "fighter_b")[s]] for f, s, _ in resolved],
+            "decimal": float(decimal),
+            "stake": float(parlay.get("stake") or 1.0),
+        })
+
+    return specs
+
+
+# ---------------------------------------------------------
+# Sampling (chunked; each chunk is one vectorized pass)
+# ---------------------------------------------------------
+def simulate_arrays(
+    p_a: np.ndarray,
+    methods: np.ndarray,
+    specs: List[Dict[str, Any]],
+    draws: int,
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Sample `draws` full-card outcomes: winner ~ Bernoulli(p_a) and method
+    ~ methods[fight] per fight. Returns per-fight tallies and a count of
+    every joint parlay hit pattern (bit j = parlay j hit), so payouts
+    are exact per pattern and no per-draw arrays are kept.
+
+    The method is drawn independently of the winner: predictions carry
+    one method mix per bout, not one per side, so a "fighter by method"
+    leg hits with P(side) × P(method).
+    """
+    rng = np.random.default_rng(seed)
+    chunk_size = chunk_size or settings.SIM_CHUNK_SIZE
+    n_fights, n_parlays = len(p_a), len(specs)
+
+    cdf = np.cumsum(methods, axis=1)[:, :-1]     # (F, 2) method thresholds
+    bits = 1 << np.arange(n_parlays)
+
+    a_wins = np.zeros(n_fights, dtype=np.int64)
+    method_counts = np.zeros((n_fights, len(METHODS)), dtype=np.int64)
+    patterns = np.zeros(1 << n_parlays, dtype=np.int64)
+
+    for start in range(0, draws, chunk_size):
+        n = min(chunk_size, draws - start)
+
+        winner_b = rng.random((n, n_fights)) >= p_a                       # (n, F): True = B won
+        method = (rng.random((n, n_fights))[:, :, None] >= cdf).sum(axis=2)  # (n, F) in 0..2
+
+        a_wins += n - winner_b.sum(axis=0)
+        for m in range(len(METHODS)):
+            method_counts[:, m] += (method == m).sum(axis=0)
+
+        if n_parlays:
+            hits = np.ones((n, n_parlays), dtype=bool)
+            for j, spec in enumerate(specs):
+                for fight, side, m in spec["legs"]:
+                    hits[:, j] &= winner_b[:, fight] == bool(side)
+                    if m >= 0:
+                        hits[:, j] &= method[:, fight] == m
+            patterns += np.bincount(hits.astype(np.int64) @ bits, minlength=len(patterns))
+
+    return {"a_wins": a_wins, "method_counts": method_counts, "patterns": patterns}
+
+
+# ---------------------------------------------------------
+# Summaries
+# ---------------------------------------------------------
+def _weighted_percentiles(values: np.ndarray, weights: np.ndarray) -> Dict[str, float]:
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order]) / weights.sum()
+    return {
+        f"p{q}": round(float(values[order][np.searchsorted(cumulative, q / 100.0)]), 4)
+        for q in _PERCENTILES
+    }
+
+
+def _portfolio(specs: List[Dict[str, Any]], patterns: np.ndarray, draws: int, bankroll: float) -> Dict[str, Any]:
+    """P&L distribution of staking every parlay once, exact per hit pattern."""
+    stakes = np.array([s["stake"] for s in specs])
+    returns = stakes * np.array([s["decimal"] for s in specs])
+
+    codes = np.arange(len(patterns))
+    hit_matrix = (codes[:, None] >> np.arange(len(specs))) & 1         # (2^P, P)
+    pnl = hit_matrix @ returns - stakes.sum()
+    prob = patterns / draws
+
+    mean = float(prob @ pnl)
+    variance = float(prob @ (pnl - mean) ** 2)
+
+    seen = prob > 0
+    values, inverse = np.unique(np.round(pnl[seen], 2), return_inverse=True)
+    merged = np.bincount(inverse, weights=prob[seen])
+
+    return {
+        "total_stake": round(float(stakes.sum()), 2),
+        "expected_pnl": round(mean, 4),
+        "std": round(variance ** 0.5, 4),
+        "variance": round(variance, 4),
+        "percentiles": _weighted_percentiles(pnl[seen], prob[seen]),
+        "p_profit": round(float(prob[pnl > 0].sum()), 4),
+        "p_lose_all": round(float(prob[pnl <= -stakes.sum()].sum()), 4),
+        "parlays_hit": {
+            str(k): round(float(prob[hit_matrix.sum(axis=1) == k].sum()), 4)
+            for k in range(len(specs) + 1)
+        },
+        "distribution": [
+            {"pnl": float(v), "probability": round(float(p), 6)}
+            for v, p in zip(values, merged)
+        ],
+        "bankroll": {
+            "start": bankroll,
+            "expected_end": round(bankroll + mean, 2),
+            "std_pct": round(100.0 * variance ** 0.5 / bankroll, 2) if bankroll else None,
+        },
+    }
+
+
+def simulate_card(
+    fights: List[Dict[str, Any]],
+    parlays: Optional[List[Dict[str, Any]]] = None,
+    draws: Optional[int] = None,
+    seed: Optional[int] = None,
+    market_weight: Optional[float] = None,
+    bankroll: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Monte Carlo over the whole card. parlays default to the optimizer's
+    picks (scored on the same blended probabilities). The same seed and
+    inputs reproduce the same result.
+    """
+    draws = draws or settings.SIM_DRAWS
+    if not 0 < draws <= settings.SIM_MAX_DRAWS:
+        raise ValueError(f"draws must be between 1 and {settings.SIM_MAX_DRAWS}.")
+    if not fights:
+        raise ValueError("fights must be a non-empty list.")
+
+    inputs = fight_inputs(fights, market_weight)
+    bankroll = settings.SIM_BANKROLL if bankroll is None else bankroll
+
+    if parlays is None:
+        parlays = optimize_parlays([
+            {
+                "fighter_a": f["fighter_a"],
+                "fighter_b": f["fighter_b"],
+                "odds": (fight.get("odds") or fight),
+                "prediction": {"win_probability": {"fighter_a": f["p_a"], "fighter_b": 1.0 - f["p_a"]}},
+            }
+            for f, fight in zip(inputs, fights)
+        ])
+    if len(parlays) > settings.SIM_MAX_PARLAYS:
+        raise ValueError(f"At most {settings.SIM_MAX_PARLAYS} parlays per simulation.")
+
+    specs = _parlay_specs(parlays, inputs)
+    p_a = np.array([f["p_a"] for f in inputs])
+    methods = np.stack([f["methods"] for f in inputs])
+
+    out = simulate_arrays(p_a, methods, specs, draws, seed=seed)
+    logger.info(f"Simulated {draws} card outcomes ({len(inputs)} fights, {len(specs)} parlays)")
+
+    patterns = out["patterns"]
+    codes = np.arange(len(patterns))
+    parlay_summaries = []
+    for j, spec in enumerate(specs):
+        hit_rate = float(patterns[(codes >> j) & 1 == 1].sum()) / draws
+        parlay_summaries.append({
+            "legs": spec["names"],
+            "stake": spec["stake"],
+            "decimal_odds": round(spec["decimal"], 2),
+            "hit_rate": round(hit_rate, 4),
+            "expected_return": round(spec["stake"] * (hit_rate * spec["decimal"] - 1.0), 4),
+        })
+
+    return {
+        "draws": draws,
+        "seed": seed,
+        "fights": [
+            {
+                "fighter_a": f["fighter_a"],
+                "fighter_b": f["fighter_b"],
+                "win_probability": {
+                    "fighter_a": round(f["p_a"], 4),
+                    "model": None if f["model"] is None else round(f["model"], 4),
+                    "market": None if f["market"] is None else round(f["market"], 4),
+                    "simulated": round(float(out["a_wins"][i]) / draws, 4),
+                },
+                "method_rates": {
+                    m: round(float(c) / draws, 4) for m, c in zip(METHODS, out["method_counts"][i])
+                },
+            }
+            for i, f in enumerate(inputs)
+        ],
+        "parlays": parlay_summaries,
+        "portfolio": _portfolio(specs, patterns, draws, bankroll) if specs else None,
+    }
@@ -1,14 +1,23 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+import asyncio
 import logging
+import threading
+from typing import Optional, Dict, Any, List
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.config import settings
+from app.database import SessionLocal
 from app.models import Event  # ← REQUIRED IMPORT
+from app.services.alias_service import find_event, find_event_async
+from app.utils.http_client import http_get
+from app.utils.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
 UFC_EVENTS_URL = "http://ufcstats.com/statistics/events/upcoming"
+UFC_COMPLETED_URL = "http://ufcstats.com/statistics/events/completed"
 
 
 # ---------------------------------------------------------
@@ -22,7 +31,7 @@ def scrape_upcoming_ufc_event():
     """
 
     try:
-        resp = requests.get(UFC_EVENTS_URL, timeout=10)
+        resp = http_get(UFC_EVENTS_URL)
         resp.raise_for_status()
     except Exception as e:
         logger.error(f"Failed to fetch UFC events page: {e}")
@@ -80,12 +89,54 @@ def scrape_upcoming_ufc_event():
     return event_data
 
 
+# ---------------------------------------------------------
+# SCRAPE MOST RECENT COMPLETED EVENT
+# ---------------------------------------------------------
+def scrape_latest_completed_event():
+    """
+    Returns {"event_name", "event_date"} for the most recent event that has
+    already happened, or None. Used as a cheap "did anything change" probe.
+    """
+    try:
+        resp = http_get(UFC_COMPLETED_URL)
+        resp.raise_for_status()
+    except Exception as e:
+        logger.error(f"Failed to fetch UFC completed events page: {e}")
+        return None
+
+    soup = BeautifulSoup(resp.text, "html.parser")
+    today = datetime.utcnow().date()
+
+    for row in soup.select("table.b-statistics__table-events tbody tr"):
+        cols = row.find_all("td")
+        if not cols:
+            continue
+
+        link = cols[0].find("a")
+        date_elem = cols[0].find("span", class_="b-statistics__date")
+        if not link or not date_elem:
+            continue
+
+        try:
+            event_date = datetime.strptime(date_elem.get_text(strip=True), "%B %d, %Y").date()
+        except ValueError:
+            continue
+
+        # The listing can lead with the next (not yet completed) event
+        if event_date > today:
+            continue
+
+        return {"event_name": link.get_text(strip=True), "event_date": event_date}
+
+    return None
+
+
 # ---------------------------------------------------------
 # SCRAPE FIGHT CARD FOR AN EVENT PAGE
 # ---------------------------------------------------------
 def scrape_fight_card(event_url: str):
     try:
-        resp = requests.get(event_url, timeout=10)
+        resp = http_get(event_url)
         resp.raise_for_status()
     except Exception as e:
         logger.error(f"Failed to fetch UFC event page: {e}")
@@ -131,25 +182,17 @@ def load_next_event(db: Session):
 
     name = data["event_name"]
 
-    existing = (
-        db.query(Event)
-        .filter(Event.event_name.ilike(name))
-        .first()
-    )
+    existing = find_event(db, name)
 
     if existing:
         existing.event_date = data["event_date"]
         existing.location = data["location"]
         existing.fight_card_json = data.get("fight_card", [])
+        existing.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(existing)
 
-        return {
-            "event_name": existing.event_name,
-            "event_date": existing.event_date,
-            "location": existing.location,
-            "fight_card": existing.fight_card_json,
-        }
+        return event_to_dict(existing)
 
     new_event = Event(
         event_name=data["event_name"],
@@ -162,9 +205,170 @@ def load_next_event(db: Session):
     db.commit()
     db.refresh(new_event)
 
+    return event_to_dict(new_event)
+
+
+def event_to_dict(event: Event) -> Dict[str, Any]:
     return {
-        "event_name": new_event.event_name,
-        "event_date": new_event.event_date,
-        "location": new_event.location,
-        "fight_card": new_event.fight_card_json,
+        "event_name": event.event_name,
+        "event_date": event.event_date,
+        "location": event.location,
+        "fight_card": event.fight_card_json,
     }
+
+
+def get_event_by_name(db: Session, name: str) -> Optional[Event]:
+    if not name:
+        return None
+    return find_event(db, name)
+
+
+async def get_event_by_name_async(db: AsyncSession, name: str) -> Optional[Event]:
+    if not name:
+        return None
+    return await find_event_async(db, name)
+
+
+def get_latest_stored_event(db: Session) -> Optional[Event]:
+    """Soonest stored event that hasn't happened yet (last good copy)."""
+    today = datetime.utcnow().date().isoformat()
+    return (
+        db.query(Event)
+        .filter(Event.event_date >= today)
+        .order_by(Event.event_date.asc(), Event.updated_at.desc())
+        .first()
+    )
+
+
+def load_all_upcoming_events(db: Session) -> List[Dict[str, Any]]:
+    """Every stored event that hasn't happened yet, soonest first (one row per event)."""
+    today = datetime.utcnow().date().isoformat()
+    rows = (
+        db.query(Event)
+        .filter(Event.event_date >= today)
+        .order_by(Event.event_date.asc(), Event.updated_at.desc())
+        .all()
+    )
+
+    latest: Dict[str, Event] = {}
+    for event in rows:
+        latest.setdefault(event.event_name_normalized or event.event_name, event)
+    return [event_to_dict(e) for e in latest.values()]
+
+
+# ---------------------------------------------------------
+# CACHED NEXT EVENT (TTL + stale-while-revalidate)
+# ---------------------------------------------------------
+class NextEventCache:
+    """
+    - fresh (younger than TTL) → served from memory, no scrape, no DB write
+    - stale → served immediately; one background thread re-scrapes
+    - upstream down → keep serving the last good copy (memory or DB)
+    """
+
+    def __init__(self):
+        self._value: Optional[Dict[str, Any]] = None
+        self._fetched_at: Optional[datetime] = None
+        self._last_attempt: Optional[datetime] = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        if self._fetched_at is None:
+            return False
+        age = (datetime.utcnow() - self._fetched_at).total_seconds()
+        return age < settings.NEXT_EVENT_TTL_SECONDS
+
+    def _store(self, value: Dict[str, Any], fetched_at: datetime) -> None:
+        with self._lock:
+            self._value = value
+            self._fetched_at = fetched_at
+
+    def _refresh(self, db: Session) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._last_attempt = datetime.utcnow()
+
+        data = load_next_event(db)
+        if data:
+            self._store(data, datetime.utcnow())
+        else:
+            logger.warning("Next-event refresh failed; serving last good copy.")
+        return data
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            if self._last_attempt is not None:
+                since = (datetime.utcnow() - self._last_attempt).total_seconds()
+                if since < settings.NEXT_EVENT_RETRY_SECONDS:
+                    return
+            self._refreshing = True
+
+        def _worker():
+            try:
+                with SessionLocal() as db:
+                    self._refresh(db)
+            except Exception as e:
+                logger.error(f"Background next-event refresh crashed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def get(self, db: Session) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._value
+            fresh = self._is_fresh()
+
+        if value is not None:
+            if not fresh:
+                self._refresh_in_background()
+            return value
+
+        # Cold process: serve the stored copy if we have one
+        stored = get_latest_stored_event(db)
+        if stored is not None:
+            self._store(event_to_dict(stored), stored.updated_at or stored.created_at)
+            if not self._is_fresh():
+                self._refresh_in_background()
+            return self._value
+
+        # Nothing anywhere → scrape synchronously (concurrent callers share it)
+        return single_flight.do(("next_event",), lambda: self._refresh(db))
+
+    async def get_async(self) -> Optional[Dict[str, Any]]:
+        """
+        get() for async routes: a warm cache is served without leaving the
+        event loop; a cold one is filled on a worker thread with its own session.
+        """
+        with self._lock:
+            value = self._value
+            fresh = self._is_fresh()
+
+        if value is not None:
+            if not fresh:
+                self._refresh_in_background()
+            return value
+
+        def _cold() -> Optional[Dict[str, Any]]:
+            with SessionLocal() as db:
+                return self.get(db)
+
+        return await asyncio.to_thread(_cold)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fetched_at = None
+
+
+next_event_cache = NextEventCache()
+
+
+def get_next_event_cached(db: Session) -> Optional[Dict[str, Any]]:
+    return next_event_cache.get(db)
+
+
+async def get_next_event_cached_async() -> Optional[Dict[str, Any]]:
+    return await next_event_cache.get_async()
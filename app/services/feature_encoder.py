@@ -0,0 +1,136 @@
+import json
+import logging
+from typing import Dict, Any, List, Optional, Callable
+
+from app.config import settings
+from app.models import Fighter
+from app.services.rating_service import fighter_rating
+from app.utils.ufcstats_parsing import (
+    parse_career_stats,
+    parse_attributes,
+    parse_result,
+    parse_opponent,
+    summarize_history,
+    history_row_current,
+    history_method,
+    history_round,
+)
+
+logger = logging.getLogger(__name__)
+
+# Keys the placeholder scrapers emit that carry no information for the model
+_PLACEHOLDER_KEYS = {"note", "sherdog_url", "tapology_url", "tapology_slug", "ufcstats_url"}
+
+
+# ---------------------------------------------------------
+# Token estimate (≈4 chars per token for English/JSON)
+# ---------------------------------------------------------
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def compact_json(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _drop_empty(d: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in d.items() if v not in (None, "", [], {})}
+
+
+# ---------------------------------------------------------
+# Per-source encoders
+# ---------------------------------------------------------
+def _encode_recent(history: List[Dict[str, Any]], limit: int, name: Optional[str] = None) -> List[List[Any]]:
+    """
+    Most recent completed fights as [result, opponent, method, round];
+    rows stored before the history columns were fixed are sent as
+    [result, opponent] only.
+    """
+    recent = []
+    for row in history or []:
+        result = parse_result(row.get("result"))
+        if result is None:  # upcoming bout rows ("next")
+            continue
+        fight = [
+            result[0].upper() if result != "nc" else "NC",
+            parse_opponent(row.get("opponent"), name),
+        ]
+        if history_row_current(row):
+            fight += [history_method(row), history_round(row)]
+        recent.append(fight)
+        if len(recent) >= limit:
+            break
+    return recent
+
+
+def _encode_extra(blob: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sherdog/Tapology: keep only real scraped fields, not identifiers/notes."""
+    return _drop_empty({k: v for k, v in (blob or {}).items() if k not in _PLACEHOLDER_KEYS})
+
+
+def encode_fighter(fighter: Optional[Fighter], recent_fights: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compact, numeric view of a stored fighter for prompts. Reads the
+    per-source blobs once (metadata_json only repeats them), parses the
+    UFCStats strings into numbers and keeps the N most recent fights.
+    """
+    if not fighter:
+        return {}
+
+    limit = settings.PROMPT_RECENT_FIGHTS if recent_fights is None else recent_fights
+    ufc = fighter.ufcstats_json or {}
+    history = ufc.get("fight_history") or []
+
+    physical = parse_attributes(ufc.get("attributes"))
+    physical.pop("dob", None)
+
+    # UFCStats lists career stats in the same <li> boxes as attributes
+    raw_stats = {**(ufc.get("attributes") or {}), **(ufc.get("career_stats") or {})}
+
+    rating = fighter_rating(fighter)
+
+    features = {
+        "rating": round(rating) if rating is not None else None,
+        "stats": _drop_empty(parse_career_stats(raw_stats)),
+        "physical": _drop_empty(physical),
+        "record": {k: v for k, v in summarize_history(history).items() if v},
+        "recent": _encode_recent(history, limit, fighter.name),
+        "sherdog": _encode_extra(fighter.sherdog_json),
+        "tapology": _encode_extra(fighter.tapology_json),
+    }
+
+    return _drop_empty(features)
+
+
+# ---------------------------------------------------------
+# Budget enforcement
+# ---------------------------------------------------------
+def fit_to_budget(
+    render: Callable[[], str],
+    features: List[Dict[str, Any]],
+    budget: int,
+) -> str:
+    """
+    Re-render until the prompt fits `budget` tokens, trimming the oldest
+    recent fight from whichever fighter has the most left. `features`
+    are the (already copied) dicts referenced by `render`.
+    """
+    text = render()
+
+    while estimate_tokens(text) > budget:
+        longest = max(features, key=lambda f: len(f.get("recent") or []), default=None)
+        if not longest or not longest.get("recent"):
+            logger.warning(f"Prompt still ~{estimate_tokens(text)} tokens (budget {budget}) after trimming fights")
+            break
+        longest["recent"].pop()
+        text = render()
+
+    return text
+
+
+def copy_features(features: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shallow copy with its own `recent` list so trimming doesn't leak."""
+    features = dict(features or {})
+    if "recent" in features:
+        features["recent"] = list(features["recent"])
+    return features
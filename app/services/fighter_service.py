@@ -1,26 +1,60 @@
 import logging
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from sqlalchemy import func, literal_column, null
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models import Fighter
-from app.utils.ufcstats_scraper import get_ufcstats_profile
-from app.utils.sherdog_scraper import get_sherdog_profile
-from app.utils.tapology_scraper import get_tapology_profile
+from app.services.alias_service import find_fighter, find_fighters, add_fighter_alias
+from app.services.identity_service import identity_index, scrape_with_identity
+from app.services.rating_service import rate_new_fights, rating_index
+from app.services.refresh_policy import plan_refresh
+from app.services.stats_service import apply_fighter_stats
+from app.utils.names import normalize_name
+from app.utils.single_flight import single_flight
+from app.utils.ufcstats_directory import ufcstats_directory
 
 logger = logging.getLogger(__name__)
 
 
 # -------------------------------------------------------
-# Helper: Get fighter by name (case-insensitive match)
+# Helper: Get fighter by name (accent/case-folded, aliases included)
 # -------------------------------------------------------
 def get_fighter_by_name(db: Session, name: str) -> Optional[Fighter]:
     if not name:
         return None
-    return (
-        db.query(Fighter)
-        .filter(Fighter.name.ilike(name.strip()))
-        .first()
-    )
+    return find_fighter(db, name)
+
+
+def get_fighters_by_names(db: Session, names: List[str]) -> Tuple[Dict[str, Fighter], List[str]]:
+    """Resolve a whole card at once: ({name: Fighter}, names not stored yet)."""
+    return find_fighters(db, names)
+
+
+def _record_source_name(db: Session, fighter: Fighter, ufcstats_data: Optional[Dict[str, Any]]) -> None:
+    """
+    UFCStats' spelling becomes an alias when it differs from ours, and our
+    spelling points the UFCStats directory at the scraped profile.
+    """
+    if ufcstats_data and ufcstats_data.get("name"):
+        add_fighter_alias(db, fighter, ufcstats_data["name"], source="ufcstats")
+    if fighter.ufcstats_id:
+        ufcstats_directory.add_alias(fighter.name, fighter.ufcstats_id)
+
+
+def _rate_new_history(db: Session, fighters: List[Fighter]) -> None:
+    """Incremental Elo update for bouts first seen in these (committed) histories."""
+    try:
+        changed = rate_new_fights(db, fighters)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Rating update failed: {e}")
+        return
+    rating_index.update(changed)
 
 
 # -------------------------------------------------------
@@ -33,6 +67,7 @@ def create_fighter(
     ufcstats_data: Optional[Dict[str, Any]],
     sherdog_data: Optional[Dict[str, Any]],
     tapology_data: Optional[Dict[str, Any]],
+    refreshed_at: Optional[Dict[str, str]] = None,
 ) -> Fighter:
 
     fighter = Fighter(
@@ -50,11 +85,28 @@ def create_fighter(
         ufcstats_json=ufcstats_data,
         sherdog_json=sherdog_data,
         tapology_json=tapology_data,
+
+        refreshed_at_json=refreshed_at or {},
     )
+    apply_fighter_stats(fighter)
+    _record_source_name(db, fighter, ufcstats_data)
 
     db.add(fighter)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker inserted the same name first — update its row instead
+        db.rollback()
+        existing = db.query(Fighter).filter(Fighter.name == name.strip()).first() or get_fighter_by_name(db, name)
+        if existing is None:
+            raise
+        logger.info(f"Fighter {name} was created concurrently; updating instead")
+        return update_fighter(
+            db, existing, metadata_json, ufcstats_data, sherdog_data, tapology_data, refreshed_at
+        )
     db.refresh(fighter)
+    if ufcstats_data:
+        _rate_new_history(db, [fighter])
 
     logger.info(f"Created new fighter record: {name}")
     return fighter
@@ -70,13 +122,20 @@ def update_fighter(
     ufcstats_data: Optional[Dict[str, Any]],
     sherdog_data: Optional[Dict[str, Any]],
     tapology_data: Optional[Dict[str, Any]],
+    refreshed_at: Optional[Dict[str, str]] = None,
 ) -> Fighter:
 
     fighter.metadata_json = metadata_json
 
+    if refreshed_at:
+        # new dict so SQLAlchemy sees the JSON change
+        fighter.refreshed_at_json = {**(fighter.refreshed_at_json or {}), **refreshed_at}
+
     if ufcstats_data:
         fighter.ufcstats_json = ufcstats_data
         fighter.ufcstats_id = ufcstats_data.get("ufcstats_url")
+        apply_fighter_stats(fighter)
+        _record_source_name(db, fighter, ufcstats_data)
 
     if sherdog_data:
         fighter.sherdog_json = sherdog_data
@@ -88,48 +147,108 @@ def update_fighter(
 
     db.commit()
     db.refresh(fighter)
+    if ufcstats_data:
+        _rate_new_history(db, [fighter])
 
     logger.info(f"Updated fighter record: {fighter.name}")
     return fighter
 
 
 # -------------------------------------------------------
-# MAIN SERVICE
+# Source scraping (no DB access — safe to run in threads)
 # -------------------------------------------------------
-def load_fighter_data(db: Session, name: str) -> Fighter:
-    """
-    Creates or updates a fighter entry with:
-    - UFCStats
-    - Sherdog
-    - Tapology
-    """
+SOURCES = ("ufcstats", "sherdog", "tapology")
 
-    fighter = get_fighter_by_name(db, name)
 
-    # Scrapers (all safe)
+def scrape_source(
+    source: str,
+    name: str,
+    known_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Run one source scraper; failures are logged and return None.
+    Concurrent scrapes of the same (source, fighter) share one request.
+    """
+    key = ("scrape", source, normalize_name(name))
     try:
-        ufcstats_data = get_ufcstats_profile(name)
+        return single_flight.do(key, lambda: scrape_with_identity(source, name, known_id=known_id))
     except Exception as e:
-        logger.error(f"UFCStats failed for {name}: {e}")
-        ufcstats_data = None
+        logger.error(f"{source} failed for {name}: {e}")
+        return None
 
-    try:
-        sherdog_data = get_sherdog_profile(name)
-    except Exception as e:
-        logger.error(f"Sherdog failed for {name}: {e}")
-        sherdog_data = None
 
-    try:
-        tapology_data = get_tapology_profile(name)
-    except Exception as e:
-        logger.error(f"Tapology failed for {name}: {e}")
-        tapology_data = None
+def scrape_fighter_sources(
+    name: str,
+    tapology_map: Optional[Dict[str, Any]] = None,
+    known_ids: Optional[Dict[str, Optional[str]]] = None,
+    sources: Optional[List[str]] = None,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Scrape UFCStats, Sherdog and Tapology (or just `sources`) for one
+    fighter in parallel. A pre-resolved Tapology profile (from tapology_map)
+    skips that lookup; known_ids skip URL/slug resolution for sources
+    already verified.
+    """
+    known_ids = known_ids or {}
+    wanted = list(SOURCES if sources is None else sources)
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    if "tapology" in wanted and tapology_map and tapology_map.get(name):
+        results["tapology"] = tapology_map[name]
+
+    pending = [s for s in wanted if s not in results]
+    if not pending:
+        return results
+
+    with ThreadPoolExecutor(max_workers=len(SOURCES)) as pool:
+        futures = {
+            s: pool.submit(scrape_source, s, name, known_ids.get(s))
+            for s in pending
+        }
+        for source, future in futures.items():
+            results[source] = future.result()
+
+    return results
+
+
+# -------------------------------------------------------
+# Persist scraped sources
+# -------------------------------------------------------
+def store_fighter(
+    db: Session,
+    name: str,
+    sources: Dict[str, Optional[Dict[str, Any]]],
+    fighter: Optional[Fighter] = None,
+    confirmed: Optional[List[str]] = None,
+) -> Fighter:
+    """
+    Create or update the fighter row from already-scraped source data.
+    `sources` may hold only the sources that were re-scraped; the others
+    keep their stored data. `confirmed` sources were proven unchanged and
+    only get their refresh timestamp bumped.
+    """
+    ufcstats_data = sources.get("ufcstats")
+    sherdog_data = sources.get("sherdog")
+    tapology_data = sources.get("tapology")
+
+    if fighter is None:
+        fighter = get_fighter_by_name(db, name)
+
+    now = datetime.utcnow().isoformat()
+    refreshed_at = {s: now for s, data in sources.items() if data}
+    refreshed_at.update({s: now for s in confirmed or []})
+
+    # Combined metadata (sources not re-scraped, or failed, keep their stored blob)
+    def _current(source: str) -> Optional[Dict[str, Any]]:
+        data = sources.get(source)
+        if data or fighter is None:
+            return data
+        return getattr(fighter, f"{source}_json")
 
-    # Combined metadata
     combined_meta = {
-        "ufcstats": ufcstats_data,
-        "sherdog": sherdog_data,
-        "tapology": tapology_data,
+        "ufcstats": _current("ufcstats"),
+        "sherdog": _current("sherdog"),
+        "tapology": _current("tapology"),
     }
 
     if fighter is None:
@@ -140,8 +259,12 @@ def load_fighter_data(db: Session, name: str) -> Fighter:
             ufcstats_data=ufcstats_data,
             sherdog_data=sherdog_data,
             tapology_data=tapology_data,
+            refreshed_at=refreshed_at,
         )
 
+    if not sources and not confirmed:
+        return fighter  # everything fresh — no write
+
     return update_fighter(
         db=db,
         fighter=fighter,
@@ -149,4 +272,200 @@ def load_fighter_data(db: Session, name: str) -> Fighter:
         ufcstats_data=ufcstats_data,
         sherdog_data=sherdog_data,
         tapology_data=tapology_data,
+        refreshed_at=refreshed_at,
+    )
+
+
+# -------------------------------------------------------
+# Bulk upsert (one transaction for a whole batch)
+# -------------------------------------------------------
+_SOURCE_IDS = {
+    "ufcstats": ("ufcstats_id", "ufcstats_url"),
+    "sherdog": ("sherdog_url", "sherdog_url"),
+    "tapology": ("tapology_slug", "tapology_slug"),
+}
+
+
+def _upsert_values(
+    name: str,
+    sources: Dict[str, Optional[Dict[str, Any]]],
+    fighter: Optional[Fighter],
+    confirmed: Optional[List[str]],
+    now: datetime,
+) -> Dict[str, Any]:
+    """Column values for one fighter, merged the same way store_fighter does."""
+    stamp = now.isoformat()
+    refreshed_at = {s: stamp for s, data in sources.items() if data}
+    refreshed_at.update({s: stamp for s in confirmed or []})
+
+    def _current(source: str) -> Optional[Dict[str, Any]]:
+        data = sources.get(source)
+        if data or fighter is None:
+            return data
+        return getattr(fighter, f"{source}_json")
+
+    canonical = fighter.name if fighter is not None else name.strip()
+    values = {
+        "name": canonical,
+        "name_normalized": normalize_name(canonical),
+        "metadata_json": {s: _current(s) for s in SOURCES},
+        "refreshed_at_json": {**((fighter.refreshed_at_json or {}) if fighter else {}), **refreshed_at},
+        "created_at": now,
+        "updated_at": now,
+    }
+
+    for source, (column, key) in _SOURCE_IDS.items():
+        data = sources.get(source)
+        # SQL NULL (not JSON null) so the conflict update keeps the stored blob
+        values[f"{source}_json"] = data if data else null()
+        values[column] = data.get(key) if data else None
+
+    return values
+
+
+def _dialect_insert(db: Session):
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert
+    if name == "sqlite":
+        return sqlite.insert
+    return None
+
+
+def bulk_upsert_fighters(db: Session, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Write a batch of scraped profiles with one INSERT ... ON CONFLICT
+    (name_normalized) DO UPDATE and a single commit, so two spellings of
+    one fighter ingested concurrently still land on one row.
+
+    batch items: {"name", "sources": {source: data}, "fighter": Fighter | None,
+                  "confirmed": [sources proven unchanged]}
+
+    Sources not in "sources" (or that failed) keep their stored blob and id,
+    also when another worker inserted the same fighter concurrently.
+    Returns {"fighters": {name: Fighter}, "inserted": [...], "updated": [...]}.
+    """
+    fighters: Dict[str, Fighter] = {}
+    now = datetime.utcnow()
+    rows: Dict[str, Dict[str, Any]] = {}
+    requested: Dict[str, List[str]] = {}
+    scraped_ufcstats: Dict[str, Dict[str, Any]] = {}
+
+    for item in batch:
+        name, fighter = item["name"], item.get("fighter")
+        sources, confirmed = item.get("sources") or {}, item.get("confirmed")
+
+        if fighter is not None and not sources and not confirmed:
+            fighters[name] = fighter  # everything fresh — no write
+            continue
+
+        values = _upsert_values(name, sources, fighter, confirmed, now)
+        key = values["name_normalized"]
+        rows[key] = values  # Postgres rejects one row twice per statement
+        requested.setdefault(key, []).append(name)
+        if sources.get("ufcstats"):
+            scraped_ufcstats[key] = sources["ufcstats"]
+
+    if not rows:
+        return {"fighters": fighters, "inserted": [], "updated": []}
+
+    insert = _dialect_insert(db)
+    if insert is None:
+        # No ON CONFLICT support: fall back to the per-row path
+        inserted, updated = [], []
+        for item in batch:
+            if item["name"] in fighters:
+                continue
+            (updated if item.get("fighter") is not None else inserted).append(item["name"])
+            fighters[item["name"]] = store_fighter(
+                db, item["name"], item.get("sources") or {}, item.get("fighter"), item.get("confirmed")
+            )
+        return {"fighters": fighters, "inserted": inserted, "updated": updated}
+
+    table = Fighter.__table__
+    stmt = insert(table).values(list(rows.values()))
+    excluded = stmt.excluded
+
+    set_ = {
+        "metadata_json": excluded.metadata_json,
+        "refreshed_at_json": excluded.refreshed_at_json,
+        "updated_at": excluded.updated_at,
+    }
+    for source, (column, _) in _SOURCE_IDS.items():
+        for col in (f"{source}_json", column):
+            set_[col] = func.coalesce(excluded[col], table.c[col])
+
+    # The stored spelling is kept on conflict; only the data is refreshed
+    stmt = stmt.on_conflict_do_update(index_elements=[table.c.name_normalized], set_=set_)
+
+    if insert is postgresql.insert:
+        # xmax = 0 only for rows this statement inserted
+        stmt = stmt.returning(
+            table.c.id, table.c.name_normalized, literal_column("(xmax = 0)").label("inserted")
+        )
+        result = db.execute(stmt).all()
+        created = {r.name_normalized for r in result if r.inserted}
+    else:
+        before = {
+            k for (k,) in db.query(Fighter.name_normalized).filter(Fighter.name_normalized.in_(list(rows))).all()
+        }
+        result = db.execute(stmt.returning(table.c.id, table.c.name_normalized)).all()
+        created = {r.name_normalized for r in result} - before
+
+    stored = (
+        db.query(Fighter)
+        .filter(Fighter.id.in_([r.id for r in result]))
+        .populate_existing()
+        .all()
+    )
+
+    for fighter in stored:
+        key = fighter.name_normalized
+        if key in scraped_ufcstats:
+            apply_fighter_stats(fighter)
+            _record_source_name(db, fighter, scraped_ufcstats[key])
+        for name in requested.get(key, []):
+            fighters[name] = fighter
+
+    db.commit()
+    _rate_new_history(db, [f for f in stored if f.name_normalized in scraped_ufcstats])
+
+    inserted = [n for canonical in created for n in requested.get(canonical, [])]
+    updated = [n for canonical in rows if canonical not in created for n in requested.get(canonical, [])]
+    logger.info(f"Upserted {len(rows)} fighters in one transaction ({len(created)} new)")
+
+    return {"fighters": fighters, "inserted": inserted, "updated": updated}
+
+
+# -------------------------------------------------------
+# MAIN SERVICE
+# -------------------------------------------------------
+def load_fighter_data(
+    db: Session,
+    name: str,
+    tapology_map: Optional[Dict[str, Any]] = None,
+    on_card: bool = False,
+    force: bool = False,
+) -> Fighter:
+    """
+    Creates or updates a fighter entry with:
+    - UFCStats
+    - Sherdog
+    - Tapology
+    Only sources past their TTL (shorter when on_card) and actually changed
+    are re-scraped, concurrently; stored identifiers are reused so only new
+    fighters (or failed ids) go through resolution.
+    """
+    fighter = get_fighter_by_name(db, name)
+    to_scrape, confirmed = plan_refresh(fighter, on_card=on_card, force=force)
+
+    if fighter is not None and not to_scrape and not confirmed:
+        logger.info(f"Fighter data fresh, skipping scrape: {name}")
+        return fighter
+
+    known_ids = identity_index.seed(fighter)
+
+    sources = scrape_fighter_sources(
+        name, tapology_map=tapology_map, known_ids=known_ids, sources=to_scrape
     )
+    return store_fighter(db, name, sources, fighter=fighter, confirmed=confirmed)
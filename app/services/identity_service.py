@@ -0,0 +1,167 @@
+import logging
+import threading
+from typing import Optional, Dict, Any, Callable, List
+
+from app.models import Fighter
+from app.utils.identity_batch import resolve_identities_batch
+from app.utils.names import normalize_name
+from app.utils.ufcstats_directory import ufcstats_directory
+from app.utils.ufcstats_scraper import resolve_ufcstats_url, fetch_ufcstats_profile
+from app.utils.sherdog_scraper import resolve_sherdog_url, fetch_sherdog_profile
+from app.utils.tapology_scraper import resolve_tapology_slug, fetch_tapology_profile
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------
+# Source registry: Fighter column + resolve / fetch steps
+# -------------------------------------------------------
+IDENTITY_COLUMNS = {
+    "ufcstats": "ufcstats_id",
+    "sherdog": "sherdog_url",
+    "tapology": "tapology_slug",
+}
+
+_RESOLVERS: Dict[str, Callable[[str], Optional[str]]] = {
+    "ufcstats": resolve_ufcstats_url,
+    "sherdog": resolve_sherdog_url,
+    "tapology": resolve_tapology_slug,
+}
+
+_FETCHERS: Dict[str, Callable[[str], Optional[Dict[str, Any]]]] = {
+    "ufcstats": fetch_ufcstats_profile,
+    "sherdog": fetch_sherdog_profile,
+    "tapology": fetch_tapology_profile,
+}
+
+
+def _index_key(name: str) -> str:
+    return normalize_name(name)
+
+
+# -------------------------------------------------------
+# Identity index: name → verified per-source identifiers
+# -------------------------------------------------------
+class IdentityIndex:
+    """
+    In-memory map of identifiers that have produced a successful scrape.
+    Seeded from Fighter rows; updated as scrapes succeed or fail.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, source: str) -> Optional[str]:
+        with self._lock:
+            return self._ids.get(_index_key(name), {}).get(source)
+
+    def set(self, name: str, source: str, identifier: str) -> None:
+        with self._lock:
+            self._ids.setdefault(_index_key(name), {})[source] = identifier
+
+    def invalidate(self, name: str, source: str) -> None:
+        with self._lock:
+            self._ids.get(_index_key(name), {}).pop(source, None)
+
+    def seed(self, fighter: Optional[Fighter]) -> Dict[str, Optional[str]]:
+        """Load stored identifiers for a fighter row and return them."""
+        known = known_identifiers(fighter)
+        if fighter is not None:
+            for source, identifier in known.items():
+                if identifier:
+                    self.set(fighter.name, source, identifier)
+        return known
+
+
+identity_index = IdentityIndex()
+
+
+def known_identifiers(fighter: Optional[Fighter]) -> Dict[str, Optional[str]]:
+    """Stored identifiers are only written after a successful scrape."""
+    if fighter is None:
+        return {source: None for source in IDENTITY_COLUMNS}
+
+    return {
+        source: getattr(fighter, column)
+        for source, column in IDENTITY_COLUMNS.items()
+    }
+
+
+# -------------------------------------------------------
+# Card-level resolution (one batched GPT call for the gaps)
+# -------------------------------------------------------
+def batch_resolve_missing(
+    wanted: Dict[str, List[str]],
+    known_ids: Dict[str, Dict[str, Optional[str]]],
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    wanted: {name: [sources about to be scraped]}
+    Fills known_ids in place for every wanted (name, source) without an id:
+    1. identity index (verified earlier in this process)
+    2. UFCStats directory (local, no GPT)
+    3. everything still missing → resolve_identities_batch, one request per chunk
+    Batch answers are hints: if one fails to fetch, scrape_with_identity
+    falls back to single-name resolution.
+    """
+    unresolved: Dict[str, List[str]] = {}
+
+    for name, sources in wanted.items():
+        ids = known_ids.setdefault(name, {})
+        for source in sources:
+            if ids.get(source):
+                continue
+
+            ids[source] = identity_index.get(name, source)
+            if not ids[source] and source == "ufcstats":
+                ids[source] = ufcstats_directory.lookup(name)
+
+            if not ids[source]:
+                unresolved.setdefault(name, []).append(source)
+
+    if not unresolved:
+        return known_ids
+
+    needed_sources = {s for sources in unresolved.values() for s in sources}
+    resolved = resolve_identities_batch(unresolved.keys(), sources=needed_sources)
+
+    for name, sources in unresolved.items():
+        for source in sources:
+            known_ids[name][source] = resolved.get(name, {}).get(source)
+
+    return known_ids
+
+
+# -------------------------------------------------------
+# Resolve-once scrape
+# -------------------------------------------------------
+def scrape_with_identity(
+    source: str,
+    name: str,
+    known_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    1. Known identifier (argument or index) → fetch the profile page directly
+    2. New fighter, or the known identifier failed → resolve, then fetch
+    """
+    fetch = _FETCHERS[source]
+    identifier = known_id or identity_index.get(name, source)
+
+    if identifier:
+        profile = fetch(identifier)
+        if profile:
+            identity_index.set(name, source, identifier)
+            return profile
+
+        logger.warning(f"Known {source} id failed for {name} ({identifier}); re-resolving.")
+        identity_index.invalidate(name, source)
+
+    identifier = _RESOLVERS[source](name)
+    if not identifier:
+        return None
+
+    profile = fetch(identifier)
+    if profile:
+        identity_index.set(name, source, identifier)
+
+    return profile
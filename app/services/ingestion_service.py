@@ -0,0 +1,88 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Fighter
+from app.services.fighter_service import (
+    get_fighters_by_names,
+    scrape_source,
+    bulk_upsert_fighters,
+)
+from app.services.identity_service import identity_index, batch_resolve_missing
+from app.services.refresh_policy import plan_refresh
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------
+# Concurrent ingestion for a whole card
+# -------------------------------------------------------
+def ingest_fighters(
+    db: Session,
+    names: List[str],
+    tapology_map: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+    on_card: bool = False,
+    force: bool = False,
+) -> Dict[str, Fighter]:
+    """
+    Scrape every (fighter, source) pair on one bounded thread pool, then
+    write the rows from the calling thread (the Session is not thread-safe).
+    Existing rows contribute their verified identifiers, so those sources
+    go straight to the profile page, and only sources the refresh policy
+    marks stale (shorter TTL when on_card) are scraped at all. Identifiers
+    still missing are resolved for the whole card in one batched GPT call.
+
+    max_workers caps the total fan-out across all fighters and sources.
+    """
+    tapology_map = tapology_map or {}
+    names = list(dict.fromkeys(n for n in names if n))
+    workers = max(1, max_workers or settings.INGEST_MAX_WORKERS)
+
+    scraped: Dict[str, Dict[str, Optional[Dict[str, Any]]]] = {n: {} for n in names}
+
+    stored, missing = get_fighters_by_names(db, names)
+    existing = {n: stored.get(n) for n in names}
+    if missing:
+        logger.info(f"{len(missing)} fighters not stored yet: {', '.join(missing)}")
+    known_ids = {n: identity_index.seed(existing[n]) for n in names}
+    plans = {n: plan_refresh(existing[n], on_card=on_card, force=force) for n in names}
+
+    # One batched resolution for every (fighter, source) we can't identify yet
+    wanted = {
+        n: [s for s in plans[n][0] if not (s == "tapology" and tapology_map.get(n))]
+        for n in names
+    }
+    batch_resolve_missing(wanted, known_ids)
+
+    stale = sum(1 for n in names if plans[n][0])
+    logger.info(f"Ingesting {len(names)} fighters ({stale} stale) with {workers} workers...")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+
+        for name in names:
+            to_scrape, _ = plans[name]
+            for source in to_scrape:
+                if source == "tapology" and tapology_map.get(name):
+                    scraped[name]["tapology"] = tapology_map[name]
+                    continue
+                futures[(name, source)] = pool.submit(
+                    scrape_source, source, name, known_ids[name].get(source)
+                )
+
+        for (name, source), future in futures.items():
+            scraped[name][source] = future.result()
+
+    # One transaction for the whole batch
+    result = bulk_upsert_fighters(db, [
+        {"name": n, "sources": scraped[n], "fighter": existing[n], "confirmed": plans[n][1]}
+        for n in names
+    ])
+    if result["inserted"] or result["updated"]:
+        logger.info(f"Stored fighters: {len(result['inserted'])} inserted, {len(result['updated'])} updated")
+
+    return result["fighters"]
@@ -0,0 +1,308 @@
+import os
+import uuid
+import queue
+import socket
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from sqlalchemy import func, or_, and_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import AnalysisJob, Event
+from app.services.analysis_service import save_prediction
+from app.services.pipeline_service import STAGES, PipelineReporter, run_event_pipeline
+
+logger = logging.getLogger(__name__)
+
+_queue: "queue.Queue[str]" = queue.Queue()
+_workers: list = []
+_workers_lock = threading.Lock()
+
+# Identifies this process in analysis_jobs.owner
+_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# ---------------------------------------------------------
+# Reporter: persists stage / per-fight progress on the job row
+# ---------------------------------------------------------
+class JobReporter(PipelineReporter):
+    """
+    Progress is written with short-lived sessions so per-fight updates can
+    come from the analysis executor's threads.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._lock = threading.Lock()
+
+    def _update(self, fn) -> None:
+        with self._lock, SessionLocal() as db:
+            job = db.get(AnalysisJob, self.job_id)
+            if job is None or job.owner != _OWNER:
+                return  # lease lost: another process owns the job now
+            progress = dict(job.progress_json or {})
+            state = dict(job.state_json or {})
+            fn(job, progress, state)
+            # new dicts so SQLAlchemy sees the JSON change
+            job.progress_json = progress
+            job.state_json = state
+            db.commit()
+
+    def stage(self, name: str, status: str) -> None:
+        def fn(job, progress, state):
+            progress["stages"] = {**progress.get("stages", {}), name: status}
+            if status == "running":
+                job.stage = name
+        self._update(fn)
+
+    def card(self, event: Dict[str, Any]) -> None:
+        def fn(job, progress, state):
+            state["event"] = event
+            done = state.get("analyses", {})
+            progress["fights"] = [
+                {
+                    "fighter_a": f["fighter_a"],
+                    "fighter_b": f["fighter_b"],
+                    "status": "done" if str(i) in done else "pending",
+                }
+                for i, f in enumerate(event.get("fight_card") or [])
+            ]
+        self._update(fn)
+
+    def fight(self, index: int, status: str, analysis: Optional[dict] = None) -> None:
+        def fn(job, progress, state):
+            fights = [dict(f) for f in progress.get("fights", [])]
+            if index < len(fights):
+                fights[index]["status"] = status
+            progress["fights"] = fights
+            if analysis is not None:
+                # JSON object keys are strings
+                state["analyses"] = {**state.get("analyses", {}), str(index): analysis}
+        self._update(fn)
+
+    def saved_event(self) -> Optional[Dict[str, Any]]:
+        with SessionLocal() as db:
+            job = db.get(AnalysisJob, self.job_id)
+            return (job.state_json or {}).get("event") if job else None
+
+    def completed_analyses(self) -> Dict[int, dict]:
+        with SessionLocal() as db:
+            job = db.get(AnalysisJob, self.job_id)
+            saved = (job.state_json or {}).get("analyses", {}) if job else {}
+            return {int(i): a for i, a in saved.items()}
+
+
+# ---------------------------------------------------------
+# Claiming (one process per job, across workers and replicas)
+# ---------------------------------------------------------
+def _lease_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+def _resumable():
+    """Queued jobs, and running jobs whose owner stopped renewing its lease."""
+    return or_(
+        AnalysisJob.status == "queued",
+        and_(
+            AnalysisJob.status == "running",
+            or_(AnalysisJob.lease_until.is_(None), AnalysisJob.lease_until < datetime.utcnow()),
+        ),
+    )
+
+
+def _claim(job_id: str) -> bool:
+    """Atomically take the job; False if another process holds it (or it finished)."""
+    with SessionLocal() as db:
+        result = db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, _resumable())
+            .values(
+                status="running",
+                owner=_OWNER,
+                lease_until=_lease_expiry(),
+                attempts=func.coalesce(AnalysisJob.attempts, 0) + 1,
+                error=None,
+            )
+        )
+        db.commit()
+        return result.rowcount == 1
+
+
+@contextmanager
+def _hold_lease(job_id: str):
+    """Renew the lease in the background while the job runs."""
+    stop = threading.Event()
+
+    def _renew():
+        while not stop.wait(settings.JOB_LEASE_SECONDS / 3):
+            try:
+                with SessionLocal() as db:
+                    db.execute(
+                        update(AnalysisJob)
+                        .where(AnalysisJob.id == job_id, AnalysisJob.owner == _OWNER)
+                        .values(lease_until=_lease_expiry())
+                    )
+                    db.commit()
+            except Exception as e:
+                logger.warning(f"Could not renew lease on job {job_id}: {e}")
+
+    thread = threading.Thread(target=_renew, name=f"job-lease-{job_id[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+
+
+def _finish(db: Session, job_id: str) -> Optional[AnalysisJob]:
+    """The job row if this process still owns it (else another took over)."""
+    job = db.get(AnalysisJob, job_id)
+    if job is None or job.owner != _OWNER:
+        logger.warning(f"Lost the lease on job {job_id}; not recording its outcome")
+        return None
+    job.lease_until = None
+    return job
+
+
+# ---------------------------------------------------------
+# Job execution
+# ---------------------------------------------------------
+def _run_job(job_id: str) -> None:
+    if not _claim(job_id):
+        return
+
+    reporter = JobReporter(job_id)
+
+    try:
+        with _hold_lease(job_id), SessionLocal() as db:
+            result = run_event_pipeline(db, reporter=reporter)
+            if result is None:
+                raise RuntimeError("No upcoming event found.")
+
+            # The pipeline stores complete (memoizable) results itself
+            prediction_id = result.get("prediction_id")
+            if prediction_id is None:
+                event = db.query(Event).filter(Event.event_name == result["event_name"]).first()
+                prediction = save_prediction(db, event, result) if event else None
+                prediction_id = prediction.id if prediction else None
+
+            job = _finish(db, job_id)
+            if job is None:
+                return
+            job.status = "succeeded"
+            job.stage = None
+            job.result_json = result
+            job.prediction_id = prediction_id
+            db.commit()
+
+        logger.info(f"Analysis job {job_id} succeeded.")
+
+    except Exception as e:
+        logger.error(f"Analysis job {job_id} failed: {e}")
+        with SessionLocal() as db:
+            job = _finish(db, job_id)
+            if job is not None:
+                job.status = "failed"
+                job.error = str(e)
+                db.commit()
+
+
+def _enqueue_resumable() -> None:
+    try:
+        with SessionLocal() as db:
+            pending = (
+                db.query(AnalysisJob.id)
+                .filter(_resumable())
+                .order_by(AnalysisJob.created_at.asc())
+                .all()
+            )
+        for (job_id,) in pending:
+            _queue.put(job_id)
+    except Exception as e:
+        logger.error(f"Could not re-enqueue pending jobs: {e}")
+
+
+def _worker_loop() -> None:
+    while True:
+        try:
+            job_id = _queue.get(timeout=settings.JOB_LEASE_SECONDS)
+        except queue.Empty:
+            # Idle: pick up jobs whose owner died (claiming sorts out races)
+            _enqueue_resumable()
+            continue
+        try:
+            _run_job(job_id)
+        except Exception as e:
+            logger.error(f"Job worker crashed on {job_id}: {e}")
+        finally:
+            _queue.task_done()
+
+
+def start_job_workers() -> None:
+    """
+    Start the local worker threads (idempotent) and enqueue jobs that are
+    queued or whose lease expired (owner restarted); those resume from
+    their saved state. Every process does this, but each job is claimed
+    atomically before it runs, so only one of them runs it.
+    """
+    with _workers_lock:
+        if _workers:
+            return
+
+        for i in range(max(1, settings.JOB_WORKERS)):
+            t = threading.Thread(target=_worker_loop, name=f"analysis-job-{i}", daemon=True)
+            t.start()
+            _workers.append(t)
+
+    _enqueue_resumable()
+
+
+# ---------------------------------------------------------
+# Public API
+# ---------------------------------------------------------
+def submit_full_event_job(db: Session) -> AnalysisJob:
+    job = AnalysisJob(
+        id=str(uuid.uuid4()),
+        kind="full_event_analysis",
+        status="queued",
+        progress_json={"stages": {s: "pending" for s in STAGES}, "fights": []},
+        state_json={},
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _queue.put(job.id)
+    return job
+
+
+def retry_job(db: Session, job: AnalysisJob) -> AnalysisJob:
+    """Re-queue a failed job; completed stages/fights are not redone."""
+    job.status = "queued"
+    job.error = None
+    job.updated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(job)
+
+    _queue.put(job.id)
+    return job
+
+
+def job_status(job: AnalysisJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "stage": job.stage,
+        "attempts": job.attempts,
+        "error": job.error,
+        "progress": job.progress_json or {},
+        "prediction_id": job.prediction_id,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
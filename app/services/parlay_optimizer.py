@@ -0,0 +1,219 @@
+import logging
+from itertools import combinations
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.utils.names import normalize_name
+from app.utils.odds_math import (
+    parse_american,
+    american_to_decimal,
+    decimal_to_american,
+    format_american,
+)
+
+logger = logging.getLogger(__name__)
+
+# (profile, min joint probability, max joint probability) — checked in order
+RISK_PROFILES: Tuple[Tuple[str, float, float], ...] = (
+    ("safe", 0.35, 1.0),
+    ("balanced", 0.15, 0.35),
+    ("longshot", 0.0, 0.15),
+)
+
+
+# ---------------------------------------------------------
+# Legs: both sides of every fight with a line and a probability
+# ---------------------------------------------------------
+def fighter_name(fighter: Any) -> Optional[str]:
+    """Pipeline results hold a fighter payload dict, or just the name."""
+    return fighter.get("name") if isinstance(fighter, dict) else fighter
+
+
+def _as_probability(value: Any) -> Optional[float]:
+    try:
+        p = float(str(value).strip().rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+    if p > 1.0:  # "65" / "65%"
+        p /= 100.0
+    return p if 0.0 < p < 1.0 else None
+
+
+def side_probabilities(prediction: Optional[Dict[str, Any]], name_a: str, name_b: str) -> Optional[Tuple[float, float]]:
+    """
+    (P(A wins), P(B wins)) from a fight prediction: the model's
+    win_probability when present, else the LLM's winner + confidence.
+    """
+    prediction = prediction or {}
+
+    model = prediction.get("win_probability") or {}
+    p_a = _as_probability(model.get("fighter_a"))
+    if p_a is not None:
+        return p_a, 1.0 - p_a
+
+    confidence = _as_probability(prediction.get("confidence"))
+    winner = normalize_name(prediction.get("winner"))
+    if confidence is None or not winner:
+        return None
+    if winner == normalize_name(name_a):
+        return confidence, 1.0 - confidence
+    if winner == normalize_name(name_b):
+        return 1.0 - confidence, confidence
+    return None
+
+
+def build_legs(fights: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    fights: pipeline results ({fighter_a, fighter_b, odds, prediction}).
+    Sides without a usable line or probability are skipped.
+    """
+    fight_idx, names, opponents, american, prob = [], [], [], [], []
+
+    for i, fight in enumerate(fights):
+        name_a, name_b = fighter_name(fight.get("fighter_a")), fighter_name(fight.get("fighter_b"))
+        if not name_a or not name_b:
+            continue
+
+        sides = side_probabilities(fight.get("prediction"), name_a, name_b)
+        if sides is None:
+            continue
+
+        odds = fight.get("odds") or {}
+        for name, opponent, line, p in (
+            (name_a, name_b, odds.get("odds_a"), sides[0]),
+            (name_b, name_a, odds.get("odds_b"), sides[1]),
+        ):
+            line = parse_american(line)
+            if np.isnan(line):
+                continue
+            fight_idx.append(i)
+            names.append(name)
+            opponents.append(opponent)
+            american.append(line)
+            prob.append(p)
+
+    american_arr = np.array(american, dtype=float)
+    return {
+        "fight": np.array(fight_idx, dtype=int),
+        "name": np.array(names, dtype=object),
+        "opponent": np.array(opponents, dtype=object),
+        "american": american_arr,
+        "decimal": american_to_decimal(american_arr) if american else np.empty(0),
+        "probability": np.array(prob, dtype=float),
+    }
+
+
+# ---------------------------------------------------------
+# Enumeration (all combinations of one size at a time, vectorized)
+# ---------------------------------------------------------
+def _combos(n: int, size: int) -> np.ndarray:
+    if size > n:
+        return np.empty((0, size), dtype=int)
+    return np.array(list(combinations(range(n), size)), dtype=int).reshape(-1, size)
+
+
+def score_combinations(legs: Dict[str, np.ndarray], max_legs: int, min_legs: int = 2) -> Dict[str, np.ndarray]:
+    """
+    Joint probability, decimal payout and EV (per unit staked) for every
+    combination of min_legs..max_legs legs from different fights. Legs
+    are assumed independent. Combinations are padded with -1 to max_legs.
+    """
+    n = len(legs["probability"])
+    combos, joint, payout = [], [], []
+
+    for size in range(min_legs, max_legs + 1):
+        idx = _combos(n, size)
+        if not len(idx):
+            break
+        # Legs are ordered by fight, so a repeated fight shows up as a zero step
+        valid = np.all(np.diff(legs["fight"][idx], axis=1) != 0, axis=1)
+        idx = idx[valid]
+
+        combos.append(np.pad(idx, ((0, 0), (0, max_legs - size)), constant_values=-1))
+        joint.append(legs["probability"][idx].prod(axis=1))
+        payout.append(legs["decimal"][idx].prod(axis=1))
+
+    if not combos:
+        return {"legs": np.empty((0, max_legs), dtype=int), "probability": np.empty(0),
+                "decimal": np.empty(0), "ev": np.empty(0)}
+
+    joint_arr, payout_arr = np.concatenate(joint), np.concatenate(payout)
+    return {
+        "legs": np.concatenate(combos),
+        "probability": joint_arr,
+        "decimal": payout_arr,
+        "ev": joint_arr * payout_arr - 1.0,
+    }
+
+
+# ---------------------------------------------------------
+# Ranking + deterministic formatting
+# ---------------------------------------------------------
+def _format(legs: Dict[str, np.ndarray], row: np.ndarray, p: float, decimal: float, ev: float, profile: str) -> Dict[str, Any]:
+    picks = [int(i) for i in row if i >= 0]
+    american = format_american(float(decimal_to_american(decimal)))
+    names = [str(legs["name"][i]) for i in picks]
+
+    return {
+        "risk_profile": profile,
+        "legs": [
+            {
+                "fighter": str(legs["name"][i]),
+                "opponent": str(legs["opponent"][i]),
+                "odds": format_american(float(legs["american"][i])),
+                "probability": round(float(legs["probability"][i]), 4),
+            }
+            for i in picks
+        ],
+        "probability": round(p, 4),
+        "decimal_odds": round(decimal, 2),
+        "american_odds": american,
+        "expected_value": round(ev, 4),
+        "description": (
+            f"{len(picks)}-leg parlay: {', '.join(names)} — "
+            f"{p:.1%} to hit, pays {american}, EV {ev:+.1%} per unit"
+        ),
+    }
+
+
+def optimize_parlays(
+    fights: List[Dict[str, Any]],
+    max_legs: Optional[int] = None,
+    top_n: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Every combination of up to max_legs legs across the card, scored in
+    NumPy; the top_n by expected value within each risk profile (by joint
+    probability). No LLM call; ties break on probability, then leg order,
+    so the same card always yields the same list.
+    """
+    max_legs = max_legs or settings.PARLAY_MAX_LEGS
+    top_n = top_n or settings.PARLAY_TOP_N
+
+    legs = build_legs(fights)
+    scored = score_combinations(legs, max_legs)
+    if not len(scored["ev"]):
+        logger.info("No parlays: fewer than two fights with odds and a prediction")
+        return []
+
+    # lexsort: last key is primary → EV desc, probability desc, leg indices asc
+    order = np.lexsort(tuple(scored["legs"].T[::-1]) + (-scored["probability"], -scored["ev"]))
+
+    parlays = []
+    for profile, low, high in RISK_PROFILES:
+        p = scored["probability"][order]
+        in_band = order[(p >= low) & ((p < high) | (high >= 1.0))]
+        for i in in_band[:top_n]:
+            parlays.append(_format(
+                legs,
+                scored["legs"][i],
+                float(scored["probability"][i]),
+                float(scored["decimal"][i]),
+                float(scored["ev"][i]),
+                profile,
+            ))
+
+    logger.info(f"Scored {len(scored['ev'])} parlays from {len(legs['probability'])} legs")
+    return parlays
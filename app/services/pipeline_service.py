@@ -0,0 +1,279 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Fighter
+from app.services.analysis_executor import run_in_order
+from app.services.analysis_service import (
+    ANALYSIS_MODEL,
+    build_fight_prompt,
+    apply_model_prediction,
+    compute_stats_features,
+    empty_analysis,
+    extract_json,
+    save_prediction,
+)
+from app.services.event_service import get_next_event_cached, get_event_by_name
+from app.services.prediction_cache import fingerprint, find_memoized, find_memoized_many
+from app.services.prediction_engine import attach_model_predictions
+from app.services.parlay_optimizer import optimize_parlays
+from app.services.ingestion_service import ingest_fighters
+from app.utils.odds_lookup import get_odds_for_matchups
+from app.utils.openai_client import run
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("event", "fighters", "odds", "analysis", "parlays")
+
+
+# --------------------------------------------------------------
+# Progress hooks (no-op by default; the job system overrides)
+# --------------------------------------------------------------
+
+class PipelineReporter:
+    def stage(self, name: str, status: str) -> None:
+        pass
+
+    def fight(self, index: int, status: str, analysis: Optional[dict] = None) -> None:
+        pass
+
+    def card(self, event: Dict[str, Any]) -> None:
+        pass
+
+    # ---- resume state ----
+    def saved_event(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def completed_analyses(self) -> Dict[int, dict]:
+        return {}
+
+
+# --------------------------------------------------------------
+# Per-fight analysis (non-streaming)
+# --------------------------------------------------------------
+
+def run_full_analysis_nonstream(bundle: dict) -> dict:
+    """
+    Runs the analysis prompt (non-streaming) to get JSON prediction.
+    """
+    messages = build_fight_prompt(bundle)
+    raw = run(
+        messages,
+        model=ANALYSIS_MODEL,
+        temperature=0.2,
+        timeout=settings.ANALYSIS_TIMEOUT_SECONDS,
+    )
+
+    # Parse JSON from GPT response
+    try:
+        parsed = json.loads(extract_json(raw))
+    except Exception:
+        # Still returned (the model pick stands), but never memoized
+        parsed = {**empty_analysis(raw), "parse_failed": True}
+
+    return apply_model_prediction(bundle, parsed)
+
+
+def _memoizable(out: Dict[str, Any]) -> bool:
+    """A usable pick from a reply that parsed — failures are re-run next time."""
+    return bool((out.get("prediction") or {}).get("winner")) and not out.get("parse_failed")
+
+
+# --------------------------------------------------------------
+# Full event pipeline
+# --------------------------------------------------------------
+
+def fighter_payload(fighter: Optional[Fighter]) -> Optional[Dict[str, Any]]:
+    """JSON-safe view of a Fighter row for responses and stored results."""
+    if fighter is None:
+        return None
+
+    return {
+        "name": fighter.name,
+        "ufcstats_id": fighter.ufcstats_id,
+        "sherdog_url": fighter.sherdog_url,
+        "tapology_slug": fighter.tapology_slug,
+        "ufcstats": fighter.ufcstats_json,
+        "sherdog": fighter.sherdog_json,
+        "tapology": fighter.tapology_json,
+    }
+
+
+def run_event_pipeline(
+    db: Session,
+    reporter: Optional[PipelineReporter] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    - Load event
+    - Fighter merge + load (batched identity resolution)
+    - Odds
+    - Full per-fight analysis (non-streaming, concurrent)
+    - Parlays ranked by expected value (local, no LLM call)
+
+    With a reporter, each stage/fight is reported as it completes, and a
+    resumed run reuses the saved card and any fights already analyzed.
+    """
+    reporter = reporter or PipelineReporter()
+
+    # STEP 1: Load event (a resumed job keeps the card it started with)
+    reporter.stage("event", "running")
+    event = reporter.saved_event() or get_next_event_cached(db)
+    if not event:
+        reporter.stage("event", "failed")
+        return None
+    reporter.card(event)
+    reporter.stage("event", "done")
+
+    event_name = event["event_name"]
+    fight_card = event.get("fight_card") or []
+
+    # STEP 2: collect fighter names from card
+    names = []
+    for f in fight_card:
+        names.append(f["fighter_a"])
+        names.append(f["fighter_b"])
+
+    names = list(set(names))
+
+    # STEP 3: Load fighters — ids for the whole card are batch-resolved
+    # (Tapology included), then all fighters × sources scrape concurrently
+    reporter.stage("fighters", "running")
+    fighters = ingest_fighters(db, names, on_card=True)
+    reporter.stage("fighters", "done")
+
+    # STEP 4: Odds
+    reporter.stage("odds", "running")
+    card_matchups = [{"fighter_a": f["fighter_a"], "fighter_b": f["fighter_b"]} for f in fight_card]
+    odds_objects = get_odds_for_matchups(event_name, card_matchups)
+
+    # Build lookup
+    odds_map = {}
+    for o in odds_objects:
+        key1 = (o.fighter_a, o.fighter_b)
+        key2 = (o.fighter_b, o.fighter_a)
+        odds_map[key1] = o.dict()
+        odds_map[key2] = o.dict()
+    reporter.stage("odds", "done")
+
+    # STEP 5: Full fight analysis (concurrent, results kept in card order)
+    reporter.stage("analysis", "running")
+    bundles = []
+
+    for fight in fight_card:
+        a = fight["fighter_a"]
+        b = fight["fighter_b"]
+
+        a_prof = fighters.get(a)
+        b_prof = fighters.get(b)
+
+        # Compute features
+        a_feat = compute_stats_features(a_prof)
+        b_feat = compute_stats_features(b_prof)
+
+        odds = odds_map.get((a, b), {"odds_a": None, "odds_b": None})
+
+        # Build bundle for analysis
+        bundles.append({
+            "event_name": event_name,
+            "fighter_a": a_prof or a,
+            "fighter_b": b_prof or b,
+            "a_features": a_feat,
+            "b_features": b_feat,
+            "odds": odds
+        })
+
+    # Local model picks winners/methods for the whole card in one batch;
+    # the LLM then only writes the narrative
+    if settings.PREDICTION_SOURCE == "model":
+        attach_model_predictions(bundles)
+
+    # Memoization: identical prompt inputs → reuse the stored prediction
+    event_row = get_event_by_name(db, event_name)
+    fight_hashes = [
+        fingerprint({"model": ANALYSIS_MODEL, "messages": build_fight_prompt(b)})
+        for b in bundles
+    ]
+    pipeline_hash = fingerprint({"event": event_name, "fights": fight_hashes})
+
+    if event_row is not None:
+        memo = find_memoized(db, pipeline_hash, scope="pipeline")
+        if memo is not None:
+            logger.info(f"Card inputs unchanged for {event_name}; reusing prediction {memo.id}")
+            for i in range(len(bundles)):
+                reporter.fight(i, "done")
+            for name in ("analysis", "parlays"):
+                reporter.stage(name, "done")
+            return {**memo.analysis_json, "memoized": True, "prediction_id": memo.id}
+
+    done = reporter.completed_analyses()
+
+    if event_row is not None:
+        unseen = [i for i in range(len(bundles)) if i not in done]
+        memos = find_memoized_many(db, [fight_hashes[i] for i in unseen], scope="fight")
+        for i in unseen:
+            memo = memos.get(fight_hashes[i])
+            if memo is not None:
+                done[i] = memo.analysis_json
+                reporter.fight(i, "done", memo.analysis_json)
+
+    pending = [i for i in range(len(bundles)) if i not in done]
+    logger.info(f"{len(bundles) - len(pending)}/{len(bundles)} fights unchanged; analyzing {len(pending)}")
+
+    def _analyze(index: int) -> dict:
+        reporter.fight(index, "running")
+        out = run_full_analysis_nonstream(bundles[index])
+        reporter.fight(index, "done", out)
+        return out
+
+    def _failed(index: int, exc: Exception) -> dict:
+        reporter.fight(index, "failed")
+        return empty_analysis(f"Analysis failed: {exc}")
+
+    fresh = run_in_order(_analyze, pending, on_error=_failed)
+    analyses = {**done, **dict(zip(pending, fresh))}
+
+    if event_row is not None:
+        for i, out in zip(pending, fresh):
+            if _memoizable(out):
+                save_prediction(db, event_row, out, input_hash=fight_hashes[i], scope="fight")
+
+    reporter.stage("analysis", "done")
+
+    results = []
+
+    for i, fight in enumerate(fight_card):
+        bundle = bundles[i]
+        analysis_out = analyses[i]
+        results.append({
+            "fighter_a": fighter_payload(fighters.get(fight["fighter_a"])) or fight["fighter_a"],
+            "fighter_b": fighter_payload(fighters.get(fight["fighter_b"])) or fight["fighter_b"],
+            "odds": bundle["odds"],
+            "analysis": analysis_out.get("analysis"),
+            "prediction": analysis_out.get("prediction"),
+            "value_notes": analysis_out.get("value_notes")
+        })
+
+    # STEP 6: Parlays (every leg combination scored against the odds)
+    reporter.stage("parlays", "running")
+    parlays = optimize_parlays(results)
+    reporter.stage("parlays", "done")
+
+    # STEP 7: Full payload
+    output = {
+        "event_name": event["event_name"],
+        "event_date": event.get("event_date"),
+        "location": event.get("location"),
+        "generated_at": datetime.utcnow().isoformat(),
+        "fights": results,
+        "parlays": parlays
+    }
+
+    if event_row is not None and all(_memoizable(a) for a in analyses.values()):
+        prediction = save_prediction(db, event_row, output, input_hash=pipeline_hash, scope="pipeline")
+        output = {**output, "prediction_id": prediction.id}
+
+    return output
@@ -0,0 +1,69 @@
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Prediction
+
+
+# ---------------------------------------------------------
+# Input fingerprint
+# ---------------------------------------------------------
+def fingerprint(payload: Any) -> str:
+    """
+    Stable SHA-256 over the exact model input (prompt/messages + model).
+    Hashing the rendered prompt means a change to the features, the odds
+    or the prompt template all produce a new fingerprint.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------
+def _memo_stmt(input_hash: str, scope: str):
+    return (
+        select(Prediction)
+        .where(Prediction.input_hash == input_hash, Prediction.scope == scope)
+        .order_by(Prediction.created_at.desc())
+        .limit(1)
+    )
+
+
+def find_memoized(db: Session, input_hash: str, scope: str) -> Optional[Prediction]:
+    """Most recent prediction produced from identical inputs, if any."""
+    return db.execute(_memo_stmt(input_hash, scope)).scalars().first()
+
+
+async def find_memoized_async(db: AsyncSession, input_hash: str, scope: str) -> Optional[Prediction]:
+    return (await db.execute(_memo_stmt(input_hash, scope))).scalars().first()
+
+
+def _memo_many_stmt(input_hashes: List[str], scope: str):
+    return (
+        select(Prediction)
+        .where(Prediction.input_hash.in_(input_hashes), Prediction.scope == scope)
+        .order_by(Prediction.created_at.asc())
+    )
+
+
+def _latest_by_hash(rows) -> Dict[str, Prediction]:
+    # ascending by created_at, so later rows overwrite earlier ones
+    return {p.input_hash: p for p in rows}
+
+
+def find_memoized_many(db: Session, input_hashes: List[str], scope: str) -> Dict[str, Prediction]:
+    """find_memoized for a whole card in one query: {input_hash: latest Prediction}."""
+    if not input_hashes:
+        return {}
+    return _latest_by_hash(db.execute(_memo_many_stmt(input_hashes, scope)).scalars())
+
+
+async def find_memoized_many_async(db: AsyncSession, input_hashes: List[str], scope: str) -> Dict[str, Prediction]:
+    if not input_hashes:
+        return {}
+    return _latest_by_hash((await db.execute(_memo_many_stmt(input_hashes, scope))).scalars())
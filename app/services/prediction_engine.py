@@ -0,0 +1,215 @@
+import logging
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models import Fighter
+from app.services.rating_service import fighter_rating
+from app.utils.ufcstats_parsing import (
+    parse_career_stats,
+    parse_attributes,
+    summarize_history,
+)
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("KO/TKO", "Submission", "Decision")
+
+# Approximate UFC finish mix, used as the prior for every fighter
+METHOD_PRIOR = np.array([0.32, 0.19, 0.49])
+METHOD_PRIOR_WEIGHT = 3.0  # pseudo-fights the prior is worth
+
+# ---------------------------------------------------------
+# Feature columns: (name, typical spread, weight on the A−B difference)
+# Weights are hand-set directions/magnitudes, not fitted coefficients.
+# ---------------------------------------------------------
+FEATURES: Tuple[Tuple[str, float, float], ...] = (
+    ("slpm", 1.5, 0.35),
+    ("sapm", 1.5, -0.35),
+    ("str_acc", 0.08, 0.20),
+    ("str_def", 0.07, 0.25),
+    ("td_avg", 1.3, 0.15),
+    ("td_acc", 0.15, 0.10),
+    ("td_def", 0.15, 0.20),
+    ("sub_avg", 0.6, 0.10),
+    ("reach_in", 3.0, 0.10),
+    ("age", 4.0, -0.25),
+    ("win_rate", 0.2, 0.30),
+    ("experience", 0.7, 0.10),  # log1p(UFC fights)
+    ("rating", 100.0, 0.40),    # Elo over the stored fight graph
+)
+
+FEATURE_NAMES = tuple(f[0] for f in FEATURES)
+_SCALE = np.array([f[1] for f in FEATURES])
+_WEIGHT = np.array([f[2] for f in FEATURES])
+_ABS_WEIGHT = np.abs(_WEIGHT) / np.abs(_WEIGHT).sum()
+
+# wins_ko, wins_sub, wins_dec, losses_ko, losses_sub, losses_dec
+_FINISH_KEYS = ("wins_ko", "wins_sub", "wins_dec", "losses_ko", "losses_sub", "losses_dec")
+
+
+# ---------------------------------------------------------
+# Encoding: fighters → feature matrix (NaN = missing)
+# ---------------------------------------------------------
+def _fighter_row(fighter: Optional[Fighter]) -> Tuple[np.ndarray, np.ndarray]:
+    features = np.full(len(FEATURES), np.nan)
+    finishes = np.zeros(len(_FINISH_KEYS))
+
+    # Ratings also exist for fighters only seen as someone's opponent
+    rating = fighter_rating(fighter)
+    if rating is not None:
+        features[FEATURE_NAMES.index("rating")] = rating
+
+    ufc = (fighter.ufcstats_json if fighter is not None else None) or {}
+    if not ufc:
+        return features, finishes
+
+    attributes = ufc.get("attributes") or {}
+    values: Dict[str, Optional[float]] = {
+        **parse_career_stats({**attributes, **(ufc.get("career_stats") or {})}),
+        **{k: v for k, v in parse_attributes(attributes).items() if k in ("reach_in", "age")},
+    }
+
+    record = summarize_history(ufc.get("fight_history"))
+    fights = record["wins"] + record["losses"] + record["draws"]
+    if fights:
+        values["win_rate"] = (record["wins"] + 0.5 * record["draws"]) / fights
+        values["experience"] = float(np.log1p(fights))
+
+    for i, name in enumerate(FEATURE_NAMES):
+        if values.get(name) is not None:
+            features[i] = values[name]
+
+    finishes[:] = [record[k] for k in _FINISH_KEYS]
+    return features, finishes
+
+
+def encode_fighters(fighters: Sequence[Optional[Fighter]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, len(FEATURES)) feature matrix and (n, 6) finish-count matrix."""
+    rows = [_fighter_row(f) for f in fighters]
+    if not rows:
+        return np.empty((0, len(FEATURES))), np.empty((0, len(_FINISH_KEYS)))
+    return np.stack([r[0] for r in rows]), np.stack([r[1] for r in rows])
+
+
+# ---------------------------------------------------------
+# Batched model
+# ---------------------------------------------------------
+def _method_mix(wins_by: np.ndarray, losses_by: np.ndarray) -> np.ndarray:
+    """P(method | winner beats loser): winner's win mix × loser's loss mix / prior."""
+    k = METHOD_PRIOR_WEIGHT
+    win_mix = (wins_by + k * METHOD_PRIOR) / (wins_by.sum(axis=1, keepdims=True) + k)
+    loss_mix = (losses_by + k * METHOD_PRIOR) / (losses_by.sum(axis=1, keepdims=True) + k)
+    mix = win_mix * loss_mix / METHOD_PRIOR
+    return mix / mix.sum(axis=1, keepdims=True)
+
+
+def predict_arrays(
+    xa: np.ndarray,
+    xb: np.ndarray,
+    fin_a: np.ndarray,
+    fin_b: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Score n matchups at once. x*: (n, F) features with NaN for missing;
+    fin*: (n, 6) finish counts. Features missing for either side add
+    nothing, and probabilities shrink toward 0.5 by the share of
+    (weighted) features that were available.
+    """
+    present = ~(np.isnan(xa) | np.isnan(xb))
+    diff = np.where(present, (np.nan_to_num(xa) - np.nan_to_num(xb)) / _SCALE, 0.0)
+
+    logit = diff @ _WEIGHT
+    raw = 1.0 / (1.0 + np.exp(-logit))
+    coverage = present.astype(float) @ _ABS_WEIGHT
+    p_a = 0.5 + (raw - 0.5) * coverage
+
+    mix_a = _method_mix(fin_a[:, :3], fin_b[:, 3:])   # A beats B
+    mix_b = _method_mix(fin_b[:, :3], fin_a[:, 3:])   # B beats A
+    methods = p_a[:, None] * mix_a + (1.0 - p_a)[:, None] * mix_b
+
+    return {
+        "p_a": p_a,
+        "coverage": coverage,
+        "mix_a": mix_a,
+        "mix_b": mix_b,
+        "methods": methods,
+    }
+
+
+def predict_matchups(
+    pairs: Sequence[Tuple[Optional[Fighter], Optional[Fighter]]],
+    names: Optional[Sequence[Tuple[str, str]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    One batched call for a card (or any list of hypothetical matchups).
+    Each distinct fighter is encoded once. names default to the rows' names.
+    """
+    if not pairs:
+        return []
+
+    unique: Dict[int, int] = {}
+    fighters: List[Optional[Fighter]] = []
+    index_a, index_b = [], []
+    for a, b in pairs:
+        for fighter, index in ((a, index_a), (b, index_b)):
+            key = id(fighter)
+            if key not in unique:
+                unique[key] = len(fighters)
+                fighters.append(fighter)
+            index.append(unique[key])
+
+    x, fin = encode_fighters(fighters)
+    ia, ib = np.array(index_a), np.array(index_b)
+    out = predict_arrays(x[ia], x[ib], fin[ia], fin[ib])
+
+    names = names or [(getattr(a, "name", None), getattr(b, "name", None)) for a, b in pairs]
+    results = []
+
+    for i, (name_a, name_b) in enumerate(names):
+        p_a = float(out["p_a"][i])
+        a_wins = p_a >= 0.5
+        mix = out["mix_a"][i] if a_wins else out["mix_b"][i]
+
+        results.append({
+            "fighter_a": name_a,
+            "fighter_b": name_b,
+            "win_probability": {"fighter_a": round(p_a, 4), "fighter_b": round(1.0 - p_a, 4)},
+            "method_distribution": {m: round(float(v), 4) for m, v in zip(METHODS, out["methods"][i])},
+            "winner": name_a if a_wins else name_b,
+            "method": METHODS[int(np.argmax(mix))],
+            "confidence": round(max(p_a, 1.0 - p_a), 4),
+            "data_coverage": round(float(out["coverage"][i]), 4),
+        })
+
+    return results
+
+
+# ---------------------------------------------------------
+# Analysis integration: local numbers, LLM narrative
+# ---------------------------------------------------------
+def attach_model_predictions(bundles: List[Dict[str, Any]]) -> None:
+    """
+    Add "model_prediction" to every analysis bundle in one batched call;
+    build_fight_prompt then asks the LLM for the narrative only. Bouts
+    with no stored stats for either fighter are left to the LLM.
+    """
+    scored = [
+        b for b in bundles
+        if isinstance(b.get("fighter_a"), Fighter) or isinstance(b.get("fighter_b"), Fighter)
+    ]
+    pairs = [
+        (
+            b["fighter_a"] if isinstance(b["fighter_a"], Fighter) else None,
+            b["fighter_b"] if isinstance(b["fighter_b"], Fighter) else None,
+        )
+        for b in scored
+    ]
+    names = [
+        (getattr(b["fighter_a"], "name", b["fighter_a"]), getattr(b["fighter_b"], "name", b["fighter_b"]))
+        for b in scored
+    ]
+
+    for bundle, prediction in zip(scored, predict_matchups(pairs, names)):
+        if prediction["data_coverage"] > 0:
+            bundle["model_prediction"] = prediction
@@ -0,0 +1,471 @@
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Fighter, FighterAlias, FighterRating, RatedFight
+from app.utils.names import normalize_name
+from app.utils.ufcstats_parsing import (
+    parse_result,
+    parse_event_date,
+    parse_opponent,
+    history_method,
+)
+
+logger = logging.getLogger(__name__)
+
+_IN_CHUNK = 500  # keys per IN (...) query
+
+
+# -------------------------------------------------------
+# Elo (pure)
+# -------------------------------------------------------
+def expected_score(rating_a: float, rating_b: float) -> float:
+    """P(A beats B) under Elo."""
+    return 1.0 / (1.0 + 10 ** ((rating_b - rating_a) / 400.0))
+
+
+def _k_factor(fights: int, method: Optional[str], decisive: bool) -> float:
+    k = settings.RATING_PROVISIONAL_K if fights < settings.RATING_PROVISIONAL_FIGHTS else settings.RATING_K
+    if decisive and method in ("KO/TKO", "Submission"):
+        k *= settings.RATING_FINISH_MULTIPLIER
+    return k
+
+
+def rate_bout(
+    rating_a: float,
+    rating_b: float,
+    score_a: float,
+    k_a: float,
+    k_b: float,
+) -> Tuple[float, float]:
+    """New (rating_a, rating_b); score_a is 1 (A won), 0 (B won) or 0.5 (draw)."""
+    expected_a = expected_score(rating_a, rating_b)
+    return (
+        rating_a + k_a * (score_a - expected_a),
+        rating_b + k_b * (expected_a - score_a),
+    )
+
+
+# -------------------------------------------------------
+# Fight graph: stored histories → unique bouts
+# -------------------------------------------------------
+def _history_rows(fighter: Fighter) -> List[Dict[str, Any]]:
+    """Completed, dated bouts from one fighter's UFCStats history (raw keys)."""
+    ufc = fighter.ufcstats_json or {}
+    own = fighter.name_normalized or normalize_name(fighter.name)
+    rows = []
+
+    for row in ufc.get("fight_history") or []:
+        result = parse_result(row.get("result"))
+        if result not in ("win", "loss", "draw"):  # upcoming bouts and no contests
+            continue
+
+        fight_date = parse_event_date(row.get("event"))
+        opponent = parse_opponent(row.get("opponent"), fighter.name)
+        if fight_date is None or not opponent:
+            continue
+
+        rows.append({
+            "date": fight_date,
+            "own": own,
+            "own_name": fighter.name,
+            "opponent": normalize_name(opponent),
+            "opponent_name": opponent,
+            "result": result,
+            "method": history_method(row),
+        })
+
+    return rows
+
+
+def _canonical_keys(db: Session, keys: Iterable[str]) -> Dict[str, str]:
+    """Alias key → the stored fighter's canonical key, so spellings share a rating."""
+    keys = list(set(keys))
+    canonical: Dict[str, str] = {}
+    for i in range(0, len(keys), _IN_CHUNK):
+        chunk = keys[i:i + _IN_CHUNK]
+        rows = (
+            db.query(FighterAlias.alias_normalized, Fighter.name_normalized)
+            .join(Fighter, FighterAlias.fighter_id == Fighter.id)
+            .filter(FighterAlias.alias_normalized.in_(chunk))
+            .all()
+        )
+        canonical.update({alias: name for alias, name in rows if name})
+    return canonical
+
+
+def _bouts(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Merge history rows into one record per bout. A bout stored in both
+    fighters' histories maps to the same key and is counted once.
+    """
+    canonical = _canonical_keys(db, [r["opponent"] for r in rows])
+    bouts: Dict[str, Dict[str, Any]] = {}
+
+    for row in rows:
+        own = row["own"]
+        opponent = canonical.get(row["opponent"], row["opponent"])
+        if not own or not opponent or own == opponent:
+            continue
+
+        a, b = sorted((own, opponent))
+        if row["result"] == "draw":
+            outcome = "draw"
+        else:
+            winner = own if row["result"] == "win" else opponent
+            outcome = "a" if winner == a else "b"
+
+        key = f"{row['date'].isoformat()}|{a}|{b}"
+        names = {own: row["own_name"], opponent: row["opponent_name"]}
+        bout = bouts.setdefault(key, {
+            "fight_key": key,
+            "date": row["date"],
+            "a": a,
+            "b": b,
+            "outcome": outcome,
+            "method": row["method"],
+            "names": {},
+        })
+        # The stored fighter's own spelling wins over the one in an opponent's history
+        bout["names"].setdefault(opponent, names[opponent])
+        bout["names"][own] = names[own]
+
+    return bouts
+
+
+# -------------------------------------------------------
+# Apply bouts in date order (no commit)
+# -------------------------------------------------------
+def _existing(db: Session, model, column, keys: List[str]) -> List[Any]:
+    found = []
+    for i in range(0, len(keys), _IN_CHUNK):
+        found.extend(db.query(model).filter(column.in_(keys[i:i + _IN_CHUNK])).all())
+    return found
+
+
+def _unrated(db: Session, bouts: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Bouts not in rated_fights yet, oldest first."""
+    if not bouts:
+        return []
+    done = {r.fight_key for r in _existing(db, RatedFight, RatedFight.fight_key, list(bouts))}
+    return sorted((b for k, b in bouts.items() if k not in done), key=lambda b: (b["date"], b["fight_key"]))
+
+
+def _rewind(db: Session, since) -> List[Dict[str, Any]]:
+    """
+    Undo every rated bout on or after `since`: each fighter involved goes
+    back to the rating stored on their first such bout, and the bouts are
+    returned (as _bouts records) to be replayed.
+    """
+    later = (
+        db.query(RatedFight)
+        .filter(RatedFight.fight_date >= since)
+        .order_by(RatedFight.fight_date.asc(), RatedFight.fight_key.asc())
+        .all()
+    )
+    if not later:
+        return []
+
+    involved = list({key for r in later for key in (r.fighter_a, r.fighter_b)})
+    ratings = {r.name_normalized: r for r in _existing(db, FighterRating, FighterRating.name_normalized, involved)}
+
+    restored = set()
+    bouts = []
+    for fight in later:
+        for key, before in ((fight.fighter_a, fight.rating_a), (fight.fighter_b, fight.rating_b)):
+            row = ratings[key]
+            if key not in restored:
+                row.rating = before
+                restored.add(key)
+            row.fights -= 1
+        # last_fight_date is left alone: the replay covers the same bouts
+
+        bouts.append({
+            "fight_key": fight.fight_key,
+            "date": fight.fight_date,
+            "a": fight.fighter_a,
+            "b": fight.fighter_b,
+            "outcome": fight.outcome,
+            "method": fight.method,
+            "names": {key: ratings[key].name for key in (fight.fighter_a, fight.fighter_b)},
+        })
+        db.delete(fight)
+
+    db.flush()  # the replay re-inserts the same fight keys
+    return bouts
+
+
+def _apply_bouts(db: Session, pending: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Rate these bouts in order, starting from the stored ratings. Returns
+    {name_normalized: new rating} for the fighters that moved.
+    """
+    if not pending:
+        return {}
+
+    involved = list({key for b in pending for key in (b["a"], b["b"])})
+    ratings = {r.name_normalized: r for r in _existing(db, FighterRating, FighterRating.name_normalized, involved)}
+
+    def _rating(key: str, name: str) -> FighterRating:
+        if key not in ratings:
+            ratings[key] = FighterRating(name_normalized=key, name=name, rating=settings.RATING_BASE, fights=0)
+            db.add(ratings[key])
+        return ratings[key]
+
+    changed: Dict[str, float] = {}
+    for bout in pending:
+        ra = _rating(bout["a"], bout["names"][bout["a"]])
+        rb = _rating(bout["b"], bout["names"][bout["b"]])
+
+        score_a = {"a": 1.0, "b": 0.0, "draw": 0.5}[bout["outcome"]]
+        decisive = bout["outcome"] != "draw"
+        k_a = _k_factor(ra.fights, bout["method"], decisive)
+        k_b = _k_factor(rb.fights, bout["method"], decisive)
+
+        db.add(RatedFight(
+            fight_key=bout["fight_key"],
+            fighter_a=bout["a"],
+            fighter_b=bout["b"],
+            outcome=bout["outcome"],
+            method=bout["method"],
+            fight_date=bout["date"],
+            rating_a=ra.rating,
+            rating_b=rb.rating,
+        ))
+
+        ra.rating, rb.rating = rate_bout(ra.rating, rb.rating, score_a, k_a, k_b)
+        for row in (ra, rb):
+            row.fights += 1
+            if row.last_fight_date is None or bout["date"] > row.last_fight_date:
+                row.last_fight_date = bout["date"]
+            changed[row.name_normalized] = row.rating
+
+    return changed
+
+
+# -------------------------------------------------------
+# Incremental update (called on ingest; the caller commits)
+# -------------------------------------------------------
+def rate_new_fights(db: Session, fighters: Iterable[Fighter]) -> Dict[str, float]:
+    """
+    Apply the bouts in these fighters' histories that aren't rated yet,
+    on top of the current ratings — no full recompute. Bouts older than
+    the newest rated one (a back catalogue) are not applied here: they
+    are queued for replay_deferred(), which replays them in date order
+    once per batch.
+
+    Runs in a savepoint: if another worker rated the same bouts first,
+    only the rating writes are dropped, not the caller's transaction.
+    Pass the result to rating_index.update() once the caller commits.
+    """
+    rows = [row for fighter in fighters if fighter is not None for row in _history_rows(fighter)]
+    if not rows:
+        return {}
+
+    try:
+        with db.begin_nested():
+            pending = _unrated(db, _bouts(db, rows))
+            newest = db.query(func.max(RatedFight.fight_date)).scalar() if pending else None
+            late = [b for b in pending if newest is not None and b["date"] < newest]
+            changed = _apply_bouts(db, pending[len(late):])  # pending is date-ordered
+    except IntegrityError:
+        logger.warning("Fights were rated concurrently by another worker; skipping this update")
+        return {}
+
+    if late:
+        replay_queue.add(late)
+    if changed:
+        logger.info(f"Rated new fights: {len(changed)} ratings updated")
+    return changed
+
+
+# -------------------------------------------------------
+# Back-catalogue replay (one rewind per batch, off the ingest path)
+# -------------------------------------------------------
+class ReplayQueue:
+    """
+    Bouts that predate already-rated ones, keyed by fight_key. In memory
+    only: after a restart they are still unrated and get queued again on
+    the fighter's next ingest (or picked up by rebuild_ratings()).
+    """
+
+    def __init__(self):
+        self._bouts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, bouts: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._bouts.update({b["fight_key"]: b for b in bouts})
+
+    def drain(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            bouts, self._bouts = self._bouts, {}
+        return bouts
+
+
+replay_queue = ReplayQueue()
+
+
+def replay_deferred() -> int:
+    """
+    Rewind the rated bouts from the earliest queued date onward and replay
+    them with the queued ones in date order. Returns the bouts applied.
+    """
+    queued = replay_queue.drain()
+    if not queued:
+        return 0
+
+    try:
+        with SessionLocal() as db:
+            pending = _unrated(db, queued)
+            if not pending:
+                return 0
+            replay = _rewind(db, pending[0]["date"])
+            bouts = sorted(pending + replay, key=lambda b: (b["date"], b["fight_key"]))
+            changed = _apply_bouts(db, bouts)
+            db.commit()
+    except Exception as e:
+        replay_queue.add(list(queued.values()))  # retried on the next tick
+        logger.error(f"Rating replay failed: {e}")
+        return 0
+
+    rating_index.update(changed)
+    logger.info(f"Replayed {len(bouts)} fights from {pending[0]['date']} ({len(pending)} new)")
+    return len(bouts)
+
+
+_replay_lock = threading.Lock()
+_replay_thread: Optional[threading.Thread] = None
+
+
+def start_rating_replay() -> None:
+    """Start the periodic back-catalogue replay thread (idempotent)."""
+    global _replay_thread
+
+    def _loop():
+        while True:
+            time.sleep(settings.RATING_REPLAY_SECONDS)
+            replay_deferred()
+
+    with _replay_lock:
+        if _replay_thread is None:
+            _replay_thread = threading.Thread(target=_loop, name="rating-replay", daemon=True)
+            _replay_thread.start()
+
+
+# -------------------------------------------------------
+# Full chronological pass
+# -------------------------------------------------------
+def _all_history_rows(db: Session, batch_size: int = 200) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    last_id = 0
+    while True:
+        fighters = (
+            db.query(Fighter)
+            .filter(Fighter.id > last_id)
+            .order_by(Fighter.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not fighters:
+            return rows
+        last_id = fighters[-1].id
+        for fighter in fighters:
+            rows.extend(_history_rows(fighter))
+        db.expunge_all()  # blobs are parsed; don't keep every row in the identity map
+
+
+def rebuild_ratings() -> int:
+    """Drop every rating and replay all stored histories in date order."""
+    with SessionLocal() as db:
+        db.query(RatedFight).delete()
+        db.query(FighterRating).delete()
+        bouts = _bouts(db, _all_history_rows(db))
+        _apply_bouts(db, _unrated(db, bouts))
+        db.commit()
+
+        rating_index.load(db)
+
+    logger.info(f"Rebuilt ratings from {len(bouts)} fights")
+    return len(bouts)
+
+
+def load_or_build_ratings() -> None:
+    """Startup: build the ratings once if the table is empty, else just load them."""
+    try:
+        with SessionLocal() as db:
+            rated = db.query(RatedFight.fight_key).first() is not None
+            if rated:
+                rating_index.load(db)
+                return
+        rebuild_ratings()
+    except Exception as e:
+        logger.error(f"Loading fighter ratings failed: {e}")
+
+
+# -------------------------------------------------------
+# In-memory view used by the prediction engine and prompts
+# -------------------------------------------------------
+class RatingIndex:
+    """
+    name_normalized → rating, loaded from fighter_ratings at startup and
+    updated after every ingest that rated new fights. Lets feature
+    encoding read ratings without a query (sync and async paths alike).
+    """
+
+    def __init__(self):
+        self._ratings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: Optional[str]) -> Optional[float]:
+        with self._lock:
+            return self._ratings.get(normalize_name(name))
+
+    def update(self, ratings: Dict[str, float]) -> None:
+        with self._lock:
+            self._ratings.update(ratings)
+
+    def load(self, db: Session) -> None:
+        rows = db.query(FighterRating.name_normalized, FighterRating.rating).all()
+        with self._lock:
+            self._ratings = dict(rows)
+        logger.info(f"Loaded {len(rows)} fighter ratings")
+
+
+rating_index = RatingIndex()
+
+
+def fighter_rating(fighter: Optional[Fighter]) -> Optional[float]:
+    if fighter is None:
+        return None
+    return rating_index.get(fighter.name_normalized or fighter.name)
+
+
+# -------------------------------------------------------
+# Queries
+# -------------------------------------------------------
+def top_ratings(db: Session, limit: int = 50, min_fights: int = 0) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(FighterRating)
+        .filter(FighterRating.fights >= min_fights)
+        .order_by(FighterRating.rating.desc())
+        .limit(limit)
+        .all()
+    )
+    return [rating_to_dict(r) for r in rows]
+
+
+def rating_to_dict(row: FighterRating) -> Dict[str, Any]:
+    return {
+        "name": row.name,
+        "rating": round(row.rating, 1),
+        "fights": row.fights,
+        "last_fight_date": row.last_fight_date.isoformat() if row.last_fight_date else None,
+    }
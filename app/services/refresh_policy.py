@@ -0,0 +1,137 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+from app.config import settings
+from app.models import Fighter
+from app.services.event_service import scrape_latest_completed_event
+from app.utils.ufcstats_parsing import parse_result, history_outdated
+
+logger = logging.getLogger(__name__)
+
+SOURCE_JSON_COLUMNS = {
+    "ufcstats": "ufcstats_json",
+    "sherdog": "sherdog_json",
+    "tapology": "tapology_json",
+}
+
+
+# -------------------------------------------------------
+# TTLs
+# -------------------------------------------------------
+def source_ttl(source: str, on_card: bool = False) -> timedelta:
+    hours = {
+        "ufcstats": settings.UFCSTATS_TTL_HOURS,
+        "sherdog": settings.SHERDOG_TTL_HOURS,
+        "tapology": settings.TAPOLOGY_TTL_HOURS,
+    }[source]
+
+    if on_card:
+        hours = min(hours, settings.ON_CARD_TTL_HOURS)
+
+    return timedelta(hours=hours)
+
+
+def last_refreshed(fighter: Fighter, source: str) -> Optional[datetime]:
+    stamp = (fighter.refreshed_at_json or {}).get(source)
+    if stamp:
+        try:
+            return datetime.fromisoformat(stamp)
+        except ValueError:
+            pass
+
+    # Rows written before per-source stamps existed
+    if getattr(fighter, SOURCE_JSON_COLUMNS[source]):
+        return fighter.updated_at
+
+    return None
+
+
+# -------------------------------------------------------
+# Cheap change probe (one listing fetch per probe window)
+# -------------------------------------------------------
+_probe_lock = threading.Lock()
+_probe: Dict[str, Any] = {"checked_at": None, "event": None}
+
+
+def latest_completed_event() -> Optional[Dict[str, Any]]:
+    with _probe_lock:
+        checked_at = _probe["checked_at"]
+        window = timedelta(minutes=settings.COMPLETED_EVENT_PROBE_MINUTES)
+
+        if checked_at is None or datetime.utcnow() - checked_at > window:
+            event = scrape_latest_completed_event()
+            if event or checked_at is None:
+                _probe["event"] = event
+            _probe["checked_at"] = datetime.utcnow()
+
+        return _probe["event"]
+
+
+def ufcstats_changed_since(fighter: Fighter, refreshed_at: datetime) -> bool:
+    """
+    False only when we can show nothing new happened:
+    - the fighter's latest stored fight IS the latest completed event, or
+    - no UFC event has completed since the last refresh.
+    """
+    latest = latest_completed_event()
+    if not latest:
+        return True  # can't tell → be safe
+
+    history = (fighter.ufcstats_json or {}).get("fight_history") or []
+    # Fighters on a card have an upcoming "next" row first; skip to the last completed bout
+    last_fight = next((row for row in history if parse_result(row.get("result")) is not None), None)
+    if last_fight:
+        last_fight_event = " ".join(str(last_fight.get("event", "")).lower().split())
+        if latest["event_name"].lower() in last_fight_event:
+            return False
+
+    return latest["event_date"] >= refreshed_at.date()
+
+
+# -------------------------------------------------------
+# Refresh plan
+# -------------------------------------------------------
+def plan_refresh(
+    fighter: Optional[Fighter],
+    on_card: bool = False,
+    force: bool = False,
+) -> Tuple[List[str], List[str]]:
+    """
+    Returns (to_scrape, confirmed):
+      to_scrape — sources that need a full re-scrape
+      confirmed — sources past TTL whose data was proven unchanged
+                  (their timestamp is bumped without scraping)
+    """
+    sources = list(SOURCE_JSON_COLUMNS)
+
+    if fighter is None or force:
+        return sources, []
+
+    now = datetime.utcnow()
+    to_scrape: List[str] = []
+    confirmed: List[str] = []
+
+    for source in sources:
+        refreshed_at = last_refreshed(fighter, source)
+
+        if refreshed_at is None:
+            to_scrape.append(source)
+            continue
+
+        # History stored with the old column mapping has no usable methods
+        if source == "ufcstats" and history_outdated((fighter.ufcstats_json or {}).get("fight_history")):
+            to_scrape.append(source)
+            continue
+
+        if now - refreshed_at < source_ttl(source, on_card):
+            continue
+
+        if source == "ufcstats" and not ufcstats_changed_since(fighter, refreshed_at):
+            confirmed.append(source)
+            continue
+
+        to_scrape.append(source)
+
+    return to_scrape, confirmed
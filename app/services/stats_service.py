@@ -0,0 +1,189 @@
+import logging
+from datetime import date, datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Fighter, FighterStats
+from app.utils.names import normalize_name
+from app.utils.ufcstats_parsing import (
+    parse_career_stats,
+    parse_attributes,
+    summarize_history,
+    history_outdated,
+)
+
+logger = logging.getLogger(__name__)
+
+# Columns the search endpoint may filter (min/max) or sort on
+NUMERIC_FIELDS = (
+    "height_in", "weight_lbs", "reach_in",
+    "slpm", "str_acc", "sapm", "str_def",
+    "td_avg", "td_acc", "td_def", "sub_avg",
+    "wins", "losses", "draws",
+    "wins_ko", "wins_sub", "wins_dec", "losses_ko", "losses_sub", "finish_rate",
+)
+FINISH_FIELDS = ("wins_ko", "wins_sub", "wins_dec", "losses_ko", "losses_sub")
+SORT_FIELDS = NUMERIC_FIELDS + ("dob",)
+
+
+# -------------------------------------------------------
+# Parse → typed columns
+# -------------------------------------------------------
+def parse_fighter_stats(ufcstats_json: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    ufc = ufcstats_json or {}
+    attributes = ufc.get("attributes") or {}
+
+    physical = parse_attributes(attributes)
+    physical.pop("age", None)  # derived from dob at query time
+
+    # UFCStats lists career stats in the same <li> boxes as attributes
+    career = parse_career_stats({**attributes, **(ufc.get("career_stats") or {})})
+    history = ufc.get("fight_history")
+    record = summarize_history(history)
+
+    # Methods are unknown for histories stored with the old column mapping
+    finishes = {f: None for f in FINISH_FIELDS + ("finish_rate",)}
+    if not history_outdated(history):
+        finishes = {f: record[f] for f in FINISH_FIELDS}
+        if record["wins"]:
+            finishes["finish_rate"] = round((record["wins_ko"] + record["wins_sub"]) / record["wins"], 4)
+
+    return {
+        **physical,
+        **career,
+        "wins": record["wins"],
+        "losses": record["losses"],
+        "draws": record["draws"],
+        **finishes,
+    }
+
+
+def apply_fighter_stats(fighter: Fighter) -> Optional[FighterStats]:
+    """
+    Set fighter.stats from its UFCStats blob (no commit — it is written
+    with the fighter row). Fighters without UFCStats data are skipped.
+    """
+    if not fighter.ufcstats_json:
+        return fighter.stats
+
+    values = parse_fighter_stats(fighter.ufcstats_json)
+
+    if fighter.stats is None:
+        fighter.stats = FighterStats(**values)
+    else:
+        for column, value in values.items():
+            setattr(fighter.stats, column, value)
+
+    return fighter.stats
+
+
+def backfill_fighter_stats(batch_size: int = 200) -> int:
+    """
+    Populate fighter_stats for rows stored before the table (or its
+    finish columns) existed.
+    """
+    count = 0
+    last_id = 0
+
+    try:
+        with SessionLocal() as db:
+            while True:
+                fighters = (
+                    db.query(Fighter)
+                    .outerjoin(FighterStats)
+                    .filter(
+                        or_(FighterStats.fighter_id.is_(None), FighterStats.wins_ko.is_(None)),
+                        Fighter.id > last_id,
+                    )
+                    .order_by(Fighter.id.asc())
+                    .limit(batch_size)
+                    .all()
+                )
+                if not fighters:
+                    break
+
+                last_id = fighters[-1].id
+                for fighter in fighters:
+                    if apply_fighter_stats(fighter) is not None:
+                        count += 1
+                db.commit()
+    except Exception as e:
+        logger.error(f"Fighter stats backfill failed: {e}")
+
+    if count:
+        logger.info(f"Backfilled typed stats for {count} fighters")
+    return count
+
+
+# -------------------------------------------------------
+# Search / filter (SQL over the typed columns)
+# -------------------------------------------------------
+def _years_ago(years: float) -> date:
+    today = datetime.utcnow().date()
+    return date.fromordinal(today.toordinal() - int(years * 365.25))
+
+
+def search_fighters(
+    db: Session,
+    name: Optional[str] = None,
+    stance: Optional[str] = None,
+    ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    min_age: Optional[float] = None,
+    max_age: Optional[float] = None,
+    sort_by: str = "wins",
+    descending: bool = True,
+    limit: int = 50,
+    offset: int = 0,
+) -> List[Tuple[Fighter, FighterStats]]:
+    """
+    ranges = {column: (min, max)} over NUMERIC_FIELDS; either bound may
+    be None. Ages are translated to dob bounds so the index is used.
+    """
+    query = db.query(Fighter, FighterStats).join(FighterStats, FighterStats.fighter_id == Fighter.id)
+
+    if name:
+        query = query.filter(Fighter.name_normalized.contains(normalize_name(name)))
+    if stance:
+        query = query.filter(FighterStats.stance.ilike(stance.strip()))
+
+    for column, (low, high) in (ranges or {}).items():
+        if column not in NUMERIC_FIELDS:
+            raise ValueError(f"Unknown stats column: {column}")
+        field = getattr(FighterStats, column)
+        if low is not None:
+            query = query.filter(field >= low)
+        if high is not None:
+            query = query.filter(field <= high)
+
+    # older than min_age → born on/before; younger than max_age → born after
+    if min_age is not None:
+        query = query.filter(FighterStats.dob <= _years_ago(min_age))
+    if max_age is not None:
+        query = query.filter(FighterStats.dob > _years_ago(max_age))
+
+    if sort_by not in SORT_FIELDS:
+        raise ValueError(f"Cannot sort by: {sort_by}")
+    order = getattr(FighterStats, sort_by)
+    order = order.desc() if descending else order.asc()
+
+    return (
+        query.order_by(order.nulls_last(), Fighter.name.asc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+
+def stats_to_dict(fighter: Fighter, stats: Optional[FighterStats]) -> Dict[str, Any]:
+    out = {"name": fighter.name, "ufcstats_id": fighter.ufcstats_id}
+    if stats is None:
+        return out
+
+    for column in SORT_FIELDS + ("stance",):
+        value = getattr(stats, column)
+        out[column] = value.isoformat() if isinstance(value, date) else value
+
+    return out
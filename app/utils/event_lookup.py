@@ -1,10 +1,11 @@
 import logging
-import requests
 from bs4 import BeautifulSoup
 from typing import List, Dict, Any, Optional
 
 from app.schemas import EventRead, FightPair
 from app.utils.gpt_safe import gpt_safe_call
+from app.utils.llm_cache import TTL_EVENT
+from app.utils.http_client import http_get
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +32,9 @@ def gpt_fallback_next_event() -> EventRead:
         "}"
     )
 
-    raw = gpt_safe_call([
-        {"role": "user", "content": prompt}
-    ])
+    raw = gpt_safe_call(
+        [{"role": "user", "content": prompt}], cache_ttl=TTL_EVENT
+    )
 
     # Parse GPT output
     try:
@@ -70,7 +71,7 @@ def scrape_event_url() -> Optional[str]:
     logger.info("Scraping UFCStats upcoming events...")
 
     try:
-        html = requests.get(UFC_UPCOMING, timeout=10).text
+        html = http_get(UFC_UPCOMING).text
     except Exception as e:
         logger.error(f"Failed to fetch UFC upcoming events: {e}")
         return None
@@ -109,7 +110,7 @@ def scrape_event_details(event_url: str) -> Optional[EventRead]:
     logger.info(f"Scraping event page: {event_url}")
 
     try:
-        html = requests.get(event_url, timeout=10).text
+        html = http_get(event_url).text
     except Exception as e:
         logger.error(f"Failed to fetch event page: {e}")
         return None
@@ -1,15 +1,47 @@
-def gpt_safe_call(messages):
+import logging
+from typing import Optional
+
+from app.config import settings
+from app.utils.llm_cache import llm_cache
+from app.utils.openai_client import client
+
+logger = logging.getLogger(__name__)
+
+
+def gpt_safe_call(
+    messages,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.4,
+    cache_ttl: Optional[int] = None,
+):
+    """
+    Never-raising chat completion.
+    Pass cache_ttl (seconds) to serve identical (model, messages, temperature)
+    requests from the LLM cache; empty/failed responses are never cached.
+    """
     try:
         # messages can now be raw strings OR dicts
         if isinstance(messages[0], str):
             messages = [{"role": "user", "content": messages[0]}]
 
+        use_cache = bool(cache_ttl) and settings.LLM_CACHE_ENABLED
+
+        if use_cache:
+            cached = llm_cache.get(model, messages, temperature)
+            if cached is not None:
+                return cached
+
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=model,
             messages=messages,
-            temperature=0.4
+            temperature=temperature
         )
-        return response.choices[0].message.content.strip()
+        content = (response.choices[0].message.content or "").strip()
+
+        if use_cache and content:
+            llm_cache.set(model, messages, temperature, content, ttl=cache_ttl)
+
+        return content
 
     except Exception as e:
         logger.error(f"GPT call failed: {e}")
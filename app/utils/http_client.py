@@ -0,0 +1,99 @@
+import logging
+import threading
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+# ---------------------------------------------------------
+# Session factory
+# ---------------------------------------------------------
+
+def _build_session() -> requests.Session:
+    """
+    One pooled session for the whole process:
+    - per-host connection pools (urllib3 keeps sockets alive between calls)
+    - retries with backoff on connection errors and 429/5xx
+    - gzip/deflate accepted and decoded transparently
+    """
+    retry = Retry(
+        total=settings.HTTP_MAX_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared pooled session (created lazily, thread-safe)."""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                logger.info("Creating shared HTTP session.")
+                _session = _build_session()
+
+    return _session
+
+
+def default_timeout() -> Tuple[float, float]:
+    return (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+
+
+# ---------------------------------------------------------
+# Public API
+# ---------------------------------------------------------
+
+def http_get(
+    url: str,
+    timeout: Optional[Union[float, Tuple[float, float]]] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    GET through the shared session.
+    Drop-in replacement for requests.get(...) in the scrapers.
+    """
+    return get_session().get(url, timeout=timeout or default_timeout(), **kwargs)
+
+
+def close_session() -> None:
+    """Close pooled connections (used on app shutdown)."""
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,135 @@
+import re
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Iterable
+
+from app.config import settings
+from app.utils.gpt_safe import gpt_safe_call
+from app.utils.llm_cache import TTL_IDENTITY
+
+logger = logging.getLogger(__name__)
+
+# source → JSON field the model fills in
+SOURCE_FIELDS = {
+    "ufcstats": "ufcstats_url",
+    "sherdog": "sherdog_url",
+    "tapology": "tapology_slug",
+}
+
+
+# ---------------------------------------------------------
+# Validators (same rules the single-name resolvers apply)
+# ---------------------------------------------------------
+
+def _clean_url(value: Optional[str], domain: str) -> Optional[str]:
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value.lower() == "null" or not value.startswith("http") or domain not in value:
+        return None
+    return value
+
+
+def _clean_slug(value: Optional[str]) -> Optional[str]:
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip().lower().rstrip("/")
+    if value == "null":
+        return None
+    if "/" in value:
+        value = value.split("/")[-1]
+    if not value or " " in value:
+        return None
+    return value
+
+
+_VALIDATORS = {
+    "ufcstats": lambda v: _clean_url(v, "ufcstats.com"),
+    "sherdog": lambda v: _clean_url(v, "sherdog.com"),
+    "tapology": _clean_slug,
+}
+
+
+# ---------------------------------------------------------
+# One structured request per chunk
+# ---------------------------------------------------------
+
+def _build_prompt(names: List[str], sources: List[str]) -> str:
+    fields = ", ".join(f'"{SOURCE_FIELDS[s]}": str|null' for s in sources)
+    return (
+        "For each MMA fighter below, give the exact profile identifiers.\n"
+        "- ufcstats_url: full http://ufcstats.com/fighter-details/... URL\n"
+        "- sherdog_url: full https://www.sherdog.com/fighter/... URL\n"
+        "- tapology_slug: Tapology fighter slug only, e.g. jon-jones\n"
+        "Use null for anything you are not sure about. No extra text.\n\n"
+        f'Return ONLY JSON: {{"fighters": [{{"name": str, {fields}}}]}}\n\n'
+        f"Fighters:\n{json.dumps(names)}"
+    )
+
+
+def _parse(raw: str) -> List[dict]:
+    match = re.search(r"\{.*\}", raw or "", re.DOTALL)
+    if not match:
+        return []
+    try:
+        return json.loads(match.group(0)).get("fighters", []) or []
+    except Exception:
+        logger.error("Batch identity response was not valid JSON.")
+        return []
+
+
+def _resolve_chunk(names: List[str], sources: List[str]) -> Dict[str, Dict[str, Optional[str]]]:
+    raw = gpt_safe_call(
+        [{"role": "user", "content": _build_prompt(names, sources)}],
+        temperature=0.0,
+        cache_ttl=TTL_IDENTITY,
+    )
+
+    by_lower = {n.lower(): n for n in names}
+    out: Dict[str, Dict[str, Optional[str]]] = {}
+
+    for item in _parse(raw):
+        name = by_lower.get(str(item.get("name", "")).strip().lower())
+        if not name:
+            continue
+        out[name] = {
+            s: _VALIDATORS[s](item.get(SOURCE_FIELDS[s])) for s in sources
+        }
+
+    return out
+
+
+# ---------------------------------------------------------
+# Public API
+# ---------------------------------------------------------
+
+def resolve_identities_batch(
+    names: Iterable[str],
+    sources: Iterable[str] = ("ufcstats", "sherdog", "tapology"),
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Resolve identifiers for many fighters in a handful of GPT calls.
+
+    Returns {name: {source: identifier|None}} for every requested name
+    (names the model skipped map to all-None).
+    """
+    names = sorted(set(n for n in names if n))  # sorted → stable cache keys
+    sources = [s for s in SOURCE_FIELDS if s in set(sources)]
+    result = {n: {s: None for s in sources} for n in names}
+
+    if not names or not sources:
+        return result
+
+    size = max(1, chunk_size or settings.IDENTITY_BATCH_SIZE)
+    chunks = [names[i:i + size] for i in range(0, len(names), size)]
+
+    logger.info(f"Batch-resolving {len(names)} fighters × {sources} in {len(chunks)} request(s)...")
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        for resolved in pool.map(lambda c: _resolve_chunk(c, sources), chunks):
+            for name, ids in resolved.items():
+                result[name].update(ids)
+
+    return result
@@ -0,0 +1,137 @@
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------
+# Per-call-site TTLs (seconds)
+# ---------------------------------------------------------
+TTL_IDENTITY = 30 * 24 * 3600   # slug / profile URL lookups — almost never change
+TTL_EVENT = 6 * 3600            # "what is the next event" fallback
+TTL_ODDS = 3600                 # odds fallback
+
+
+def make_key(model: str, messages: List[Dict[str, Any]], temperature: float) -> str:
+    """Stable SHA-256 over (model, messages, temperature)."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+# Two-tier cache: in-process LRU → llm_cache table
+# ---------------------------------------------------------
+class LLMCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[str, datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    # ---- stats ----
+    def _bump(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["memory_entries"] = len(self._memory)
+
+        lookups = out["memory_hits"] + out["db_hits"] + out["misses"]
+        out["hit_rate"] = round((out["memory_hits"] + out["db_hits"]) / lookups, 4) if lookups else 0.0
+        return out
+
+    # ---- memory tier ----
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None:
+                return None
+
+            value, expires_at = item
+            if expires_at <= datetime.utcnow():
+                del self._memory[key]
+                return None
+
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_set(self, key: str, value: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    # ---- public API ----
+    def get(self, model: str, messages: List[Dict[str, Any]], temperature: float) -> Optional[str]:
+        key = make_key(model, messages, temperature)
+
+        value = self._memory_get(key)
+        if value is not None:
+            self._bump("memory_hits")
+            return value
+
+        try:
+            with SessionLocal() as db:
+                row = db.get(LLMCacheEntry, key)
+                if row is not None and row.expires_at > datetime.utcnow():
+                    self._memory_set(key, row.response, row.expires_at)
+                    self._bump("db_hits")
+                    return row.response
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            self._bump("errors")
+
+        self._bump("misses")
+        return None
+
+    def set(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        value: str,
+        ttl: int,
+    ) -> None:
+        key = make_key(model, messages, temperature)
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+
+        self._memory_set(key, value, expires_at)
+
+        try:
+            with SessionLocal() as db:
+                db.merge(
+                    LLMCacheEntry(
+                        key=key,
+                        model=model,
+                        response=value,
+                        created_at=datetime.utcnow(),
+                        expires_at=expires_at,
+                    )
+                )
+                db.commit()
+            self._bump("writes")
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+            self._bump("errors")
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+
+llm_cache = LLMCache(max_entries=settings.LLM_CACHE_MEMORY_SIZE)
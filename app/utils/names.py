@@ -0,0 +1,28 @@
+import re
+import unicodedata
+from typing import Optional
+
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+
+# Letters NFKD does not decompose into base + accent
+_FOLD = str.maketrans({
+    "ł": "l", "Ł": "l", "ø": "o", "Ø": "o", "đ": "d", "Đ": "d",
+    "æ": "ae", "Æ": "ae", "œ": "oe", "Œ": "oe", "ı": "i",
+})
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """
+    Accent- and case-folded, punctuation-free, single-spaced name.
+    "José Aldo" → "jose aldo", "Jiří Procházka" → "jiri prochazka",
+    "B.J. Penn" → "bj penn", "Da'Mon  Blackshear" → "damon blackshear"
+    """
+    if not name:
+        return ""
+
+    text = unicodedata.normalize("NFKD", name.replace("\xa0", " ").translate(_FOLD))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold().replace("-", " ")
+    text = _NON_ALNUM.sub("", text)
+
+    return " ".join(text.split())
@@ -1,176 +1,226 @@
+import re
+import json
 import logging
-import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 
 from app.schemas import MatchupOdds
 from app.utils.gpt_safe import gpt_safe_call
+from app.utils.llm_cache import TTL_ODDS
+from app.utils.http_client import http_get
+from app.utils.odds_math import (
+    odds_matrix,
+    market_summary,
+    format_american,
+    round_or_none,
+    book_lines,
+)
 
 logger = logging.getLogger(__name__)
 
-BFO_BASE = "[https://www.bestfightodds.com](https://www.bestfightodds.com)"
+BFO_BASE = "https://www.bestfightodds.com"
 
 # ---------------------------------------------------------
-
 # Helper: Scrape odds for a single event
-
 # ---------------------------------------------------------
 
 def _scrape_event_page(event_name: str) -> Optional[str]:
-"""
-Searches BestFightOdds homepage for the first event matching event_name.
-Returns the full event URL or None.
-"""
-try:
-html = requests.get(BFO_BASE, timeout=10).text
-except Exception as e:
-logger.error(f"Error loading BestFightOdds homepage: {e}")
-return None
-
-```
-soup = BeautifulSoup(html, "html.parser")
-
-# Look for events in sidebar
-event_links = soup.find_all("a", class_="event-link")
-for link in event_links:
-    text = link.text.strip().lower()
-    if event_name.lower().split()[0] in text:  # match on keyword
-        return BFO_BASE + link["href"]
-
-return None
-```
+    """
+    Searches BestFightOdds homepage for the first event matching event_name.
+    Returns the full event URL or None.
+    """
+    try:
+        html = http_get(BFO_BASE).text
+    except Exception as e:
+        logger.error(f"Error loading BestFightOdds homepage: {e}")
+        return None
 
-# ---------------------------------------------------------
+    soup = BeautifulSoup(html, "html.parser")
 
-# Helper: Extract matchup odds from event page
+    # Look for events in sidebar
+    event_links = soup.find_all("a", class_="event-link")
+    for link in event_links:
+        text = link.text.strip().lower()
+        if event_name.lower().split()[0] in text:  # match on keyword
+            return BFO_BASE + link["href"]
 
+    return None
+
+
+# ---------------------------------------------------------
+# Helper: Extract matchup odds from event page
 # ---------------------------------------------------------
 
-def _scrape_matchups(url: str, matchups: List[Dict[str, str]]) -> List[MatchupOdds]:
-"""
-Scrape odds for each fight on the event page.
-matchups = [{"fighter_a": "...", "fighter_b": "..."}]
-"""
-logger.info(f"Scraping BFO odds from: {url}")
-
-```
-try:
-    html = requests.get(url, timeout=10).text
-except Exception as e:
-    logger.error(f"Error fetching BFO event page: {e}")
-    return []
-
-soup = BeautifulSoup(html, "html.parser")
-
-result = []
-
-fight_rows = soup.find_all("tr", class_="fight-row")
-for fight in fight_rows:
-    fighters = fight.find_all("td", class_="fighter-cell")
-    odds_cells = fight.find_all("td", class_="odds-cell")
-
-    if len(fighters) != 2 or len(odds_cells) < 1:
-        continue
-
-    f1 = fighters[0].get_text(strip=True)
-    f2 = fighters[1].get_text(strip=True)
-
-    # odds-cell contains multiple books; take first book's odds
-    odds_text = odds_cells[0].get_text(" ", strip=True).split()
-    if len(odds_text) >= 2:
-        f1_odds = odds_text[0]
-        f2_odds = odds_text[1]
-    else:
-        f1_odds = None
-        f2_odds = None
-
-    # Try to match to our fight list
+def _book_names(soup: BeautifulSoup, n_books: int) -> List[str]:
+    """Column headers of the odds table (first header cell is the fighter column)."""
+    header = soup.find("tr", class_="book-row") or soup.find("thead")
+    names = [th.get_text(strip=True) for th in header.find_all("th")[1:]] if header else []
+    names = [n or f"book_{i + 1}" for i, n in enumerate(names)]
+    return names[:n_books] + [f"book_{i + 1}" for i in range(len(names), n_books)]
+
+
+def _match(matchups: List[Dict[str, str]], f1: str, f2: str) -> Optional[Tuple[Dict[str, str], bool]]:
+    """The card matchup for this row, and whether BFO lists it the other way round."""
+    f1, f2 = f1.lower(), f2.lower()
     for m in matchups:
-        a, b = m["fighter_a"], m["fighter_b"]
-
-        if (
-            a.lower() in f1.lower() and b.lower() in f2.lower()
-        ) or (
-            b.lower() in f1.lower() and a.lower() in f2.lower()
-        ):
-            result.append(
-                MatchupOdds(
-                    fighter_a=a,
-                    fighter_b=b,
-                    odds_a=f1_odds,
-                    odds_b=f2_odds,
-                    book="BFO"
-                )
+        a, b = m["fighter_a"].lower(), m["fighter_b"].lower()
+        if a in f1 and b in f2:
+            return m, False
+        if b in f1 and a in f2:
+            return m, True
+    return None
+
+
+def summarize_books(
+    matchups: List[Dict[str, str]],
+    rows: List[List[Tuple[Any, Any]]],
+    books: List[str],
+    source: Optional[str] = None,
+) -> List[MatchupOdds]:
+    """
+    rows[i][book] = (line_a, line_b) for matchups[i] (already oriented
+    A/B). Best and consensus lines for all fights come from one
+    vectorized pass over the fight × side × book matrix.
+    """
+    matrix = odds_matrix(rows, len(books))
+    summary = market_summary(matrix)
+    result = []
+
+    for i, m in enumerate(matchups):
+        best_book = [books[j] if j >= 0 else None for j in summary["best_book"][i]]
+        result.append(
+            MatchupOdds(
+                fighter_a=m["fighter_a"],
+                fighter_b=m["fighter_b"],
+                odds_a=format_american(summary["best"][i, 0]),
+                odds_b=format_american(summary["best"][i, 1]),
+                book=source or best_book[0],
+                book_b=source or best_book[1],
+                books=book_lines(matrix[i], books),
+                consensus_a=format_american(summary["consensus"][i, 0]),
+                consensus_b=format_american(summary["consensus"][i, 1]),
+                fair_probability_a=round_or_none(summary["fair"][i, 0]),
+                fair_probability_b=round_or_none(summary["fair"][i, 1]),
+                overround=round_or_none(summary["overround"][i]),
             )
-            break
+        )
 
-return result
-```
+    return result
 
-# ---------------------------------------------------------
 
-# GPT Fallback
+def _scrape_matchups(url: str, matchups: List[Dict[str, str]]) -> List[MatchupOdds]:
+    """
+    Scrape every book's odds for each fight on the event page.
+    matchups = [{"fighter_a": "...", "fighter_b": "..."}]
+    """
+    logger.info(f"Scraping BFO odds from: {url}")
+
+    try:
+        html = http_get(url).text
+    except Exception as e:
+        logger.error(f"Error fetching BFO event page: {e}")
+        return []
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    matched: List[Dict[str, str]] = []
+    rows: List[List[Tuple[Any, Any]]] = []
+
+    fight_rows = soup.find_all("tr", class_="fight-row")
+    for fight in fight_rows:
+        fighters = fight.find_all("td", class_="fighter-cell")
+        odds_cells = fight.find_all("td", class_="odds-cell")
+
+        if len(fighters) != 2 or len(odds_cells) < 1:
+            continue
+
+        found = _match(matchups, fighters[0].get_text(strip=True), fighters[1].get_text(strip=True))
+        if found is None:
+            continue
+        matchup, swapped = found
+
+        # One odds-cell per book, holding both fighters' lines in page order
+        lines = []
+        for cell in odds_cells:
+            text = cell.get_text(" ", strip=True).split()
+            pair = (text[0], text[1]) if len(text) >= 2 else (None, None)
+            lines.append(pair[::-1] if swapped else pair)
+
+        matched.append(matchup)
+        rows.append(lines)
+
+    if not matched:
+        return []
+
+    books = _book_names(soup, max(len(r) for r in rows))
+    return summarize_books(matched, rows, books)
+
 
+# ---------------------------------------------------------
+# GPT Fallback
 # ---------------------------------------------------------
 
 def _gpt_odds_fallback(matchups: List[Dict[str, str]]):
-"""
-If BestFightOdds scraping fails, use GPT to retrieve approximate odds.
-"""
-prompt = (
-"Provide CURRENT betting odds for these UFC matchups. "
-"Return ONLY JSON like this:\n"
-"{ 'odds': [ { 'fighter_a': '', 'fighter_b': '', 'odds_a': '', 'odds_b': '' } ] }\n\n"
-f"Matchups:\n{matchups}"
-)
+    """
+    If BestFightOdds scraping fails, use GPT to retrieve approximate odds.
+    """
+    prompt = (
+        "Provide CURRENT betting odds for these UFC matchups. "
+        "Return ONLY JSON like this:\n"
+        '{"odds": [{"fighter_a": "", "fighter_b": "", "odds_a": "", "odds_b": ""}]}\n\n'
+        f"Matchups:\n{json.dumps(matchups)}"
+    )
+
+    raw = gpt_safe_call(
+        [{"role": "user", "content": prompt}], cache_ttl=TTL_ODDS
+    )
+    return _parse_gpt_odds(raw)
 
-```
-raw = gpt_safe_call([{"role": "user", "content": prompt}])
 
-try:
-    parsed = eval(raw)
-    return parsed["odds"]
-except Exception:
-    logger.error("GPT fallback odds parsing failed.")
-    return []
-```
+def _parse_gpt_odds(raw: str) -> List[Dict[str, Any]]:
+    """The fallback reply is model output: parsed as JSON, never evaluated."""
+    match = re.search(r"\{.*\}", raw or "", re.DOTALL)
+    try:
+        odds = json.loads(match.group(0))["odds"] if match else None
+    except Exception:
+        odds = None
+    if not isinstance(odds, list):
+        logger.error("GPT fallback odds parsing failed.")
+        return []
+    return [o for o in odds if isinstance(o, dict)]
 
-# ---------------------------------------------------------
 
+# ---------------------------------------------------------
 # Public API
-
 # ---------------------------------------------------------
 
 def get_odds_for_matchups(event_name: str, matchups: List[Dict[str, str]]) -> List[MatchupOdds]:
-"""
-Full pipeline:
-1. Find event page on BestFightOdds
-2. Scrape odds for matchups
-3. GPT fallback if scraping fails or yields incomplete data
-"""
-logger.info(f"Fetching odds for event: {event_name}")
-
-```
-# Step 1 — find event page
-event_url = _scrape_event_page(event_name)
-
-if event_url:
-    odds = _scrape_matchups(event_url, matchups)
-    if odds:
-        return odds
-
-logger.warning("Scraping failed or returned no odds. Using GPT fallback.")
-gpt_odds = _gpt_odds_fallback(matchups)
-
-# Convert fallback odds to schema
-return [
-    MatchupOdds(
-        fighter_a=o["fighter_a"],
-        fighter_b=o["fighter_b"],
-        odds_a=o.get("odds_a"),
-        odds_b=o.get("odds_b"),
-        book="GPT Fallback"
+    """
+    Full pipeline:
+    1. Find event page on BestFightOdds
+    2. Scrape odds for matchups
+    3. GPT fallback if scraping fails or yields incomplete data
+    """
+    logger.info(f"Fetching odds for event: {event_name}")
+
+    # Step 1 — find event page
+    event_url = _scrape_event_page(event_name)
+
+    if event_url:
+        odds = _scrape_matchups(event_url, matchups)
+        if odds:
+            return odds
+
+    logger.warning("Scraping failed or returned no odds. Using GPT fallback.")
+    gpt_odds = _gpt_odds_fallback(matchups)
+
+    # Convert fallback odds to schema (a single pseudo-book)
+    gpt_odds = [o for o in gpt_odds if o.get("fighter_a") and o.get("fighter_b")]
+    if not gpt_odds:
+        return []
+    return summarize_books(
+        gpt_odds,
+        [[(o.get("odds_a"), o.get("odds_b"))] for o in gpt_odds],
+        ["GPT Fallback"],
+        source="GPT Fallback",
     )
-    for o in gpt_odds
-]
-```
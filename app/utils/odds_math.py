@@ -0,0 +1,136 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# ---------------------------------------------------------
+# American odds ⇄ decimal odds ⇄ implied probability
+# (NaN marks a missing line; every function accepts scalars or arrays)
+# ---------------------------------------------------------
+
+ArrayLike = Union[float, np.ndarray]
+
+_AMERICAN = re.compile(r"[+-]?\d+(?:\.\d+)?")
+
+
+def parse_american(value: Any) -> float:
+    """ "+150" / "-200" / 150 / "EVEN" → float; missing or garbled → NaN. """
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value) if value and abs(value) >= 100 else np.nan
+
+    text = str(value).strip().replace("−", "-").upper()
+    if text in ("EV", "EVEN", "PK"):
+        return 100.0
+    # Books decorate lines with movement arrows etc. ("-150▲")
+    match = _AMERICAN.search(text)
+    if not match:
+        return np.nan
+
+    odds = float(match.group(0))
+    return odds if abs(odds) >= 100 else np.nan
+
+
+def american_to_decimal(odds: ArrayLike) -> ArrayLike:
+    """+150 → 2.5, -200 → 1.5 (total return per unit staked)."""
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        decimal = np.where(odds > 0, 1.0 + odds / 100.0, 1.0 + 100.0 / np.abs(odds))
+    return np.where(np.isnan(odds), np.nan, decimal)
+
+
+def decimal_to_american(decimal: ArrayLike) -> ArrayLike:
+    decimal = np.asarray(decimal, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(decimal >= 2.0, (decimal - 1.0) * 100.0, -100.0 / (decimal - 1.0))
+
+
+def implied_probability(odds: ArrayLike) -> ArrayLike:
+    """Break-even probability of an American line (vig included)."""
+    return 1.0 / american_to_decimal(odds)
+
+
+def format_american(odds: Optional[float]) -> Optional[str]:
+    """150.4 → "+150", -200 → "-200", NaN → None."""
+    if odds is None or np.isnan(odds):
+        return None
+    return f"{int(round(odds)):+d}"
+
+
+def no_vig_probabilities(odds_a: ArrayLike, odds_b: ArrayLike):
+    """Two-way market → fair (P(A), P(B)), the overround removed proportionally."""
+    p_a, p_b = implied_probability(odds_a), implied_probability(odds_b)
+    total = p_a + p_b
+    return p_a / total, p_b / total
+
+
+# ---------------------------------------------------------
+# Multi-book matrix: (fights, 2 sides, books), NaN = book has no line
+# ---------------------------------------------------------
+def odds_matrix(rows: Sequence[Sequence[Sequence[Any]]], n_books: Optional[int] = None) -> np.ndarray:
+    """
+    rows[fight][book] = (line_a, line_b) as scraped → float matrix of
+    shape (fights, 2, books); rows with fewer books are NaN-padded.
+    """
+    n_books = n_books or max((len(r) for r in rows), default=0)
+    matrix = np.full((len(rows), 2, n_books), np.nan)
+    for i, books in enumerate(rows):
+        for j, pair in enumerate(books[:n_books]):
+            matrix[i, 0, j] = parse_american(pair[0])
+            matrix[i, 1, j] = parse_american(pair[1])
+    return matrix
+
+
+def remove_vig(matrix: np.ndarray) -> np.ndarray:
+    """Per book, implied probabilities scaled to sum to 1 across the two sides."""
+    implied = implied_probability(matrix)
+    return implied / implied.sum(axis=1, keepdims=True)  # NaN if either side is missing
+
+
+def market_summary(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Every fight at once:
+      best       (F, 2) best American line per side across books
+      best_book  (F, 2) column of that line (-1 if no book has one)
+      fair       (F, 2) consensus no-vig probability (mean over complete books)
+      consensus  (F, 2) fair line as American odds
+      overround  (F,)   mean bookmaker margin (implied sum − 1)
+      books      (F,)   books quoting both sides
+    """
+    decimal = american_to_decimal(matrix)
+    has_line = ~np.isnan(decimal)
+
+    any_line = has_line.any(axis=2)
+    best_book = np.where(any_line, np.argmax(np.where(has_line, decimal, -np.inf), axis=2), -1)
+    best = np.take_along_axis(matrix, np.maximum(best_book, 0)[..., None], axis=2)[..., 0]
+    best = np.where(any_line, best, np.nan)
+
+    complete = has_line.all(axis=1)                        # (F, B)
+    n_complete = complete.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fair = np.nansum(np.where(complete[:, None, :], remove_vig(matrix), 0.0), axis=2) / n_complete[:, None]
+        overround = np.nansum(np.where(complete, implied_probability(matrix).sum(axis=1) - 1.0, 0.0), axis=1) / n_complete
+        consensus = decimal_to_american(1.0 / fair)
+
+    return {
+        "best": best,
+        "best_book": best_book,
+        "fair": fair,
+        "consensus": consensus,
+        "overround": overround,
+        "books": n_complete,
+    }
+
+
+def round_or_none(value: float, digits: int = 4) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def book_lines(matrix_row: np.ndarray, books: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+    """One fight's (2, books) slice → {book: {"odds_a", "odds_b"}} for books with any line."""
+    return {
+        book: {"odds_a": round_or_none(matrix_row[0, j], 0), "odds_b": round_or_none(matrix_row[1, j], 0)}
+        for j, book in enumerate(books)
+        if not np.isnan(matrix_row[:, j]).all()
+    }
@@ -1,36 +1,139 @@
 import logging
-from typing import List, Dict, Any
-from openai import OpenAI
+import threading
+from typing import List, Dict, Any, Iterator, Optional
+from openai import OpenAI, AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
 client = OpenAI()
+# Non-blocking client for async routes: in-flight calls hold no thread
+async_client = AsyncOpenAI()
 
-def run(messages: List[Dict[str, str]]) -> str:
+def run(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4o-mini",
+    temperature: Optional[float] = None,
+    max_tokens: int = 1000,
+    timeout: Optional[float] = None,
+) -> str:
     """
-    Minimal safe wrapper around OpenAI's chat completion API.
-    This is a placeholder so the backend can boot without failing.
-    Replace with your preferred model + streaming logic later.
+    Minimal wrapper around OpenAI's chat completion API.
+    timeout (seconds) bounds this single request.
     """
-    logger.warning("Using placeholder OpenAI run() function.")
+    kwargs: Dict[str, Any] = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if timeout is not None:
+        kwargs["timeout"] = timeout
 
     response = client.chat.completions.create(
-        model="gpt-4o-mini",
+        model=model,
         messages=messages,
-        max_tokens=1000,
+        max_tokens=max_tokens,
+        **kwargs,
     )
 
-    return response.choices[0].message.get("content", "")
+    return response.choices[0].message.content or ""
 
 
-def run_stream(messages: List[Dict[str, str]]):
+async def run_async(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4o-mini",
+    temperature: Optional[float] = None,
+    max_tokens: int = 1000,
+    timeout: Optional[float] = None,
+) -> str:
+    """run() on the async client."""
+    kwargs: Dict[str, Any] = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    response = await async_client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        **kwargs,
+    )
+
+    return response.choices[0].message.content or ""
+
+
+class TokenStream:
+    """
+    Text deltas as the model produces them, pulled one chunk at a time.
+
+    cancel() is safe from any thread — typically the event loop while a
+    worker thread is blocked in next(): it stops iteration and closes the
+    upstream response, which also unblocks that read.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._cancelled = threading.Event()
+        self._deltas = self._iter_deltas()
+
+    def _iter_deltas(self) -> Iterator[str]:
+        try:
+            for chunk in self._stream:
+                if self._cancelled.is_set():
+                    break
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            self._stream.close()
+
+    def __iter__(self) -> "TokenStream":
+        return self
+
+    def __next__(self) -> str:
+        if self._cancelled.is_set():
+            raise StopIteration
+        try:
+            return next(self._deltas)
+        except StopIteration:
+            raise
+        except Exception:
+            if self._cancelled.is_set():  # the read was cut short by cancel()
+                raise StopIteration
+            raise
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        try:
+            self._stream.close()
+        except Exception as e:
+            logger.debug(f"Closing cancelled stream: {e}")
+
+
+def run_stream(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4o-mini",
+    temperature: Optional[float] = None,
+    max_tokens: int = 1000,
+    timeout: Optional[float] = None,
+) -> TokenStream:
     """
-    Placeholder streaming generator.
-    Returns a fake generator so FastAPI dependencies don't explode.
-    Replace with real streaming later.
+    Streaming completion → TokenStream of text deltas. Call cancel() when
+    the consumer goes away (e.g. client disconnected) to close the
+    upstream connection.
     """
-    logger.warning("Using placeholder OpenAI run_stream() function (no real streaming).")
-    
-    fake_text = "Streaming is not yet implemented."
-    for chunk in fake_text.split():
-        yield chunk
+    kwargs: Dict[str, Any] = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        stream=True,
+        **kwargs,
+    )
+
+    return TokenStream(stream)
@@ -2,6 +2,7 @@ import logging
 from typing import Optional, Dict, Any
 
 from app.utils.gpt_safe import gpt_safe_call
+from app.utils.llm_cache import TTL_IDENTITY
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,9 @@ def _gpt_find_sherdog_url(name: str) -> Optional[str]:
         f"If unknown return ONLY 'null'. No extra text."
     )
 
-    raw = gpt_safe_call([{"role": "user", "content": prompt}])
+    raw = gpt_safe_call(
+        [{"role": "user", "content": prompt}], cache_ttl=TTL_IDENTITY
+    )
     if not raw:
         return None
 
@@ -57,6 +60,23 @@ def _scrape_sherdog_profile(url: str) -> Optional[Dict[str, Any]]:
     }
 
 
+# ---------------------------------------------------------
+# Public API: resolve / fetch
+# ---------------------------------------------------------
+
+def resolve_sherdog_url(name: str) -> Optional[str]:
+    url = _gpt_find_sherdog_url(name)
+
+    if not url:
+        logger.warning(f"No Sherdog URL found for: {name}")
+
+    return url
+
+
+def fetch_sherdog_profile(url: str) -> Optional[Dict[str, Any]]:
+    return _scrape_sherdog_profile(url)
+
+
 # ---------------------------------------------------------
 # Public API: Lookup a single Sherdog profile
 # ---------------------------------------------------------
@@ -69,10 +89,9 @@ def get_sherdog_profile(name: str) -> Optional[Dict[str, Any]]:
 
     logger.info(f"Resolving Sherdog profile for: {name}")
 
-    url = _gpt_find_sherdog_url(name)
+    url = resolve_sherdog_url(name)
 
     if not url:
-        logger.warning(f"No Sherdog URL found for: {name}")
         return None
 
-    return _scrape_sherdog_profile(url)
+    return fetch_sherdog_profile(url)
@@ -0,0 +1,49 @@
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+class StreamMetrics:
+    """Rolling window of streaming latencies (milliseconds)."""
+
+    def __init__(self, window: int = 500):
+        self._ttft = deque(maxlen=window)
+        self._total = deque(maxlen=window)
+        self._streams = 0
+        self._disconnects = 0
+        self._lock = threading.Lock()
+
+    def record(self, ttft_ms: Optional[float], total_ms: float, disconnected: bool) -> None:
+        with self._lock:
+            self._streams += 1
+            if disconnected:
+                self._disconnects += 1
+            if ttft_ms is not None:
+                self._ttft.append(ttft_ms)
+            self._total.append(total_ms)
+
+    @staticmethod
+    def _percentile(values, pct: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        idx = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+        return round(ordered[idx], 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            ttft = list(self._ttft)
+            total = list(self._total)
+            streams, disconnects = self._streams, self._disconnects
+
+        return {
+            "streams": streams,
+            "client_disconnects": disconnects,
+            "ttft_ms_p50": self._percentile(ttft, 0.5),
+            "ttft_ms_p95": self._percentile(ttft, 0.95),
+            "total_ms_p50": self._percentile(total, 0.5),
+            "total_ms_p95": self._percentile(total, 0.95),
+        }
+
+
+stream_metrics = StreamMetrics()
@@ -2,6 +2,9 @@ import logging
 from typing import List, Dict, Any, Optional
 
 from app.utils.gpt_safe import gpt_safe_call
+from app.utils.identity_batch import resolve_identities_batch
+from app.utils.llm_cache import TTL_IDENTITY
+from app.utils.tapology_scraper import fetch_tapology_profile, resolve_tapology_slug
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +26,9 @@ def _gpt_find_tapology_slug(name: str) -> Optional[str]:
         f"If unknown, reply exactly with 'null'. No explanation."
     )
 
-    raw = gpt_safe_call([{"role": "user", "content": prompt}])
+    raw = gpt_safe_call(
+        [{"role": "user", "content": prompt}], cache_ttl=TTL_IDENTITY
+    )
     if not raw:
         return None
 
@@ -104,9 +109,14 @@ def get_tapology_batch(names: List[str]) -> Dict[str, Any]:
     results: Dict[str, Any] = {}
     failed: List[str] = []
 
+    # One structured GPT request per chunk instead of one per name
+    slugs = resolve_identities_batch(names, sources=("tapology",))
+
     for name in names:
         try:
-            profile = get_tapology_profile(name)
+            # Model skipped/unsure → single-name resolution
+            slug = slugs.get(name, {}).get("tapology") or resolve_tapology_slug(name)
+            profile = fetch_tapology_profile(slug) if slug else None
 
             if profile:
                 results[name] = profile
@@ -2,6 +2,7 @@ import logging
 from typing import Optional, Dict, Any
 
 from app.utils.gpt_safe import gpt_safe_call
+from app.utils.llm_cache import TTL_IDENTITY
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +24,9 @@ def _gpt_find_tapology_slug(name: str) -> Optional[str]:
         f"If unknown return ONLY 'null'. No extra text."
     )
 
-    raw = gpt_safe_call([{"role": "user", "content": prompt}])
+    raw = gpt_safe_call(
+        [{"role": "user", "content": prompt}], cache_ttl=TTL_IDENTITY
+    )
 
     if not raw:
         return None
@@ -60,6 +63,23 @@ def _scrape_tapology_profile(slug: str) -> Optional[Dict[str, Any]]:
     }
 
 
+# ---------------------------------------------------------
+# Public API: resolve / fetch
+# ---------------------------------------------------------
+
+def resolve_tapology_slug(name: str) -> Optional[str]:
+    slug = _gpt_find_tapology_slug(name)
+
+    if not slug:
+        logger.warning(f"No Tapology slug found for fighter: {name}")
+
+    return slug
+
+
+def fetch_tapology_profile(slug: str) -> Optional[Dict[str, Any]]:
+    return _scrape_tapology_profile(slug)
+
+
 # ---------------------------------------------------------
 # Public API: get Tapology fighter data
 # ---------------------------------------------------------
@@ -72,10 +92,9 @@ def get_tapology_profile(name: str) -> Optional[Dict[str, Any]]:
 
     logger.info(f"Resolving Tapology profile for: {name}")
 
-    slug = _gpt_find_tapology_slug(name)
+    slug = resolve_tapology_slug(name)
 
     if not slug:
-        logger.warning(f"No Tapology slug found for fighter: {name}")
         return None
 
-    return _scrape_tapology_profile(slug)
+    return fetch_tapology_profile(slug)
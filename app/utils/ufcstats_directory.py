@@ -0,0 +1,235 @@
+import os
+import json
+import string
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+
+from bs4 import BeautifulSoup
+
+from app.config import settings
+from app.utils.http_client import http_get
+from app.utils.names import normalize_name
+
+logger = logging.getLogger(__name__)
+
+UFC_LISTING = "http://ufcstats.com/statistics/fighters?char={char}&page=all"
+LETTERS = string.ascii_lowercase
+
+
+# ---------------------------------------------------------
+# Helper: scrape one alphabetical listing page
+# ---------------------------------------------------------
+
+def _scrape_letter(char: str) -> Optional[List[Dict[str, str]]]:
+    """
+    UFCStats lists fighters by first letter of LAST name.
+    Returns [{"name", "nickname", "url"}] or None if the fetch failed.
+    """
+    try:
+        resp = http_get(UFC_LISTING.format(char=char))
+        resp.raise_for_status()
+    except Exception as e:
+        logger.error(f"UFCStats listing '{char}' failed: {e}")
+        return None
+
+    soup = BeautifulSoup(resp.text, "html.parser")
+    table = soup.find("table", class_="b-statistics__table")
+    if not table:
+        return []
+
+    fighters = []
+    for row in table.find_all("tr")[1:]:
+        cols = row.find_all("td")
+        if len(cols) < 3:
+            continue
+
+        link = cols[0].find("a")
+        if not link or not link.has_attr("href"):
+            continue
+
+        first = cols[0].get_text(" ", strip=True)
+        last = cols[1].get_text(" ", strip=True)
+
+        fighters.append({
+            "name": f"{first} {last}".strip(),
+            "nickname": cols[2].get_text(" ", strip=True) or None,
+            "url": link["href"],
+        })
+
+    return fighters
+
+
+# ---------------------------------------------------------
+# Directory: local JSON file + in-memory normalized index
+# ---------------------------------------------------------
+
+class UFCStatsDirectory:
+    """
+    {normalized name → [fighter urls]} built from the alphabetical listings.
+    Letters are fetched lazily and refreshed individually, so a lookup is a
+    dict hit and only a miss (new fighter) costs one listing request.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._letters: Dict[str, Dict[str, Any]] = {}
+        self._aliases: Dict[str, str] = {}
+        self._names: Dict[str, List[str]] = {}
+        self._nicknames: Dict[str, List[str]] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._letter_locks = {c: threading.Lock() for c in LETTERS}
+
+    # ---- persistence ----
+    def _load(self) -> None:
+        if self._loaded:
+            return
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._letters = data.get("letters", {})
+                self._aliases = data.get("aliases", {})
+            except Exception as e:
+                logger.error(f"Could not read UFCStats directory {self.path}: {e}")
+
+        self._rebuild_index()
+        self._loaded = True
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"letters": self._letters, "aliases": self._aliases}, f)
+        os.replace(tmp, self.path)
+
+    def _rebuild_index(self) -> None:
+        names: Dict[str, List[str]] = {}
+        nicknames: Dict[str, List[str]] = {}
+
+        for entry in self._letters.values():
+            for fighter in entry.get("fighters", []):
+                names.setdefault(normalize_name(fighter["name"]), []).append(fighter["url"])
+                if fighter.get("nickname"):
+                    nicknames.setdefault(normalize_name(fighter["nickname"]), []).append(fighter["url"])
+
+        self._names = names
+        self._nicknames = nicknames
+
+    # ---- refresh ----
+    def _letter_age(self, char: str) -> Optional[timedelta]:
+        stamp = self._letters.get(char, {}).get("refreshed_at")
+        if not stamp:
+            return None
+        return datetime.utcnow() - datetime.fromisoformat(stamp)
+
+    def refresh_letter(self, char: str, max_age: Optional[timedelta] = None) -> bool:
+        """Re-fetch one listing page unless it is younger than max_age."""
+        char = char.lower()
+        if char not in self._letter_locks:
+            return False
+
+        with self._letter_locks[char]:
+            with self._lock:
+                self._load()
+                age = self._letter_age(char)
+                if max_age is not None and age is not None and age < max_age:
+                    return False
+
+            fighters = _scrape_letter(char)
+            if fighters is None:
+                return False
+
+            with self._lock:
+                self._letters[char] = {
+                    "refreshed_at": datetime.utcnow().isoformat(),
+                    "fighters": fighters,
+                }
+                self._rebuild_index()
+                try:
+                    self._save()
+                except Exception as e:
+                    logger.error(f"Could not write UFCStats directory: {e}")
+
+            logger.info(f"UFCStats directory letter '{char}' refreshed ({len(fighters)} fighters).")
+            return True
+
+    def refresh_stale(self) -> int:
+        """Refresh every letter older than the directory TTL. Returns count refreshed."""
+        ttl = timedelta(hours=settings.UFCSTATS_DIRECTORY_TTL_HOURS)
+        return sum(1 for c in LETTERS if self.refresh_letter(c, max_age=ttl))
+
+    # ---- lookup ----
+    def _match(self, key: str) -> Optional[str]:
+        with self._lock:
+            self._load()
+
+            urls = self._names.get(key)
+            if not urls and key in self._aliases:
+                return self._aliases[key]
+            if not urls:
+                urls = self._nicknames.get(key)
+
+        if not urls:
+            return None
+
+        if len(set(urls)) > 1:
+            logger.warning(f"Ambiguous UFCStats directory match for '{key}': {len(urls)} fighters")
+            return None
+
+        return urls[0]
+
+    def lookup(self, name: str) -> Optional[str]:
+        """
+        Name → fighter URL.
+        On a miss, refresh the listing letter(s) the name could be filed
+        under (rate-limited by UFCSTATS_DIRECTORY_MISS_REFRESH_HOURS) and retry.
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+
+        url = self._match(key)
+        if url:
+            return url
+
+        max_age = timedelta(hours=settings.UFCSTATS_DIRECTORY_MISS_REFRESH_HOURS)
+        tokens = key.split()
+        candidates = dict.fromkeys(t[0] for t in (tokens[1:] or tokens) if t[0] in LETTERS)
+
+        for char in candidates:
+            if self.refresh_letter(char, max_age=max_age):
+                url = self._match(key)
+                if url:
+                    return url
+
+        return None
+
+    def add_alias(self, alias: str, url: str) -> None:
+        """
+        Register an alternate spelling (our name for a fighter, a stored
+        alias...) for a known URL. No-op when the spelling already
+        resolves to it, so callers can feed every name they see.
+        """
+        key = normalize_name(alias)
+        if not key or not url:
+            return
+
+        with self._lock:
+            self._load()
+            if self._aliases.get(key) == url or set(self._names.get(key) or []) == {url}:
+                return
+            self._aliases[key] = url
+            try:
+                self._save()
+            except Exception as e:
+                logger.error(f"Could not write UFCStats directory: {e}")
+
+
+ufcstats_directory = UFCStatsDirectory(settings.UFCSTATS_DIRECTORY_PATH)
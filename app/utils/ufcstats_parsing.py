@@ -0,0 +1,231 @@
+import re
+from datetime import date, datetime
+from typing import Optional, Dict, Any, List
+
+from app.utils.names import normalize_name
+
+# ---------------------------------------------------------
+# UFCStats string → number helpers
+# (scraped values look like "4.52", "51%", "5' 11\"", "155 lbs.", "--")
+# ---------------------------------------------------------
+
+_MISSING = {"", "--", "-", "n/a", "none", "null"}
+
+# normalized label → canonical field
+CAREER_STAT_FIELDS = {
+    "slpm": "slpm",        # significant strikes landed per minute
+    "stracc": "str_acc",   # striking accuracy (0-1)
+    "sapm": "sapm",        # significant strikes absorbed per minute
+    "strdef": "str_def",   # striking defence (0-1)
+    "tdavg": "td_avg",     # takedowns per 15 min
+    "tdacc": "td_acc",     # takedown accuracy (0-1)
+    "tddef": "td_def",     # takedown defence (0-1)
+    "subavg": "sub_avg",   # submission attempts per 15 min
+}
+
+
+def _label(key: str) -> str:
+    return re.sub(r"[^a-z]", "", key.lower())
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or str(value).strip().lower() in _MISSING
+
+
+def parse_number(value: Any) -> Optional[float]:
+    if _is_missing(value):
+        return None
+    match = re.search(r"-?\d+(?:\.\d+)?", str(value))
+    return float(match.group(0)) if match else None
+
+
+def parse_percent(value: Any) -> Optional[float]:
+    """ "51%" → 0.51 """
+    number = parse_number(value)
+    return round(number / 100.0, 4) if number is not None else None
+
+
+def parse_height_inches(value: Any) -> Optional[float]:
+    """ 5' 11" → 71.0 """
+    if _is_missing(value):
+        return None
+    match = re.search(r"(\d+)\s*'\s*(\d+)?", str(value))
+    if not match:
+        return None
+    return float(int(match.group(1)) * 12 + int(match.group(2) or 0))
+
+
+def parse_dob(value: Any) -> Optional[date]:
+    if _is_missing(value):
+        return None
+    for fmt in ("%b %d, %Y", "%B %d, %Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def age_on(dob: Optional[date], on: Optional[date] = None) -> Optional[float]:
+    if dob is None:
+        return None
+    on = on or datetime.utcnow().date()
+    return round((on - dob).days / 365.25, 1)
+
+
+# ---------------------------------------------------------
+# Blobs → typed dicts
+# ---------------------------------------------------------
+
+def parse_career_stats(stats: Optional[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    """UFCStats career_stats (or attributes) strings → canonical floats."""
+    out: Dict[str, Optional[float]] = {f: None for f in CAREER_STAT_FIELDS.values()}
+
+    for key, value in (stats or {}).items():
+        field = CAREER_STAT_FIELDS.get(_label(key))
+        if not field:
+            continue
+        out[field] = parse_percent(value) if "%" in str(value) else parse_number(value)
+
+    return out
+
+
+def parse_attributes(attrs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    attrs = {_label(k): v for k, v in (attrs or {}).items()}
+    dob = parse_dob(attrs.get("dob"))
+    stance = attrs.get("stance")
+
+    return {
+        "height_in": parse_height_inches(attrs.get("height")),
+        "weight_lbs": parse_number(attrs.get("weight")),
+        "reach_in": parse_number(attrs.get("reach")),
+        "stance": None if _is_missing(stance) else str(stance).strip(),
+        "dob": dob,
+        "age": age_on(dob),
+    }
+
+
+# ---------------------------------------------------------
+# Fight history
+# ---------------------------------------------------------
+
+_DATE_IN_EVENT = re.compile(r"([A-Z][a-z]{2})\.?\s+(\d{1,2}),\s+(\d{4})")
+_FIGHT_TIME = re.compile(r"\d{1,2}:\d{2}")
+
+# Fighter-page history table: W/L, Fighter, Kd, Str, Td, Sub, Event, Method, Round, Time
+HISTORY_COLUMNS = {"result": 0, "opponent": 1, "event": 6, "method": 7, "round": 8, "time": 9}
+
+
+def parse_history_row(cells: List[str]) -> Optional[Dict[str, str]]:
+    """One history <tr>'s cell texts → the raw keys stored in fight_history."""
+    if len(cells) <= max(HISTORY_COLUMNS.values()):
+        return None
+    return {key: cells[i] for key, i in HISTORY_COLUMNS.items()}
+
+
+def history_row_current(row: Dict[str, Any]) -> bool:
+    """
+    False for completed rows scraped before the columns were mapped
+    correctly (Kd / Str / Td stored as method / round / time); their
+    method and round are unknown until the fighter is re-scraped.
+    """
+    if parse_result(row.get("result")) is None:
+        return True
+    return bool(_FIGHT_TIME.fullmatch(str(row.get("time") or "").strip()))
+
+
+def history_outdated(history: Optional[List[Dict[str, Any]]]) -> bool:
+    return any(not history_row_current(row) for row in history or [])
+
+
+def history_method(row: Dict[str, Any]) -> Optional[str]:
+    return classify_method(row.get("method")) if history_row_current(row) else None
+
+
+def history_round(row: Dict[str, Any]) -> Optional[int]:
+    if not history_row_current(row):
+        return None
+    number = parse_number(row.get("round"))
+    return int(number) if number is not None else None
+
+
+def classify_method(method: Any) -> Optional[str]:
+    """ "KO/TKO Punches" → "KO/TKO", "SUB Rear Naked Choke" → "Submission", "U-DEC" → "Decision" """
+    text = str(method or "").upper()
+    if not text.strip():
+        return None
+    if text.startswith("SUB"):
+        return "Submission"
+    if "KO" in text:
+        return "KO/TKO"
+    if "DEC" in text:
+        return "Decision"
+    return "Other"
+
+
+def parse_result(result: Any) -> Optional[str]:
+    """ "win" / "loss" / "draw" / "nc" — anything else (e.g. "next") → None """
+    text = str(result or "").strip().lower()
+    if text.startswith("w"):
+        return "win"
+    if text.startswith("l"):
+        return "loss"
+    if text.startswith("d"):
+        return "draw"
+    if text.startswith("nc"):
+        return "nc"
+    return None
+
+
+def parse_event_date(event_text: Any) -> Optional[date]:
+    """UFCStats history 'event' cell holds the event name and e.g. 'Apr. 13, 2024'."""
+    match = _DATE_IN_EVENT.search(str(event_text or ""))
+    if not match:
+        return None
+    try:
+        return datetime.strptime(" ".join(match.groups()), "%b %d %Y").date()
+    except ValueError:
+        return None
+
+
+def parse_opponent(cell: Any, fighter_name: Optional[str] = None) -> Optional[str]:
+    """
+    The history 'Fighter' cell lists both names (fighter first, one per
+    line); return the one that isn't fighter_name.
+    """
+    names = [line.strip() for line in str(cell or "").splitlines() if line.strip()]
+    if not names:
+        return None
+    if len(names) == 1:
+        return names[0]
+
+    own = normalize_name(fighter_name)
+    others = [n for n in names if normalize_name(n) != own]
+    return others[-1] if others else names[-1]
+
+
+def summarize_history(history: Optional[List[Dict[str, Any]]]) -> Dict[str, int]:
+    """Record and finish counts from a UFCStats fight_history list."""
+    summary = {"wins": 0, "losses": 0, "draws": 0,
+               "wins_ko": 0, "wins_sub": 0, "wins_dec": 0,
+               "losses_ko": 0, "losses_sub": 0, "losses_dec": 0}
+
+    for row in history or []:
+        result = parse_result(row.get("result"))
+        method = history_method(row)
+
+        if result == "win":
+            summary["wins"] += 1
+        elif result == "loss":
+            summary["losses"] += 1
+        elif result == "draw":
+            summary["draws"] += 1
+        else:
+            continue
+
+        suffix = {"KO/TKO": "ko", "Submission": "sub", "Decision": "dec"}.get(method)
+        if suffix and result in ("win", "loss"):
+            prefix = "wins" if result == "win" else "losses"
+            summary[f"{prefix}_{suffix}"] += 1
+
+    return summary
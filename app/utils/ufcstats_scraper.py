@@ -1,54 +1,27 @@
 import logging
-import requests
 from bs4 import BeautifulSoup
 from typing import Optional, Dict, Any
 
 from app.utils.gpt_safe import gpt_safe_call
+from app.utils.llm_cache import TTL_IDENTITY
+from app.utils.http_client import http_get
+from app.utils.ufcstats_directory import ufcstats_directory
+from app.utils.ufcstats_parsing import parse_history_row
 
 logger = logging.getLogger(__name__)
 
-UFC_SEARCH = "http://ufcstats.com/statistics/fighters?query={query}&page=all"
 UFC_BASE = "http://ufcstats.com"
 
 # ---------------------------------------------------------
-# Helper: Find fighter URL via search page
+# Helper: Find fighter URL via local directory index
 # ---------------------------------------------------------
 
 def _find_fighter_url(name: str) -> Optional[str]:
     """
-    Scrapes UFCStats search results to find the fighter's detail page URL.
+    Exact normalized-name (or alias) match against the UFCStats fighter
+    directory. No HTTP unless the name is new to the directory.
     """
-    try:
-        html = requests.get(
-            UFC_SEARCH.format(query=name.replace(" ", "+")),
-            timeout=10
-        ).text
-    except Exception as e:
-        logger.error(f"UFCStats search request failed: {e}")
-        return None
-
-    soup = BeautifulSoup(html, "html.parser")
-    table = soup.find("table", class_="b-statistics__table")
-
-    if not table:
-        return None
-
-    rows = table.find_all("tr")[1:]  # skip header
-    for row in rows:
-        cols = row.find_all("td")
-        if not cols:
-            continue
-
-        link = cols[0].find("a")
-        if not link:
-            continue
-
-        found_name = link.text.strip().lower()
-
-        if name.lower() in found_name or found_name in name.lower():
-            return link["href"]
-
-    return None  # No matches
+    return ufcstats_directory.lookup(name)
 
 
 # ---------------------------------------------------------
@@ -61,7 +34,9 @@ def _gpt_find_ufcstats_id(name: str) -> Optional[str]:
         f"Return ONLY the full URL OR 'null' if unknown."
     )
 
-    raw = gpt_safe_call([{"role": "user", "content": prompt}]).strip()
+    raw = gpt_safe_call(
+        [{"role": "user", "content": prompt}], cache_ttl=TTL_IDENTITY
+    ).strip()
 
     if raw.lower() == "null":
         return None
@@ -85,7 +60,7 @@ def _scrape_fighter_page(url: str) -> Optional[Dict[str, Any]]:
     - fight history
     """
     try:
-        html = requests.get(url, timeout=10).text
+        html = http_get(url).text
     except Exception as e:
         logger.error(f"Error fetching fighter page: {e}")
         return None
@@ -120,18 +95,9 @@ def _scrape_fighter_page(url: str) -> Optional[Dict[str, Any]]:
     history = soup.find("table", class_="b-fight-details__table")
     if history:
         for row in history.find_all("tr", class_="b-fight-details__table-row"):
-            cols = row.find_all("td")
-            if len(cols) < 7:
-                continue
-
-            fights.append({
-                "result": cols[0].text.strip(),
-                "opponent": cols[1].text.strip(),
-                "method": cols[2].text.strip(),
-                "round": cols[3].text.strip(),
-                "time": cols[4].text.strip(),
-                "event": cols[6].text.strip(),
-            })
+            fight = parse_history_row([col.text.strip() for col in row.find_all("td")])
+            if fight:
+                fights.append(fight)
 
     return {
         "name": name,
@@ -146,27 +112,45 @@ def _scrape_fighter_page(url: str) -> Optional[Dict[str, Any]]:
 # Public API
 # ---------------------------------------------------------
 
-def get_ufcstats_profile(name: str) -> Optional[Dict[str, Any]]:
+def resolve_ufcstats_url(name: str) -> Optional[str]:
     """
-    Full hybrid strategy:
-    1. Try UFCStats search page
+    1. Try the local UFCStats fighter directory
     2. If nothing found → GPT fallback for fighter URL
-    3. Scrape fighter profile page
     """
-    logger.info(f"Looking up UFCStats profile for: {name}")
-
-    # Step 1 — Try direct search
+    # Step 1 — Directory lookup
     url = _find_fighter_url(name)
 
     # Step 2 — GPT fallback
     if not url:
-        logger.warning(f"No UFCStats search result for {name}. Trying GPT fallback...")
+        logger.warning(f"No UFCStats directory match for {name}. Trying GPT fallback...")
         url = _gpt_find_ufcstats_id(name)
 
-    # Step 3 — Give up if still nothing
     if not url:
         logger.error(f"Could not find UFCStats URL for fighter: {name}")
+
+    return url
+
+
+def fetch_ufcstats_profile(url: str) -> Optional[Dict[str, Any]]:
+    """Scrape a known fighter page; None if the page is gone or unparseable."""
+    data = _scrape_fighter_page(url)
+
+    if not data or data.get("name") == "Unknown":
+        return None
+
+    return data
+
+
+def get_ufcstats_profile(name: str) -> Optional[Dict[str, Any]]:
+    """
+    Full hybrid strategy:
+    1. Resolve the fighter URL (directory → GPT fallback)
+    2. Scrape fighter profile page
+    """
+    logger.info(f"Looking up UFCStats profile for: {name}")
+
+    url = resolve_ufcstats_url(name)
+    if not url:
         return None
 
-    # Step 4 — Scrape fighter page
-    return _scrape_fighter_page(url)
+    return fetch_ufcstats_profile(url)
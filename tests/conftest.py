@@ -0,0 +1,86 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from app.utils.ufcstats_parsing import parse_history_row
+
+# app.database builds its engine and openai_client its clients at import time
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+# Jon Jones' fighter page, UFC 309 (markup as served by ufcstats.com)
+JONES_MIOCIC_ROW = """
+<table class="b-fight-details__table b-fight-details__table_style_margin-top b-fight-details__table_type_event-details js-fight-table">
+<tbody class="b-fight-details__table-body">
+<tr class="b-fight-details__table-row b-fight-details__table-row__hover js-fight-details-click" data-link="http://ufcstats.com/fight-details/6d39b1ac84fa3e31">
+  <td class="b-fight-details__table-col">
+    <p class="b-fight-details__table-text">
+      <a href="http://ufcstats.com/fight-details/6d39b1ac84fa3e31" class="b-flag b-flag_style_green">
+        <i class="b-flag__inner"><i class="b-flag__text">win</i></i>
+      </a>
+    </p>
+  </td>
+  <td class="b-fight-details__table-col l-page_align_left">
+    <p class="b-fight-details__table-text">
+      <a class="b-link b-link_style_black" href="http://ufcstats.com/fighter-details/07f72a2a7591b409">
+        Jon Jones
+      </a>
+    </p>
+    <p class="b-fight-details__table-text">
+      <a class="b-link b-link_style_black" href="http://ufcstats.com/fighter-details/d0f3959b4a9747e6">
+        Stipe Miocic
+      </a>
+    </p>
+  </td>
+  <td class="b-fight-details__table-col">
+    <p class="b-fight-details__table-text">0</p>
+    <p class="b-fight-details__table-text">0</p>
+  </td>
+  <td class="b-fight-details__table-col">
+    <p class="b-fight-details__table-text">56</p>
+    <p class="b-fight-details__table-text">14</p>
+  </td>
+  <td class="b-fight-details__table-col">
+    <p class="b-fight-details__table-text">2</p>
+    <p class="b-fight-details__table-text">0</p>
+  </td>
+  <td class="b-fight-details__table-col">
+    <p class="b-fight-details__table-text">0</p>
+    <p class="b-fight-details__table-text">0</p>
+  </td>
+  <td class="b-fight-details__table-col l-page_align_left">
+    <p class="b-fight-details__table-text">
+      <a class="b-link b-link_style_black" href="http://ufcstats.com/event-details/9f2f6b5c8f3b1a07">
+        UFC 309: Jones vs. Miocic
+      </a>
+    </p>
+    <p class="b-fight-details__table-text">
+      Nov. 16, 2024
+    </p>
+  </td>
+  <td class="b-fight-details__table-col l-page_align_left">
+    <p class="b-fight-details__table-text">KO/TKO</p>
+    <p class="b-fight-details__table-text">
+      Spinning Back Kick
+    </p>
+  </td>
+  <td class="b-fight-details__table-col">
+    <p class="b-fight-details__table-text">3</p>
+  </td>
+  <td class="b-fight-details__table-col">
+    <p class="b-fight-details__table-text">4:29</p>
+  </td>
+</tr>
+</tbody>
+</table>
+"""
+
+
+@pytest.fixture
+def jones_history():
+    """fight_history as _scrape_fighter_page stores it for the row above."""
+    soup = BeautifulSoup(JONES_MIOCIC_ROW, "html.parser")
+    rows = soup.find_all("tr", class_="b-fight-details__table-row")
+    # same cell extraction as ufcstats_scraper._scrape_fighter_page
+    return [parse_history_row([col.text.strip() for col in row.find_all("td")]) for row in rows]
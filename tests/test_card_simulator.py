@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.routes.simulation_routes import api_simulate_card
+from app.services.card_simulator import fight_inputs, simulate_arrays, simulate_card
+
+CARD = [
+    {"fighter_a": "Alex Pereira", "fighter_b": "Khalil Rountree", "odds_a": "-500", "odds_b": "+380",
+     "win_probability": 0.8, "method_distribution": {"KO/TKO": 0.7, "Submission": 0.05, "Decision": 0.25}},
+    {"fighter_a": "Jiri Prochazka", "fighter_b": "Jamahal Hill", "odds_a": "-150", "odds_b": "+130",
+     "win_probability": 0.55},
+]
+PARLAYS = [
+    {"legs": [{"fighter": "Alex Pereira"}, {"fighter": "Jamahal Hill"}]},
+    {"legs": [{"fighter": "Alex Pereira", "method": "KO/TKO"}], "decimal_odds": 1.8},
+]
+
+
+def test_same_seed_same_result():
+    first = simulate_card(CARD, parlays=PARLAYS, draws=5000, seed=7, market_weight=0.0)
+    second = simulate_card(CARD, parlays=PARLAYS, draws=5000, seed=7, market_weight=0.0)
+    other = simulate_card(CARD, parlays=PARLAYS, draws=5000, seed=8, market_weight=0.0)
+
+    assert first == second
+    assert first["parlays"] != other["parlays"]
+
+
+def test_seeded_arrays_reproduce_and_count_every_draw():
+    p_a, methods = np.array([0.8, 0.55]), np.array([[0.7, 0.05, 0.25], [0.32, 0.19, 0.49]])
+    specs = [{"legs": [(0, 0, -1), (1, 1, -1)]}, {"legs": [(0, 0, 0)]}]
+
+    first = simulate_arrays(p_a, methods, specs, draws=3000, seed=3, chunk_size=1000)
+    second = simulate_arrays(p_a, methods, specs, draws=3000, seed=3, chunk_size=1000)
+
+    assert all(np.array_equal(first[k], second[k]) for k in first)
+    assert first["patterns"].sum() == 3000
+    assert (first["method_counts"].sum(axis=1) == 3000).all()
+
+
+def test_rates_converge_to_inputs():
+    out = simulate_card(CARD, parlays=PARLAYS, draws=200_000, seed=1, market_weight=0.0)
+    pereira, prochazka = out["fights"]
+
+    assert pereira["win_probability"]["simulated"] == pytest.approx(0.8, abs=0.005)
+    assert pereira["method_rates"]["KO/TKO"] == pytest.approx(0.7, abs=0.005)
+    assert prochazka["win_probability"]["simulated"] == pytest.approx(0.55, abs=0.005)
+    # method is independent of the winner: P(Pereira by KO) = 0.8 × 0.7
+    assert out["parlays"][1]["hit_rate"] == pytest.approx(0.56, abs=0.005)
+    assert out["parlays"][0]["hit_rate"] == pytest.approx(0.8 * 0.45, abs=0.005)
+
+
+def test_market_weight_blends_model_and_market():
+    model_only, market_only = fight_inputs(CARD, 0.0)[1], fight_inputs(CARD, 1.0)[1]
+
+    assert model_only["p_a"] == pytest.approx(0.55)
+    assert market_only["p_a"] == pytest.approx(market_only["market"])
+    assert fight_inputs(CARD, 0.5)[1]["p_a"] == pytest.approx((0.55 + market_only["market"]) / 2)
+
+
+@pytest.mark.parametrize("weight", [-0.1, 1.5, "0.5", True])
+def test_route_rejects_market_weight_outside_unit_interval(weight):
+    with pytest.raises(HTTPException) as exc:
+        api_simulate_card({"fights": CARD, "market_weight": weight}, db=None)
+    assert exc.value.status_code == 422
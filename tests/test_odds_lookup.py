@@ -0,0 +1,26 @@
+from app.utils.odds_lookup import _match, _parse_gpt_odds, summarize_books
+
+MATCHUPS = [{"fighter_a": "Alex Pereira", "fighter_b": "Khalil Rountree"}]
+
+
+def test_match_detects_swapped_listing():
+    assert _match(MATCHUPS, "Alex Pereira", "Khalil Rountree Jr.") == (MATCHUPS[0], False)
+    assert _match(MATCHUPS, "Khalil Rountree Jr.", "Alex Pereira") == (MATCHUPS[0], True)
+    assert _match(MATCHUPS, "Jon Jones", "Stipe Miocic") is None
+
+
+def test_summarize_books_orients_lines():
+    (odds,) = summarize_books(MATCHUPS, [[("-500", "+380"), ("-450", "+350")]], ["DraftKings", "FanDuel"])
+
+    assert (odds.odds_a, odds.book) == ("-450", "FanDuel")
+    assert (odds.odds_b, odds.book_b) == ("+380", "DraftKings")
+    assert odds.fair_probability_a > 0.75 > odds.fair_probability_b
+
+
+def test_gpt_odds_are_parsed_as_json_not_evaluated():
+    reply = 'Sure:\n```json\n{"odds": [{"fighter_a": "Alex Pereira", "fighter_b": "Khalil Rountree", ' \
+            '"odds_a": "-500", "odds_b": "+380"}]}\n```'
+
+    assert _parse_gpt_odds(reply)[0]["odds_a"] == "-500"
+    assert _parse_gpt_odds("{'odds': [__import__('os').getcwd()]}") == []
+    assert _parse_gpt_odds("no odds today") == []
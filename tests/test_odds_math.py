@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from app.utils.odds_math import (
+    parse_american,
+    american_to_decimal,
+    no_vig_probabilities,
+    odds_matrix,
+    remove_vig,
+    market_summary,
+    format_american,
+)
+
+NAN = float("nan")
+
+
+def test_parse_and_convert():
+    assert parse_american("+150") == 150.0
+    assert parse_american("−200▲") == -200.0
+    assert parse_american("EVEN") == 100.0
+    assert np.isnan(parse_american("--"))
+    assert np.isnan(parse_american(50))
+    assert np.allclose(american_to_decimal([150, -200]), [2.5, 1.5])
+    assert format_american(149.6) == "+150"
+    assert format_american(NAN) is None
+
+
+def test_no_vig_two_way():
+    fair_a, fair_b = no_vig_probabilities(-150, 130)
+
+    # implied 0.6 + 0.43478 = 1.03478 → scaled back to 1
+    assert fair_a == pytest.approx(0.6 / (0.6 + 100 / 230))
+    assert fair_a + fair_b == pytest.approx(1.0)
+
+
+def test_market_summary_best_consensus_and_overround():
+    matrix = odds_matrix([
+        [("-150", "+130"), ("-140", "+120"), (None, "+125")],  # third book quotes one side only
+        [("--", None)],                                          # no usable line anywhere
+    ])
+    summary = market_summary(matrix)
+
+    assert matrix.shape == (2, 2, 3)
+    assert list(summary["best"][0]) == [-140.0, 130.0]
+    assert list(summary["best_book"][0]) == [1, 0]
+
+    # consensus over the two complete books only
+    book_fair = [0.6 / (0.6 + 100 / 230), (140 / 240) / (140 / 240 + 100 / 220)]
+    overrounds = [0.6 + 100 / 230 - 1.0, 140 / 240 + 100 / 220 - 1.0]
+    assert summary["books"][0] == 2
+    assert summary["fair"][0, 0] == pytest.approx(np.mean(book_fair))
+    assert summary["fair"][0].sum() == pytest.approx(1.0)
+    assert summary["overround"][0] == pytest.approx(np.mean(overrounds))
+
+    assert summary["books"][1] == 0
+    assert list(summary["best_book"][1]) == [-1, -1]
+    assert np.isnan(summary["best"][1]).all()
+    assert np.isnan(summary["fair"][1]).all()
+
+
+def test_swapped_row_mirrors_the_market():
+    straight = remove_vig(odds_matrix([[("-150", "+130")]]))
+    swapped = remove_vig(odds_matrix([[("+130", "-150")]]))
+
+    assert np.allclose(straight[0, ::-1], swapped[0])
+
+
+def test_remove_vig_is_nan_for_one_sided_books():
+    fair = remove_vig(odds_matrix([[("-150", None), ("-150", "+130")]]))
+
+    assert np.isnan(fair[0, :, 0]).all()
+    assert fair[0, :, 1].sum() == pytest.approx(1.0)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from app.services.parlay_optimizer import build_legs, score_combinations, optimize_parlays, RISK_PROFILES
+
+CARD = [
+    {"fighter_a": "Alex Pereira", "fighter_b": "Khalil Rountree", "odds": {"odds_a": "-500", "odds_b": "+380"},
+     "prediction": {"win_probability": {"fighter_a": 0.8}}},
+    {"fighter_a": "Jiri Prochazka", "fighter_b": "Jamahal Hill", "odds": {"odds_a": "-150", "odds_b": "+130"},
+     "prediction": {"win_probability": {"fighter_a": 0.55}}},
+    {"fighter_a": "Tom Aspinall", "fighter_b": "Curtis Blaydes", "odds": {"odds_a": "-250", "odds_b": "+205"},
+     "prediction": {"winner": "Curtis Blaydes", "confidence": 0.4}},
+]
+
+
+def test_legs_from_model_and_confidence():
+    legs = build_legs(CARD)
+
+    assert list(legs["fight"]) == [0, 0, 1, 1, 2, 2]
+    assert np.allclose(legs["probability"], [0.8, 0.2, 0.55, 0.45, 0.6, 0.4])
+    assert np.allclose(legs["decimal"][:2], [1.2, 4.8])
+
+
+def test_no_parlay_holds_both_sides_of_a_fight():
+    legs = build_legs(CARD)
+    scored = score_combinations(legs, max_legs=3)
+
+    # 3 fights × 2 sides: 3·4 two-leg + 8 three-leg combinations across fights
+    assert len(scored["ev"]) == 20
+    for row in scored["legs"]:
+        picks = row[row >= 0]
+        assert len(set(legs["fight"][picks])) == len(picks)
+
+    assert np.allclose(scored["ev"], scored["probability"] * scored["decimal"] - 1.0)
+
+
+def test_top_n_per_profile_by_expected_value():
+    parlays = optimize_parlays(CARD, max_legs=3, top_n=2)
+    scored = score_combinations(build_legs(CARD), max_legs=3)
+
+    for profile, low, high in RISK_PROFILES:
+        picked = [p["expected_value"] for p in parlays if p["risk_profile"] == profile]
+        in_band = scored["ev"][(scored["probability"] >= low) & ((scored["probability"] < high) | (high >= 1.0))]
+
+        assert len(picked) == min(2, len(in_band))
+        assert picked == sorted(picked, reverse=True)
+        assert np.allclose(picked, np.sort(in_band)[::-1][:len(picked)], atol=1e-4)
+
+
+def test_same_card_same_parlays():
+    assert optimize_parlays(CARD, max_legs=3, top_n=3) == optimize_parlays(list(CARD), max_legs=3, top_n=3)
+
+
+def test_no_parlays_without_two_priced_fights():
+    assert optimize_parlays(CARD[:1], max_legs=3, top_n=3) == []
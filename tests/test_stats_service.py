@@ -0,0 +1,21 @@
+from app.services.stats_service import parse_fighter_stats, NUMERIC_FIELDS
+
+
+def test_finish_columns_from_real_history(jones_history):
+    stats = parse_fighter_stats({"fight_history": jones_history})
+
+    assert stats["wins"] == 1
+    assert stats["wins_ko"] == 1
+    assert stats["wins_sub"] == 0
+    assert stats["finish_rate"] == 1.0
+    assert {"wins_ko", "wins_sub", "finish_rate"} <= set(NUMERIC_FIELDS)
+
+
+def test_finish_columns_unknown_for_old_column_mapping():
+    legacy = [{"result": "win", "opponent": "Jon Jones\nStipe Miocic", "method": "0", "round": "56", "time": "2",
+               "event": "UFC 309: Jones vs. Miocic Nov. 16, 2024"}]
+    stats = parse_fighter_stats({"fight_history": legacy})
+
+    assert stats["wins"] == 1
+    assert stats["wins_ko"] is None
+    assert stats["finish_rate"] is None
@@ -0,0 +1,48 @@
+from datetime import date
+
+from app.utils.ufcstats_parsing import (
+    parse_history_row,
+    parse_result,
+    parse_event_date,
+    parse_opponent,
+    history_method,
+    history_round,
+    history_outdated,
+    summarize_history,
+)
+
+
+def test_history_row_maps_ufcstats_columns(jones_history):
+    (row,) = jones_history
+
+    assert parse_result(row["result"]) == "win"
+    assert parse_opponent(row["opponent"], "Jon Jones") == "Stipe Miocic"
+    assert parse_event_date(row["event"]) == date(2024, 11, 16)
+    assert history_method(row) == "KO/TKO"
+    assert history_round(row) == 3
+    assert row["time"] == "4:29"
+
+
+def test_history_row_too_short():
+    assert parse_history_row(["win", "Jon Jones\nStipe Miocic", "0", "56", "2", "0", "UFC 309"]) is None
+
+
+def test_summarize_history_counts_finishes(jones_history):
+    summary = summarize_history(jones_history)
+
+    assert summary["wins"] == 1
+    assert summary["wins_ko"] == 1
+    assert summary["wins_dec"] == 0
+
+
+def test_rows_with_old_column_mapping_have_no_method(jones_history):
+    # method/round/time held Kd/Str/Td before the mapping was fixed
+    legacy = {"result": "win", "opponent": "Jon Jones\nStipe Miocic", "method": "0\n\n0",
+              "round": "56\n\n14", "time": "2\n\n0", "event": "UFC 309: Jones vs. Miocic Nov. 16, 2024"}
+    upcoming = {"result": "next", "opponent": "Jon Jones\nTom Aspinall", "method": "", "round": "", "time": ""}
+
+    assert history_method(legacy) is None
+    assert history_round(legacy) is None
+    assert history_outdated([upcoming, legacy])
+    assert not history_outdated([upcoming] + jones_history)
+    assert summarize_history([legacy])["wins"] == 1